@@ -0,0 +1,13 @@
+from .module_sensitivity import run_sensitivity, iter_sensitivity, sample_weights
+from .module_consensus import compare_rankings, kendall_tau_b, average_ranks, borda_scores, copeland_scores
+
+__all__ = [
+    "run_sensitivity",
+    "iter_sensitivity",
+    "sample_weights",
+    "compare_rankings",
+    "kendall_tau_b",
+    "average_ranks",
+    "borda_scores",
+    "copeland_scores",
+]
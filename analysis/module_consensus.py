@@ -0,0 +1,296 @@
+# module_consensus.py
+import numpy as np
+from common_utils import LazyRanking
+
+# Number of pairwise comparisons evaluated per block by the Copeland count (methods x rows x alternatives)
+DEFAULT_BLOCK_ELEMENTS = 1 << 20
+# Largest number of alternatives for which compare_rankings computes the O(k * n^2) Copeland scores by default
+COPELAND_MAX_N = 5000
+
+
+def average_ranks(scores, ascending=False):
+    """
+    Rank the alternatives of every row of a score matrix (rank 1 = best), giving tied alternatives
+    the average of the ranks they span, in one vectorized pass over all rows.
+
+    Args:
+        scores (ndarray): Scores (shape: n, or k x n with one ranking per row).
+        ascending (bool or sequence): Whether lower scores are preferred, for all rows or per row.
+
+    Returns:
+        ndarray: Average ranks (float, same shape as scores).
+    """
+    scores = np.asarray(scores, dtype=float)
+    single = scores.ndim == 1
+    S = np.atleast_2d(scores)
+    k, n = S.shape
+    ascending = np.broadcast_to(np.asarray(ascending, dtype=bool), (k,))
+    keys = np.where(ascending[:, None], S, -S)
+    order = np.argsort(keys, axis=1, kind="stable")
+    sorted_keys = np.take_along_axis(keys, order, axis=1)
+    # Tie groups over the flattened rows; every row starts a new group
+    new_group = np.ones((k, n), dtype=bool)
+    new_group[:, 1:] = sorted_keys[:, 1:] != sorted_keys[:, :-1]
+    new_group = new_group.ravel()
+    starts = np.flatnonzero(new_group)
+    ends = np.append(starts[1:], k * n)
+    group = np.cumsum(new_group) - 1
+    positions = (starts[group] + ends[group] - 1) / 2.0 - np.repeat(np.arange(k) * n, n) + 1.0
+    ranks = np.empty((k, n))
+    np.put_along_axis(ranks, order, positions.reshape(k, n), axis=1)
+    return ranks[0] if single else ranks
+
+
+def _tie_pairs(sorted_values):
+    """Number of tied pairs, sum of t * (t - 1) / 2 over the groups of equal values of a sorted array."""
+    if sorted_values.size == 0:
+        return 0
+    boundaries = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1], True])
+    t = np.diff(boundaries).astype(np.int64)
+    return int((t * (t - 1) // 2).sum())
+
+
+def _count_inversions(v):
+    """
+    Number of pairs i < j with v[i] > v[j] (v: integers in 0..n-1), by a bottom-up merge sort
+    vectorized over all the blocks of each level: O(n log n) comparisons.
+    """
+    v = np.asarray(v, dtype=np.int64)
+    n = v.size
+    index = np.arange(n, dtype=np.int64)
+    inversions = 0
+    width = 1
+    while width < n:
+        block = index // (2 * width)
+        local = index - block * 2 * width
+        # Sorting by (block, value) merges the two sorted runs of every block; a stable sort keeps
+        # the left run first among equal values, so ties are not counted as inversions
+        order = np.argsort(block * n + v, kind="stable")
+        position = np.empty(n, dtype=np.int64)
+        position[order] = local
+        right = local >= width
+        left_size = np.minimum(width, n - block * 2 * width)
+        # A right element at merged position p, j-th of its run, follows p - j left elements;
+        # the other left elements are larger and form inversions with it
+        inversions += int((left_size[right] - (position[right] - (local[right] - width))).sum())
+        v = v[order]
+        width *= 2
+    return inversions
+
+
+def kendall_tau_b(x, y):
+    """
+    Kendall's tau-b rank correlation between two score or rank vectors, with Knight's O(n log n) algorithm:
+    sort by (x, y), count the tied pairs of x, of y and of both, and count the discordant pairs as the
+    inversions of y in that order (merge sort) instead of comparing all n^2 pairs.
+
+    Args:
+        x (ndarray): First scores or ranks (shape: n).
+        y (ndarray): Second scores or ranks (shape: n).
+
+    Returns:
+        float: tau-b in [-1, 1] (NaN if either vector is constant or n < 2).
+
+    Raises:
+        ValueError: If x and y have different lengths.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.shape != y.shape:
+        raise ValueError("Rankings must have the same number of alternatives.")
+    n = x.size
+    if n < 2:
+        return float("nan")
+    order = np.lexsort((y, x))
+    x, y = x[order], y[order]
+    total = n * (n - 1) // 2
+    x_ties = _tie_pairs(x)
+    # Pairs tied on both x and y: runs of equal (x, y) in the lexicographic order
+    same = np.r_[True, (x[1:] != x[:-1]) | (y[1:] != y[:-1]), True]
+    t = np.diff(np.flatnonzero(same)).astype(np.int64)
+    joint_ties = int((t * (t - 1) // 2).sum())
+    y_dense = np.unique(y, return_inverse=True)[1]
+    discordant = _count_inversions(y_dense)
+    y_ties = _tie_pairs(np.sort(y))
+    denominator = np.sqrt(float(total - x_ties) * float(total - y_ties))
+    if denominator == 0:
+        return float("nan")
+    return float((total - x_ties - y_ties + joint_ties - 2 * discordant) / denominator)
+
+
+def kendall_matrix(R):
+    """
+    Kendall's tau-b between every pair of rankings.
+
+    Args:
+        R (ndarray): Ranks (shape: k x n), one ranking per row.
+
+    Returns:
+        ndarray: Symmetric (k x k) matrix with ones on the diagonal.
+    """
+    k = R.shape[0]
+    tau = np.eye(k)
+    for a in range(k):
+        for b in range(a + 1, k):
+            tau[a, b] = tau[b, a] = kendall_tau_b(R[a], R[b])
+    return tau
+
+
+def spearman_matrix(R):
+    """
+    Spearman's rho between every pair of rankings: the Pearson correlation of their average ranks,
+    for all pairs in one matrix product.
+
+    Args:
+        R (ndarray): Average ranks (shape: k x n), one ranking per row.
+
+    Returns:
+        ndarray: Symmetric (k x k) matrix.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.atleast_2d(np.corrcoef(R))
+
+
+def top_k_overlap_matrix(R, k=10):
+    """
+    Share of common alternatives between the top k of every pair of rankings (ties broken by position).
+
+    Args:
+        R (ndarray): Ranks (shape: r x n), one ranking per row.
+        k (int): Size of the compared tops.
+
+    Returns:
+        ndarray: Symmetric (r x r) matrix of |top_k(a) & top_k(b)| / k.
+    """
+    r, n = R.shape
+    k = max(1, min(k, n))
+    top = np.argsort(R, axis=1, kind="stable")[:, :k]
+    member = np.zeros((r, n))
+    np.put_along_axis(member, top, 1.0, axis=1)
+    return member @ member.T / k
+
+
+def borda_scores(R):
+    """
+    Borda count: every ranking gives an alternative n - rank points (average ranks for ties).
+
+    Args:
+        R (ndarray): Average ranks (shape: k x n).
+
+    Returns:
+        ndarray: Borda score of each alternative (shape: n), higher is better.
+    """
+    return (R.shape[1] - R).sum(axis=0)
+
+
+def copeland_scores(R, block_size=None):
+    """
+    Copeland score: pairwise majority contests between alternatives (an alternative beats another if more
+    rankings place it before than after), scored wins - losses. The (k x n x n) comparisons are evaluated
+    block by block, O(k * n^2) time and O(block) memory.
+
+    Args:
+        R (ndarray): Ranks (shape: k x n).
+        block_size (int, optional): Number of alternatives per block.
+
+    Returns:
+        ndarray: Copeland score of each alternative (shape: n), in -(n - 1)..n - 1, higher is better.
+    """
+    k, n = R.shape
+    if block_size is None:
+        block_size = max(1, DEFAULT_BLOCK_ELEMENTS // max(k * n, 1))
+    scores = np.zeros(n)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        # Number of rankings placing each block alternative before (+1) or after (-1) every alternative
+        majority = np.sign(R[:, None, :] - R[:, start:stop, None]).sum(axis=0)
+        scores[start:stop] = np.sign(majority).sum(axis=1)
+    return scores
+
+
+def _scores_of(ranking, names):
+    """Score vector and direction of one ranking, aligned with the alternatives (names) of the first one."""
+    import pandas as pd
+    if isinstance(ranking, LazyRanking):
+        return ranking.scores, ranking.ascending
+    if isinstance(ranking, pd.DataFrame):
+        scores = ranking["score"].to_numpy(dtype=float)
+        ascending = len(scores) > 1 and scores[0] < scores[-1]
+        if names is None:
+            return scores, ascending
+        if not ranking["model_name"].is_unique:
+            raise ValueError("Ranking DataFrames can only be aligned by unique 'model_name' values.")
+        return ranking.set_index("model_name")["score"].reindex(names).to_numpy(dtype=float), ascending
+    return np.asarray(ranking, dtype=float), False
+
+
+def compare_rankings(rankings, names=None, ascending=None, top_k=10, copeland=None):
+    """
+    Compare several rankings of the same alternatives and build consensus rankings:
+    1. Rank every method's scores (average ranks for ties), all methods in one pass.
+    2. Kendall's tau-b (O(n log n) per pair), Spearman's rho and top-k overlap matrices.
+    3. Borda and Copeland consensus scores from the same rank matrix.
+
+    Args:
+        rankings (dict or ndarray): Mapping of method names to a LazyRanking, a ranking DataFrame
+                                    ('model_name' and 'score', best first) or a score vector;
+                                    or a (k x n) score matrix (e.g. from rank_batch).
+        names (array-like, optional): Name of each alternative. Defaults to the names of the first
+                                      LazyRanking or DataFrame.
+        ascending (bool or dict, optional): Whether lower scores are preferred, overriding the direction
+                                            of LazyRanking and DataFrame inputs (default: higher is better).
+        top_k (int): Size of the tops compared by the overlap matrix.
+        copeland (bool, optional): Compute the O(k * n^2) Copeland scores. Defaults to n <= COPELAND_MAX_N.
+
+    Returns:
+        dict: 'kendall', 'spearman' and 'overlap' (DataFrames indexed by method),
+              'ranks' (ndarray, k x n average ranks) and 'consensus' (DataFrame with columns 'model_name',
+              'borda', 'borda_rank' and, if computed, 'copeland' and 'copeland_rank', sorted by Borda score).
+
+    Raises:
+        ValueError: If fewer than two rankings are given or they cover different numbers of alternatives.
+    """
+    import pandas as pd
+    if not isinstance(rankings, dict):
+        rankings = {f"ranking_{i}": scores for i, scores in enumerate(np.atleast_2d(rankings))}
+    methods = list(rankings)
+    if len(methods) < 2:
+        raise ValueError("At least two rankings are needed for a comparison.")
+    if names is None:
+        first = next((r for r in rankings.values() if isinstance(r, (LazyRanking, pd.DataFrame))), None)
+        if isinstance(first, LazyRanking):
+            names = first.names(np.arange(len(first)))
+        elif isinstance(first, pd.DataFrame):
+            names = first["model_name"].to_numpy()
+    vectors, directions = zip(*(_scores_of(rankings[method], names) for method in methods))
+    if len({len(v) for v in vectors}) != 1:
+        raise ValueError("Rankings must cover the same alternatives.")
+    if isinstance(ascending, dict):
+        directions = [ascending.get(method, d) for method, d in zip(methods, directions)]
+    elif ascending is not None:
+        directions = [ascending] * len(methods)
+    S = np.vstack(vectors)
+    n = S.shape[1]
+    if names is None:
+        names = np.arange(n)
+
+    R = average_ranks(S, directions)
+    consensus = pd.DataFrame({"model_name": np.asarray(names), "borda": borda_scores(R)})
+    consensus["borda_rank"] = average_ranks(consensus["borda"].to_numpy())
+    if copeland is None:
+        copeland = n <= COPELAND_MAX_N
+    if copeland:
+        consensus["copeland"] = copeland_scores(R)
+        consensus["copeland_rank"] = average_ranks(consensus["copeland"].to_numpy())
+    consensus = consensus.iloc[np.argsort(consensus["borda_rank"].to_numpy(), kind="stable")].reset_index(drop=True)
+
+    def frame(matrix):
+        return pd.DataFrame(matrix, index=methods, columns=methods)
+
+    return {
+        "kendall": frame(kendall_matrix(R)),
+        "spearman": frame(spearman_matrix(R)),
+        "overlap": frame(top_k_overlap_matrix(R, top_k)),
+        "ranks": R,
+        "consensus": consensus,
+    }
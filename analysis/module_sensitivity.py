@@ -0,0 +1,255 @@
+# module_sensitivity.py
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from common_utils import as_decision_matrix
+from ranking.module_batch import BATCH_METHODS, build_batch_kernel
+from ranking.module_promethee import compute_promethee_kernel_flows
+
+# State of a sensitivity pool worker process (decision matrix and scoring kernels), set by _init_worker.
+# The in-process path passes them explicitly instead (see _score_chunk).
+_WORKER = {}
+
+
+def sample_weights(base_weights, n_samples, rng, sampler="dirichlet", concentration=100.0, delta=0.1):
+    """
+    Sample weight vectors around a reference weight vector.
+    - "dirichlet": w ~ Dirichlet(concentration * base), whose mean is the base weights.
+    - "perturb": w_j = base_j * (1 + u_j) with u_j ~ Uniform(-delta, delta), renormalized to sum to 1.
+
+    Args:
+        base_weights (ndarray): Reference weights (shape: m).
+        n_samples (int): Number of weight vectors to draw.
+        rng (Generator): NumPy random generator.
+        sampler (str): "dirichlet" or "perturb".
+        concentration (float): Dirichlet concentration; larger values stay closer to the base weights.
+        delta (float): Maximum relative perturbation of each weight for the "perturb" sampler.
+
+    Returns:
+        ndarray: Sampled weights (shape: n_samples x m), each row summing to 1.
+
+    Raises:
+        ValueError: If the sampler is unknown.
+    """
+    base = np.asarray(base_weights, dtype=float)
+    base = base / base.sum()
+    if sampler == "dirichlet":
+        return rng.dirichlet(np.maximum(base, 1e-6) * concentration, size=n_samples)
+    if sampler == "perturb":
+        W = base * (1.0 + rng.uniform(-delta, delta, size=(n_samples, base.shape[0])))
+        return W / W.sum(axis=1, keepdims=True)
+    raise ValueError(f"Unknown weight sampler '{sampler}'. Choose 'dirichlet' or 'perturb'.")
+
+
+def _ranks(scores, ascending):
+    """Return the order (best first) and the 0-based rank of every alternative for each row of scores."""
+    keys = scores if ascending else -scores
+    order = np.argsort(keys, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(order.shape[1]), axis=1)
+    return order, ranks
+
+
+def _build_kernels(dm, methods, kernel_params):
+    return {method: build_batch_kernel(dm, method, **kernel_params) for method in methods}
+
+
+def _init_worker(dm, methods, kernel_params):
+    """Pool initializer: build the decision matrix kernels once per worker process."""
+    _WORKER["dm"] = dm
+    _WORKER["kernels"] = _build_kernels(dm, methods, kernel_params)
+
+
+def _empty_stats(n, max_rank, top):
+    return {
+        "samples": 0,
+        "rank_sum": np.zeros(n),
+        "rank_sq_sum": np.zeros(n),
+        "rank_min": np.full(n, n, dtype=np.int64),
+        "rank_max": np.zeros(n, dtype=np.int64),
+        "acceptability": np.zeros((n, max_rank), dtype=np.int64),
+        "reversal": np.zeros((top, top), dtype=np.int64),
+        "reversed_samples": 0,
+    }
+
+
+def _merge_stats(total, part):
+    for key in ("samples", "rank_sum", "rank_sq_sum", "acceptability", "reversal", "reversed_samples"):
+        total[key] += part[key]
+    np.minimum(total["rank_min"], part["rank_min"], out=total["rank_min"])
+    np.maximum(total["rank_max"], part["rank_max"], out=total["rank_max"])
+    return total
+
+
+def _score_chunk(dm, kernels, task):
+    """
+    Sample one chunk of weight vectors, rank them with every method and reduce the ranks to
+    fixed-size counters, so memory never depends on the total number of samples.
+    All methods are evaluated on the same sampled weights.
+    """
+    seed, n_samples, base_weights, sampler_params, base_top, max_rank = task
+    n = dm.shape[0]
+    W = sample_weights(base_weights, n_samples, np.random.default_rng(seed), **sampler_params).astype(dm.dtype)
+    stats = {}
+    for method, (kernel, ascending) in kernels.items():
+        order, ranks = _ranks(kernel(W), ascending)
+        top_ranks = ranks[:, base_top[method]]
+        part = {
+            "samples": n_samples,
+            "rank_sum": ranks.sum(axis=0).astype(float),
+            "rank_sq_sum": (ranks.astype(float) ** 2).sum(axis=0),
+            "rank_min": ranks.min(axis=0),
+            "rank_max": ranks.max(axis=0),
+            "acceptability": np.stack([np.bincount(order[:, r], minlength=n) for r in range(max_rank)], axis=1),
+            "reversal": (top_ranks[:, :, None] > top_ranks[:, None, :]).sum(axis=0),
+            # A sample reverses the reference top list if the list is no longer in increasing rank order
+            "reversed_samples": int((np.diff(top_ranks, axis=1) < 0).any(axis=1).sum()),
+        }
+        stats[method] = part
+    return stats
+
+
+def _run_chunk(task):
+    """Score one chunk in a pool worker, with the kernels built by _init_worker."""
+    return _score_chunk(_WORKER["dm"], _WORKER["kernels"], task)
+
+
+def _bounded_map(executor, func, tasks, max_pending):
+    """
+    Ordered executor.map that submits at most max_pending tasks ahead of the consumer, so the results
+    finished out of order never pile up.
+    """
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(func, task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def _summarize(dm, stats, base_order):
+    """Convert the accumulated counters of one method into probabilities and summary statistics."""
+    import pandas as pd
+    k = max(stats["samples"], 1)
+    mean = stats["rank_sum"] / k
+    std = np.sqrt(np.maximum(stats["rank_sq_sum"] / k - mean ** 2, 0.0))
+    base_rank = np.empty(dm.shape[0], dtype=np.int64)
+    base_rank[base_order] = np.arange(dm.shape[0])
+    table = pd.DataFrame({
+        "model_name": dm.alternatives,
+        "base_rank": base_rank + 1,
+        "mean_rank": mean + 1,
+        "std_rank": std,
+        "min_rank": stats["rank_min"] + 1,
+        "max_rank": stats["rank_max"] + 1,
+    })
+    acceptability = stats["acceptability"] / k
+    for r in range(acceptability.shape[1]):
+        table[f"acceptability_{r + 1}"] = acceptability[:, r]
+    table = table.sort_values(by="base_rank").reset_index(drop=True)
+    top = base_order[:stats["reversal"].shape[0]]
+    return {
+        "samples": stats["samples"],
+        "table": table,
+        "acceptability": acceptability,
+        "top": dm.alternatives[top].tolist(),
+        # reversal[i, j] = P(the reference i-th alternative is ranked below the reference j-th one), i < j
+        "reversal": np.triu(stats["reversal"] / k, k=1),
+        "reversal_probability": stats["reversed_samples"] / k,
+    }
+
+
+def iter_sensitivity(df, criteria_columns, weights, criteria_type, methods=BATCH_METHODS, n_samples=10000,
+                     chunk_size=1000, sampler="dirichlet", concentration=100.0, delta=0.1, seed=0, top=10,
+                     max_rank=None, n_workers=1, lambda_val=0.5, v=0.5):
+    """
+    Run a Monte Carlo weight-sensitivity analysis and stream the results chunk by chunk.
+    Weight vectors are sampled around the reference weights, ranked with the batch kernels of every
+    method and reduced to fixed-size counters, so memory is bounded by the chunk size, not n_samples.
+    Each chunk gets its own child seed of seed, so results do not depend on n_workers.
+
+    Args:
+        df (DataFrame or DecisionMatrix): Original dataset.
+        criteria_columns (list): List of criteria column names.
+        weights (dict): Reference criteria weights (e.g. from the entropy or AHP method).
+        criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
+        methods (tuple): Ranking methods to analyse (default: all six).
+        n_samples (int): Total number of sampled weight vectors.
+        chunk_size (int): Number of weight vectors per chunk.
+        sampler (str): "dirichlet" or "perturb" (see sample_weights).
+        concentration (float): Dirichlet concentration.
+        delta (float): Maximum relative perturbation for the "perturb" sampler.
+        seed (int): Seed of the random generator.
+        top (int): Number of best alternatives (of the reference ranking) checked for rank reversal.
+        max_rank (int, optional): Number of ranks with acceptability indices (defaults to top).
+        n_workers (int): Number of worker processes (1 runs in the current process).
+        lambda_val (float): WASPAS balancing parameter.
+        v (float): VIKOR strategy weight.
+
+    Yields:
+        dict: Summary per method (see run_sensitivity) over all samples processed so far.
+    """
+    dm = as_decision_matrix(df, criteria_columns, criteria_type)
+    n = dm.shape[0]
+    top = min(top, n)
+    max_rank = min(max_rank or top, n)
+    base_weights = dm.weight_vector(weights).astype(float)
+    kernel_params = {"lambda_val": lambda_val, "v": v}
+    if "promethee" in methods:
+        # The O(n^2) pairwise flows are computed once here and sent to the workers, not rebuilt by each of them
+        kernel_params["flows"] = compute_promethee_kernel_flows(dm)
+    sampler_params = {"sampler": sampler, "concentration": concentration, "delta": delta}
+
+    # Reference ranking of every method under the unperturbed weights
+    kernels = _build_kernels(dm, methods, kernel_params)
+    base_orders = {}
+    for method, (kernel, ascending) in kernels.items():
+        base_orders[method] = _ranks(kernel(base_weights[None, :].astype(dm.dtype)), ascending)[0][0]
+    base_top = {method: order[:top] for method, order in base_orders.items()}
+
+    sizes = [min(chunk_size, n_samples - start) for start in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = ((child, size, base_weights, sampler_params, base_top, max_rank) for child, size in zip(seeds, sizes))
+    totals = {method: _empty_stats(n, max_rank, top) for method in methods}
+
+    def reduce(chunk_results):
+        for chunk_stats in chunk_results:
+            for method, part in chunk_stats.items():
+                _merge_stats(totals[method], part)
+            yield {method: _summarize(dm, totals[method], base_orders[method]) for method in methods}
+
+    if n_workers <= 1:
+        yield from reduce(_score_chunk(dm, kernels, task) for task in tasks)
+        return
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                             initargs=(dm, methods, kernel_params)) as executor:
+        # At most two chunks per worker in flight: memory stays bounded by the chunk size
+        yield from reduce(_bounded_map(executor, _run_chunk, tasks, 2 * n_workers))
+
+
+def run_sensitivity(df, criteria_columns, weights, criteria_type, **kwargs):
+    """
+    Run a Monte Carlo weight-sensitivity and rank-reversal analysis (see iter_sensitivity for the parameters).
+
+    Args:
+        df (DataFrame or DecisionMatrix): Original dataset.
+        criteria_columns (list): List of criteria column names.
+        weights (dict): Reference criteria weights.
+        criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
+        **kwargs: Options forwarded to iter_sensitivity.
+
+    Returns:
+        dict: For each method, a dict with
+              'table' (DataFrame: base, mean, std, min and max rank and rank acceptability indices per alternative),
+              'acceptability' (ndarray, n x max_rank: SMAA rank acceptability indices),
+              'top' (model names of the reference top alternatives),
+              'reversal' (ndarray, top x top: P(the reference i-th alternative falls below the j-th one), i < j),
+              'reversal_probability' (float: share of samples in which the reference top order changes),
+              'samples' (int).
+    """
+    summary = {}
+    for summary in iter_sensitivity(df, criteria_columns, weights, criteria_type, **kwargs):
+        pass
+    return summary
@@ -1,19 +1,255 @@
 # app.py
 import argparse
+import atexit
 import os
 import io
-import base64
+import json
+import threading
 import time
-import pandas as pd
-import matplotlib.pyplot as plt
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file
+import uuid
+from collections import OrderedDict
+import numpy as np
+from flask import (Flask, Response, g, render_template, request, redirect, url_for, flash, send_file, abort, jsonify,
+                   stream_with_context)
 
-# Import our MCDM modules
-from weights import *
-from ranking import *
+# Import our MCDM modules (pandas and matplotlib are only loaded by the first request that needs them)
+from weights import compute_ahp_weights_from_excel, compute_entropy_weights
+from ranking import available_methods
+from common_utils import DecisionMatrix
+from dataio import criteria_type_from_schema, is_binary_dataset, read_decision_matrix_bytes, shared_decision_matrix
+from analysis import compare_rankings
+from services import (get_executor, run_ranking_methods, submit_background, wait_background,
+                      render_weights_pie, render_times_bar, ResultCache, make_key, JobQueue, EXPORT_FORMATS,
+                      ensure_export, export_path, export_rankings)
+from services.module_api import api
+from instrumentation import Capture, get_metrics, instrumented, is_enabled, prometheus_metrics
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'  # Replace with your own secret key
+# Pool used to run the ranking methods concurrently: "thread" or "process", and its number of workers
+app.config["RANKING_EXECUTOR"] = os.environ.get("MCDM_EXECUTOR", "thread")
+app.config["RANKING_WORKERS"] = int(os.environ.get("MCDM_WORKERS", 0)) or None
+# Floating point type of the decision matrices ("float64", or "float32" to halve their memory, see FLOAT32_RTOL)
+app.config["PRECISION"] = os.environ.get("MCDM_PRECISION", "float64")
+# Allow cProfile/tracemalloc captures of single requests (?profile=cpu|memory|all), see /metrics/profiles/<id>
+app.config["PROFILING"] = os.environ.get("MCDM_PROFILING", "0").lower() in ("1", "true", "yes")
+# Publish every loaded decision matrix in shared memory, so that all worker processes rank against one copy
+app.config["SHARED_MEMORY"] = os.environ.get("MCDM_SHARED_MEMORY", "0").lower() in ("1", "true", "yes")
+# Directory of the combined ranking exports, and their retention: files unused for EXPORT_MAX_AGE seconds
+# are removed, then the oldest ones until the directory holds at most EXPORT_MAX_BYTES of exports
+app.config["EXPORT_DIR"] = os.environ.get("MCDM_EXPORT_DIR", os.path.join("static", "results"))
+app.config["EXPORT_MAX_AGE"] = float(os.environ.get("MCDM_EXPORT_MAX_AGE_HOURS", 24)) * 3600
+app.config["EXPORT_MAX_BYTES"] = int(os.environ.get("MCDM_EXPORT_MAX_MB", 512)) * 1024 * 1024
+
+# Content-addressed cache of parsed datasets, weights and rankings (optional on-disk tier: MCDM_CACHE_DIR)
+result_cache = ResultCache(max_entries=int(os.environ.get("MCDM_CACHE_ENTRIES", 128)),
+                           max_bytes=int(os.environ.get("MCDM_CACHE_MB", 256)) * 1024 * 1024,
+                           disk_dir=os.environ.get("MCDM_CACHE_DIR") or None)
+app.extensions["result_cache"] = result_cache
+
+# Local queue of the ranking jobs started by the web form (MCDM_JOB_WORKERS jobs run at the same time);
+# finished results are kept in the result cache
+job_queue = JobQueue(workers=int(os.environ.get("MCDM_JOB_WORKERS", 2)), result_cache=result_cache)
+app.extensions["job_queue"] = job_queue
+# Seconds between keep-alive comments of an idle job event stream
+JOB_EVENTS_KEEPALIVE = 15
+
+# Reports of the last MAX_PROFILES profiled requests and jobs
+MAX_PROFILES = 32
+PROFILE_MODES = {"cpu": (True, False), "memory": (False, True), "all": (True, True)}
+profile_reports = OrderedDict()
+profile_reports_lock = threading.Lock()
+
+def store_profile(profile_id, report):
+    """Keep the report of a profiled request or job (the oldest reports are dropped)."""
+    with profile_reports_lock:
+        profile_reports[profile_id] = report
+        while len(profile_reports) > MAX_PROFILES:
+            profile_reports.popitem(last=False)
+
+# JSON REST API (/api/v1/rank, /api/v1/weights)
+app.register_blueprint(api)
+
+@instrumented("dataset.load")
+def load_dataset(csv_bytes, dtype=np.float64, shared_name=None):
+    """
+    Parse an uploaded CSV file and build its decision matrix.
+    Criteria are all columns except 'model_name', typed with the criterion schema (see criteria_type_from_schema).
+    A binary dataset (see 'main.py convert') is used without parsing, with the criteria types stored in it.
+
+    Args:
+        csv_bytes (bytes): Contents of the CSV or binary dataset file.
+        dtype (type): Floating point type of the decision matrix (np.float64 or np.float32).
+        shared_name (str, optional): Shared memory block of the decision matrix: attached if another worker
+                                     process already published it, otherwise published by this one.
+
+    Returns:
+        tuple: (DataFrame view of the criteria values, DecisionMatrix).
+    """
+    import pandas as pd
+    if shared_name is not None:
+        dm = shared_decision_matrix(shared_name, lambda: load_dataset(csv_bytes, dtype)[1])
+        if dm.owner:
+            atexit.register(dm.unlink)
+    elif is_binary_dataset(csv_bytes):
+        dm = read_decision_matrix_bytes(csv_bytes).astype(dtype)
+    else:
+        df = pd.read_csv(io.BytesIO(csv_bytes))
+        # Define criteria columns (all columns except 'model_name')
+        criteria_columns = [col for col in df.columns if col != "model_name"]
+
+        # Criterion types come from the declarative schema (see dataio.module_preprocess)
+        dm = DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type_from_schema(criteria_columns), dtype)
+    # The parsed DataFrame is dropped: only the decision matrix is kept (and cached)
+    return pd.DataFrame(dm.values, columns=dm.criteria_columns, copy=False), dm
+
+def run_ranking_job(job, csv_bytes, weight_method, pairwise_bytes, method_params, profile=None, inline=False):
+    """
+    Background job of the results page: parse the dataset, compute the weights, run every ranking method,
+    start the XLSX exports and build the results page context.
+    Progress is reported on job: the current stage, and the completed fraction of every ranking method
+    (PROMETHEE also reports its row blocks when the methods run in threads).
+
+    Args:
+        job (Job): The job, receiving the progress reports.
+        csv_bytes (bytes): Contents of the CSV or binary dataset file.
+        weight_method (str): "ahp" or "entropy".
+        pairwise_bytes (bytes or None): Contents of the AHP pairwise comparison workbook.
+        method_params (dict): Mapping of method labels to their parameters.
+        profile (str, optional): "cpu", "memory" or "all": capture the job with cProfile and/or tracemalloc
+                                 (the ranking methods then run in the job thread); the report is served
+                                 at /metrics/profiles/<job id>.
+        inline (bool): Run the ranking methods in the job thread instead of RANKING_EXECUTOR.
+
+    Returns:
+        dict: Context of the results.html template.
+
+    Raises:
+        ValueError: If the dataset or the pairwise matrix cannot be read.
+    """
+    if profile is not None:
+        cpu, memory = PROFILE_MODES[profile]
+        capture = Capture(cpu, memory)
+        try:
+            with capture:
+                return run_ranking_job(job, csv_bytes, weight_method, pairwise_bytes, method_params, inline=True)
+        finally:
+            store_profile(job.id, capture.report())
+
+    ranking_methods = {method.label: method for method in available_methods()}
+    job.track(*ranking_methods)
+
+    # Parse the dataset, or reuse it if the identical file was uploaded before
+    job.set_stage("loading")
+    precision = app.config["PRECISION"]
+    dataset_key = make_key("dataset", csv_bytes, precision)
+    shared_name = f"mcdm-{dataset_key[:24]}" if app.config["SHARED_MEMORY"] else None
+    try:
+        _, dm = result_cache.get_or_compute(dataset_key, lambda: load_dataset(csv_bytes, precision, shared_name))
+    except Exception as e:
+        raise ValueError("Error reading CSV file: " + str(e))
+    criteria_columns, criteria_type = dm.criteria_columns, dm.criteria_type
+
+    # Compute weights and measure execution time for weight computation
+    job.set_stage("weights")
+    start_weight = time.perf_counter()
+    try:
+        if weight_method == "ahp":
+            # Read the uploaded pairwise file from memory using BytesIO
+            weights_key = make_key("weights", "ahp", pairwise_bytes)
+            weights = result_cache.get_or_compute(
+                weights_key, lambda: compute_ahp_weights_from_excel(io.BytesIO(pairwise_bytes)))
+        else:
+            weights_key = make_key("weights", "entropy", dataset_key)
+            weights = result_cache.get_or_compute(
+                weights_key, lambda: compute_entropy_weights(dm, criteria_columns, criteria_type))
+    except Exception as e:
+        raise ValueError("Error computing weights: " + str(e))
+    end_weight = time.perf_counter()
+    weight_time = end_weight - start_weight
+
+    ranking_results = {}
+
+    # Reuse cached rankings of this dataset, weights and parameters; execute the missing algorithms
+    # concurrently (each execution time is measured inside its worker).
+    job.set_stage("ranking")
+    ranking_keys = {method_name: make_key("ranking", dataset_key, weights_key, method_name,
+                                          sorted(method_params.get(method_name, {}).items()))
+                    for method_name in ranking_methods}
+    ranked = {method_name: result_cache.get(key) for method_name, key in ranking_keys.items()}
+    for method_name, value in ranked.items():
+        if value is not None:
+            job.set_progress(method_name, 1.0)
+    missing = {method_name: ranking_methods[method_name] for method_name, value in ranked.items() if value is None}
+    if missing:
+        executor = None if inline else get_executor(app.config["RANKING_EXECUTOR"], app.config["RANKING_WORKERS"])
+        # Lazy rankings: the page only needs the top 10; the full sort is done by the background export
+        run_params = {method_name: dict(method_params.get(method_name, {}), lazy=True) for method_name in missing}
+        if inline or app.config["RANKING_EXECUTOR"] == "thread":
+            # Progress callbacks cannot be sent to worker processes
+            for method_name, method in missing.items():
+                if method.progress:
+                    run_params[method_name]["progress"] = (
+                        lambda fraction, name=method_name: job.set_progress(name, fraction))
+        results = run_ranking_methods(executor, dm, weights, missing, run_params,
+                                      on_complete=lambda name: job.set_progress(name, 1.0))
+        for method_name, value in results.items():
+            result_cache.set(ranking_keys[method_name], value)
+            ranked[method_name] = value
+    ranking_times = {method_name: ranking_time for method_name, (_, ranking_time) in ranked.items()}
+
+    # Render the weights pie chart and the execution time bar chart, or reuse them: they are cached under the
+    # keys of the weights and rankings they show, and the page loads them from /chart/<token>/<name>.
+    job.set_stage("charts")
+    token = make_key("chart", weights_key, [(ranking_keys[method_name], ranking_times[method_name])
+                                            for method_name in ranked])[:32]
+    result_cache.get_or_compute(make_key("chart", token, "weights"), lambda: render_weights_pie(weights))
+    result_cache.get_or_compute(make_key("chart", token, "times"), lambda: render_times_bar(ranking_times))
+
+    # Record the top 10 results & execution time of each algorithm.
+    for method_name, (result_df, _) in ranked.items():
+        top_10 = result_df.head(10).copy()
+        scores = top_10['score']
+        mean_score = scores.mean()
+        std_score = scores.std()
+        cv_value = (std_score / mean_score) if mean_score != 0 else 0.0
+
+        # Convert to HTML
+        table_html = top_10.to_html(classes="table table-striped", index=False)
+
+        # Store results along with CV
+        ranking_results[method_name] = {
+            'table': table_html,
+            'CV': cv_value
+        }
+
+    # Export the full rankings of all methods as one CSV file, in the background. The file is named after
+    # the cache keys of the rankings: identical requests share it and different ones never overwrite it.
+    export_id = make_key("export", [ranking_keys[method_name] for method_name in ranked])[:32]
+    export_file = export_path(app.config["EXPORT_DIR"], export_id)
+    submit_background(export_file, export_rankings, app.config["EXPORT_DIR"], export_id,
+                      {method_name: result_df for method_name, (result_df, _) in ranked.items()},
+                      app.config["EXPORT_MAX_AGE"], app.config["EXPORT_MAX_BYTES"])
+
+    # Agreement between the methods (Kendall tau-b, Spearman rho, top-10 overlap) and consensus rankings
+    job.set_stage("consensus")
+    comparison = compare_rankings({method_name: result_df for method_name, (result_df, _) in ranked.items()})
+    correlation_tables = {
+        "Kendall's tau-b": comparison["kendall"].round(3).to_html(classes="table table-sm table-bordered"),
+        "Spearman's rho": comparison["spearman"].round(3).to_html(classes="table table-sm table-bordered"),
+        "Top-10 overlap": comparison["overlap"].round(2).to_html(classes="table table-sm table-bordered"),
+    }
+    consensus_html = comparison["consensus"].head(10).to_html(classes="table table-striped", index=False)
+
+    return dict(correlation_tables=correlation_tables,
+                consensus=consensus_html,
+                weights=weights,
+                weight_time=weight_time,
+                ranking_results=ranking_results,
+                ranking_times=ranking_times,
+                chart_token=token,
+                export_id=export_id,
+                export_formats=list(EXPORT_FORMATS))
 
 @app.route("/", methods=["GET", "POST"])
 def index():
@@ -23,152 +259,155 @@ def index():
         
         # Retrieve the main dataset file: cleaned_samsung_phones.csv
         csv_file = request.files.get("csv_file")
-        if csv_file and csv_file.filename != "":
-            try:
-                df = pd.read_csv(csv_file)
-            except Exception as e:
-                flash("Error reading CSV file: " + str(e))
-                return redirect(request.url)
-        else:
+        if not csv_file or csv_file.filename == "":
             flash("Please upload the 'cleaned_samsung_phones.csv' file.")
             return redirect(request.url)
+        csv_bytes = csv_file.read()
         
         # If AHP is selected, retrieve the pairwise matrix file
+        pairwise_bytes = None
         if weight_method == "ahp":
             pairwise_file = request.files.get("pairwise_file")
             if not pairwise_file or pairwise_file.filename == "":
                 flash("Please upload the 'pairwise_matrix.xlsx' file for AHP weight computation.")
                 return redirect(request.url)
-        
-        # Define criteria columns (all columns except 'model_name')
-        criteria_columns = [col for col in df.columns if col != "model_name"]
-        
-        # Define criteria type: if column name contains 'price', treat it as cost; otherwise, benefit.
-        criteria_type = {}
-        for col in criteria_columns:
-            if "price" in col.lower():
-                criteria_type[col] = "cost"
-            else:
-                criteria_type[col] = "benefit"
-        
-        # Compute weights and measure execution time for weight computation
-        start_weight = time.perf_counter()
+            pairwise_bytes = pairwise_file.read()
+
+        # Every registered ranking method runs, with its default parameters overridden by the form fields
         try:
-            if weight_method == "ahp":
-                # Read the uploaded pairwise file from memory using BytesIO
-                pairwise_bytes = pairwise_file.read()
-                pairwise_io = io.BytesIO(pairwise_bytes)
-                weights = compute_ahp_weights_from_excel(pairwise_io)
-            else:
-                weights = compute_entropy_weights(df, criteria_columns, criteria_type)
-        except Exception as e:
-            flash("Error computing weights: " + str(e))
+            method_params = {method.label: dict(method.defaults(), **method.parse_params(request.form))
+                             for method in available_methods()}
+        except ValueError as e:
+            flash(str(e))
             return redirect(request.url)
-        end_weight = time.perf_counter()
-        weight_time = end_weight - start_weight
-        
-        # Define ranking methods to execute (all methods)
-        ranking_methods = {
-            "WSM": rank_wsm,
-            "WPM": rank_wpm,
-            "WASPAS": rank_waspas,
-            "TOPSIS": rank_topsis,
-            "PROMETHEE": rank_promethee,
-            "VIKOR": rank_vikor
-        }
-        ranking_results = {}
-        ranking_times = {}
 
-        # Directory to save full ranking files
-        output_folder = os.path.join("static", "results")
-        os.makedirs(output_folder, exist_ok=True)
-        
-        # Execute each ranking algorithm and record the top 10 results & execution time.
-        for method_name, func in ranking_methods.items():
-            start_rank = time.perf_counter()
-            # For WASPAS and VIKOR, we pass a default parameter.
-            if method_name == "WASPAS":
-                result_df = func(df, criteria_columns, weights, criteria_type, lambda_val=0.5)
-            elif method_name == "VIKOR":
-                result_df = func(df, criteria_columns, weights, criteria_type, v=0.5)
-            else:
-                result_df = func(df, criteria_columns, weights, criteria_type)
-            end_rank = time.perf_counter()
-            ranking_time = end_rank - start_rank
-
-            top_10 = result_df.head(10).copy()
-            scores = top_10['score']
-            mean_score = scores.mean()
-            std_score = scores.std()
-            cv_value = (std_score / mean_score) if mean_score != 0 else 0.0
-
-            # Convert to HTML
-            table_html = top_10.to_html(classes="table table-striped", index=False)
-
-            # Save full ranking to excel file for download
-            filename = f"{weight_method}_{method_name}_full_ranking.xlsx"
-            filepath = os.path.join(output_folder, filename)
-            result_df.to_excel(filepath, index=False)
-
-            # Store results along with CV
-            ranking_results[method_name] = {
-                'table': table_html,
-                'CV': cv_value,
-                'download': filename
-            }
-            ranking_times[method_name] = ranking_time
-        
-        # Create a pie chart of criteria weights using matplotlib
-        fig1, ax1 = plt.subplots()
-        labels = list(weights.keys())
-        sizes = list(weights.values())
-        print(weights)
-        ax1.pie(sizes, labels=labels, autopct='%1.2f%%', startangle=90)
-        ax1.axis('equal')
-        pie_chart = io.BytesIO()
-        plt.savefig(pie_chart, format='png')
-        pie_chart.seek(0)
-        pie_chart_base64 = base64.b64encode(pie_chart.read()).decode('utf-8')
-        plt.close(fig1)
-        
-        # Create a bar chart comparing ranking algorithm execution times
-        fig2, ax2 = plt.subplots()
-        methods = list(ranking_times.keys())
-        times_list = [ranking_times[m] for m in methods]
-        bars = ax2.bar(methods, times_list, color='skyblue')
-        ax2.set_ylabel("Execution Time (seconds)")
-        ax2.set_title("Ranking Algorithms Execution Time Comparison")
-
-        # Annotate each bar with the execution time
-        for bar in bars:
-            height = bar.get_height()
-            ax2.text(bar.get_x() + bar.get_width() / 2, height + 0.001, f"{height:.6f}",
-                    ha='center', va='bottom')
-
-        # Save the bar chart to a bytes buffer
-        bar_chart = io.BytesIO()
-        plt.savefig(bar_chart, format='png')
-        bar_chart.seek(0)
-        bar_chart_base64 = base64.b64encode(bar_chart.read()).decode('utf-8')
-        plt.close(fig2)
+        # Optional cProfile/tracemalloc capture of the job (?profile=cpu|memory|all, when PROFILING is on)
+        profile = request.values.get("profile") if app.config["PROFILING"] else None
+        if profile is not None and profile not in PROFILE_MODES:
+            flash(f"Unknown profile mode '{profile}' (expected one of: {', '.join(PROFILE_MODES)}).")
+            return redirect(request.url)
 
-        
-        # Render the results page with weights pie chart, top 10 ranking tables, and ranking time bar chart.
-        return render_template("results.html",
-                               weights=weights,
-                               weight_time=weight_time,
-                               ranking_results=ranking_results,
-                               ranking_times=ranking_times,
-                               pie_chart=pie_chart_base64,
-                               bar_chart=bar_chart_base64)
-    return render_template("index.html")
-
-# Route for downloading full ranking file
-@app.route('/download/<method>')
-def download_file(method):
-    filename = f"{method}_full_ranking.xlsx"
-    filepath = os.path.join("static", "results", filename)
-    return send_file(filepath, as_attachment=True)
+        # The ranking runs as a background job: the request returns at once and the job page follows its progress
+        job = job_queue.submit(run_ranking_job, csv_bytes, weight_method, pairwise_bytes, method_params,
+                               profile=profile)
+        return redirect(url_for("job_page", job_id=job.id))
+    return render_template("index.html", methods=[method.label for method in available_methods()])
+
+# Job page: progress while the job runs, then the results page (re-rendered from the stored result)
+@app.route('/jobs/<job_id>')
+def job_page(job_id):
+    job = job_queue.get(job_id)
+    if job is None or job.state == "done":
+        result = job_queue.result(job_id)
+        if result is not None:
+            return render_template("results.html", **result)
+        if job is None:
+            abort(404)
+    return render_template("job.html", job=job.snapshot())
+
+# Route for polling the status of a job
+@app.route('/jobs/<job_id>/status')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        if job_queue.result(job_id) is None:
+            abort(404)
+        return jsonify({"id": job_id, "state": "done"})
+    return jsonify(job.snapshot())
+
+# Route streaming the status of a job as server-sent events, until it finishes
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        abort(404)
+
+    def generate():
+        version = -1
+        while True:
+            status = job.wait(version, timeout=JOB_EVENTS_KEEPALIVE)
+            if status["version"] == version and status["state"] not in ("done", "failed"):
+                # Comment line: keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            version = status["version"]
+            yield f"data: {json.dumps(status)}\n\n"
+            if status["state"] in ("done", "failed"):
+                return
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# Route for the cache counters (hits, misses, evictions, size), to size the cache
+@app.route('/cache/stats')
+def cache_stats():
+    return jsonify(result_cache.stats())
+
+# Route for the stage latencies (JSON, or the Prometheus text format with ?format=prometheus)
+@app.route('/metrics')
+def metrics():
+    if request.args.get("format") == "prometheus":
+        return Response(prometheus_metrics(), mimetype="text/plain; version=0.0.4")
+    return jsonify({"enabled": is_enabled(), "stages": get_metrics()})
+
+# Route for the report of a profiled request or job
+@app.route('/metrics/profiles/<profile_id>')
+def profile_report(profile_id):
+    with profile_reports_lock:
+        report = profile_reports.get(profile_id)
+    if report is None:
+        abort(404)
+    return Response(report, mimetype="text/plain")
+
+# Profile single requests (e.g. /api/v1/rank?profile=cpu) when PROFILING is on; the form POST profiles its job instead
+@app.before_request
+def start_profile():
+    mode = request.args.get("profile")
+    if not app.config["PROFILING"] or mode not in PROFILE_MODES or request.endpoint == "index":
+        return
+    g.profile_capture = Capture(*PROFILE_MODES[mode]).__enter__()
+
+@app.after_request
+def stop_profile(response):
+    capture = g.pop("profile_capture", None)
+    if capture is not None:
+        capture.__exit__(None, None, None)
+        profile_id = uuid.uuid4().hex
+        store_profile(profile_id, capture.report())
+        response.headers["X-MCDM-Profile"] = url_for("profile_report", profile_id=profile_id)
+    return response
+
+@app.teardown_request
+def discard_profile(exc):
+    # A request failing with an unhandled error skips after_request: stop its profiler anyway
+    capture = g.pop("profile_capture", None)
+    if capture is not None:
+        capture.__exit__(None, None, None)
+
+# Route for the charts rendered by the ranking jobs
+@app.route('/chart/<token>/<name>')
+def chart(token, name):
+    png = result_cache.get(make_key("chart", token, name))
+    if png is None:
+        abort(404)
+    return send_file(io.BytesIO(png), mimetype='image/png')
+
+# Route for downloading the full rankings of all methods: the CSV export, or its XLSX version built on first download
+@app.route('/download/<export_id>.<fmt>')
+def download_file(export_id, fmt):
+    try:
+        csv_path = export_path(app.config["EXPORT_DIR"], export_id)
+        # Wait for the background export, if it is still being written
+        wait_background(csv_path, timeout=300)
+        path = ensure_export(app.config["EXPORT_DIR"], export_id, fmt)
+    except ValueError as e:
+        abort(400, description=str(e))
+    if path is None:
+        # Never written, or removed by the retention policy: the job has to be submitted again
+        abort(404, description="This export has expired; submit the ranking again.")
+    # send_file streams the file in blocks
+    return send_file(path, mimetype=EXPORT_FORMATS[fmt], as_attachment=True,
+                     download_name=f"mcdm_rankings_{export_id[:8]}.{fmt}")
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=8888)
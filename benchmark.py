@@ -0,0 +1,293 @@
+# benchmark.py
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from weights import compute_ahp_weights_from_excel, compute_entropy_weights
+from weights.module_ahp import clear_workbook_cache
+from ranking import available_methods, get_method
+
+# Every registered ranking method, plus the PROMETHEE flow algorithms timed separately
+RANKING_FUNCTIONS = {f"rank_{method.name}": method.rank for method in available_methods()}
+RANKING_FUNCTIONS["rank_promethee_pairwise"] = partial(get_method("promethee").rank, algorithm="pairwise")
+RANKING_FUNCTIONS["rank_promethee_sampled"] = partial(get_method("promethee").rank, algorithm="sampled")
+WEIGHT_FUNCTIONS = ("compute_entropy_weights", "compute_ahp_weights_from_excel")
+ALL_FUNCTIONS = WEIGHT_FUNCTIONS + tuple(RANKING_FUNCTIONS)
+# Functions whose cost grows with n^2 (pairwise comparisons)
+PAIRWISE_FUNCTIONS = ("rank_promethee_pairwise",)
+
+
+def make_dataset(n, m, seed=0):
+    """
+    Build a synthetic decision matrix: positive random criteria, every third criterion a cost criterion.
+
+    Args:
+        n (int): Number of alternatives.
+        m (int): Number of criteria.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        tuple: (DataFrame, criteria_columns, criteria_type).
+    """
+    rng = np.random.default_rng(seed)
+    criteria_columns = [f"c{j}" for j in range(m)]
+    df = pd.DataFrame(rng.uniform(1.0, 100.0, size=(n, m)), columns=criteria_columns)
+    df.insert(0, "model_name", [f"alt{i}" for i in range(n)])
+    criteria_type = {col: ("cost" if j % 3 == 0 else "benefit") for j, col in enumerate(criteria_columns)}
+    return df, criteria_columns, criteria_type
+
+
+def make_pairwise_file(m, directory, seed=0):
+    """Write a perfectly consistent (CR = 0) m x m pairwise comparison matrix a_ij = w_i / w_j to an Excel file."""
+    rng = np.random.default_rng(seed)
+    w = rng.uniform(1.0, 9.0, size=m)
+    names = [f"c{j}" for j in range(m)]
+    path = os.path.join(directory, f"pairwise_{m}.xlsx")
+    pd.DataFrame(w[:, None] / w[None, :], index=names, columns=names).to_excel(path)
+    return path
+
+
+def _call(function, df, criteria_columns, weights, criteria_type, pairwise_file):
+    if function == "compute_entropy_weights":
+        return compute_entropy_weights(df, criteria_columns, criteria_type)
+    if function == "compute_ahp_weights_from_excel":
+        # Measure the workbook parsing too, not the content-hash cache
+        clear_workbook_cache()
+        return compute_ahp_weights_from_excel(pairwise_file)
+    return RANKING_FUNCTIONS[function](df, criteria_columns, weights, criteria_type)
+
+
+def run_case(function, n, m, repeats=5, warmup=1, seed=0):
+    """
+    Benchmark one function on one synthetic (n x m) dataset.
+    The timed runs are followed by one traced run (tracemalloc) that records the allocation peak,
+    so tracing overhead does not distort the timings.
+
+    Args:
+        function (str): Name of the benchmarked function (see ALL_FUNCTIONS).
+        n (int): Number of alternatives.
+        m (int): Number of criteria.
+        repeats (int): Number of timed runs.
+        warmup (int): Number of untimed runs before the timed ones.
+        seed (int): Seed of the synthetic dataset.
+
+    Returns:
+        dict: Case record with timings (seconds), peak RSS (KiB) and allocation peak (bytes).
+    """
+    record = {"function": function, "n": n, "m": m}
+    df, criteria_columns, criteria_type = make_dataset(n, m, seed)
+    weights = {col: 1.0 / m for col in criteria_columns}
+    with tempfile.TemporaryDirectory() as directory:
+        pairwise_file = make_pairwise_file(m, directory, seed) if function == "compute_ahp_weights_from_excel" else None
+        args = (function, df, criteria_columns, weights, criteria_type, pairwise_file)
+        try:
+            for _ in range(warmup):
+                _call(*args)
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                _call(*args)
+                times.append(time.perf_counter() - start)
+            tracemalloc.start()
+            _call(*args)
+            _, alloc_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        except (ValueError, MemoryError) as e:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            record.update(status="skipped", reason=str(e))
+            return record
+    record.update(
+        status="ok",
+        times=times,
+        min=min(times),
+        median=statistics.median(times),
+        mean=statistics.fmean(times),
+        peak_rss_kb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        alloc_peak_bytes=alloc_peak,
+    )
+    return record
+
+
+def _run_case_args(args):
+    return run_case(*args)
+
+
+def run_benchmark(functions, sizes, criteria, repeats=5, warmup=1, max_pairwise_n=20000, max_cells=50_000_000,
+                  isolate=True, seed=0, progress=None):
+    """
+    Run the benchmark sweep over every (function, n, m) combination.
+
+    Args:
+        functions (list): Names of the benchmarked functions.
+        sizes (list): Numbers of alternatives (n).
+        criteria (list): Numbers of criteria (m).
+        repeats (int): Number of timed runs per case.
+        warmup (int): Number of untimed runs per case.
+        max_pairwise_n (int): Largest n for the O(n^2) functions; larger cases are recorded as skipped.
+        max_cells (int): Largest n * m; larger cases are recorded as skipped.
+        isolate (bool): Run every case in a fresh process, so that peak RSS is measured per case.
+        seed (int): Seed of the synthetic datasets.
+        progress (callable, optional): Called with each finished case record.
+
+    Returns:
+        list: Case records.
+    """
+    results = []
+    for function in functions:
+        for m in criteria:
+            for n in sizes:
+                if function in PAIRWISE_FUNCTIONS and n > max_pairwise_n:
+                    record = {"function": function, "n": n, "m": m, "status": "skipped",
+                              "reason": f"O(n^2) method above --max_pairwise_n={max_pairwise_n}"}
+                elif n * m > max_cells:
+                    record = {"function": function, "n": n, "m": m, "status": "skipped",
+                              "reason": f"n * m above --max_cells={max_cells}"}
+                elif isolate:
+                    with multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+                        record = pool.apply(_run_case_args, ((function, n, m, repeats, warmup, seed),))
+                else:
+                    record = run_case(function, n, m, repeats, warmup, seed)
+                results.append(record)
+                if progress:
+                    progress(record)
+    return results
+
+
+def scaling_exponents(results):
+    """
+    Estimate the empirical complexity exponent k of time ~ n^k (log-log least squares) per function and m.
+    Exponents close to 2 reveal the O(n^2) methods' scaling cliff.
+
+    Args:
+        results (list): Case records.
+
+    Returns:
+        dict: {function: {m: exponent}} for every series with at least two measured sizes.
+    """
+    series = {}
+    for r in results:
+        if r["status"] == "ok" and r["median"] > 0:
+            series.setdefault(r["function"], {}).setdefault(r["m"], []).append((r["n"], r["median"]))
+    exponents = {}
+    for function, by_m in series.items():
+        for m, points in by_m.items():
+            if len(points) >= 2:
+                x = np.log([p[0] for p in points])
+                y = np.log([p[1] for p in points])
+                exponents.setdefault(function, {})[str(m)] = float(np.polyfit(x, y, 1)[0])
+    return exponents
+
+
+def compare_with_baseline(results, baseline, threshold=1.2):
+    """
+    Compare the median timings with a saved baseline report.
+
+    Args:
+        results (list): Case records of the current run.
+        baseline (dict): A report previously written by this script.
+        threshold (float): Ratio current / baseline above which a case is a regression.
+
+    Returns:
+        list: One dict per case present in both runs: function, n, m, baseline, current, ratio, regression.
+    """
+    previous = {(r["function"], r["n"], r["m"]): r for r in baseline.get("results", []) if r.get("status") == "ok"}
+    comparison = []
+    for r in results:
+        old = previous.get((r["function"], r["n"], r["m"]))
+        if r["status"] != "ok" or old is None:
+            continue
+        ratio = r["median"] / old["median"] if old["median"] > 0 else float("inf")
+        comparison.append({"function": r["function"], "n": r["n"], "m": r["m"], "baseline": old["median"],
+                           "current": r["median"], "ratio": ratio, "regression": ratio > threshold})
+    return comparison
+
+
+def _parse_list(text):
+    return [int(float(x)) for x in text.split(",") if x]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MCDM weighting and ranking methods")
+    parser.add_argument("--functions", type=str, default=",".join(ALL_FUNCTIONS),
+                        help="Comma-separated functions to benchmark")
+    parser.add_argument("--sizes", type=str, default="100,1000,10000,100000,1000000",
+                        help="Comma-separated numbers of alternatives (n)")
+    parser.add_argument("--criteria", type=str, default="5,20,200",
+                        help="Comma-separated numbers of criteria (m)")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case")
+    parser.add_argument("--max_pairwise_n", type=int, default=20000, help="Largest n for O(n^2) methods")
+    parser.add_argument("--max_cells", type=int, default=50_000_000, help="Largest n * m per case")
+    parser.add_argument("--no_isolate", action="store_true",
+                        help="Run all cases in this process (faster, but peak RSS is cumulative)")
+    parser.add_argument("--output", type=str, default="benchmark_report.json", help="Path of the JSON report")
+    parser.add_argument("--baseline", type=str, default=None, help="Report of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Slowdown ratio against the baseline reported as a regression")
+    args = parser.parse_args()
+
+    functions = [f for f in args.functions.split(",") if f]
+    unknown = [f for f in functions if f not in ALL_FUNCTIONS]
+    if unknown:
+        parser.error(f"Unknown functions: {', '.join(unknown)}")
+
+    def progress(r):
+        if r["status"] == "ok":
+            print(f"{r['function']:32s} n={r['n']:>8d} m={r['m']:>4d}  median {r['median']:.6f} s  "
+                  f"peak RSS {r['peak_rss_kb'] / 1024:.1f} MiB  alloc peak {r['alloc_peak_bytes'] / 2**20:.1f} MiB")
+        else:
+            print(f"{r['function']:32s} n={r['n']:>8d} m={r['m']:>4d}  skipped ({r['reason']})")
+
+    results = run_benchmark(functions, _parse_list(args.sizes), _parse_list(args.criteria), args.repeats,
+                            args.warmup, args.max_pairwise_n, args.max_cells, not args.no_isolate,
+                            progress=progress)
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+        "scaling": scaling_exponents(results),
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare_with_baseline(results, json.load(f), args.threshold)
+        print("\nComparison with baseline:")
+        for c in report["comparison"]:
+            flag = "REGRESSION" if c["regression"] else ""
+            print(f"{c['function']:32s} n={c['n']:>8d} m={c['m']:>4d}  x{c['ratio']:.2f} {flag}")
+        regressions = [c for c in report["comparison"] if c["regression"]]
+
+    print("\nScaling exponents (time ~ n^k):")
+    for function, by_m in report["scaling"].items():
+        print(f"{function:32s} " + "  ".join(f"m={m}: k={k:.2f}" for m, k in by_m.items()))
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {args.output}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
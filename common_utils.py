@@ -1,51 +1,498 @@
 # common_utils.py
+import csv
+
 import numpy as np
-import pandas as pd
+from instrumentation import instrumented, span
+
+# The core (decision matrices, normalizations, ranking kernels) only needs NumPy: pandas is imported by the
+# functions that build DataFrames, so that a CLI ranking or a binary dataset does not pay for its import.
+
+# Normalizations computed by DecisionMatrix.warm_up by default (the ones read by the ranking methods)
+NORMALIZATIONS = ("min_max", "vector", "log_min_max", "zero_min_max")
+# Largest relative difference between the scores computed from a float32 and a float64 decision matrix
+# (relative to the largest absolute score), measured on 10^5 x 20 matrices for every ranking method
+FLOAT32_RTOL = 1e-3
+
+def _min_max(X, benefit, min_val=None, max_val=None):
+    """
+    Min-max normalize every column of a matrix at once.
+    Constant columns are mapped to 0.
+
+    Args:
+        X (ndarray): Decision matrix (shape: n x m).
+        benefit (ndarray): Boolean mask (shape: m), True for benefit criteria.
+        min_val (ndarray, optional): Column minima (shape: m), e.g. of the whole dataset when X is a chunk.
+        max_val (ndarray, optional): Column maxima (shape: m).
+
+    Returns:
+        ndarray: Normalized values in the range [0, 1].
+    """
+    min_val = X.min(axis=0) if min_val is None else min_val
+    max_val = X.max(axis=0) if max_val is None else max_val
+    span = max_val - min_val
+    numerator = np.where(benefit, X - min_val, max_val - X)
+    out = np.zeros_like(X)
+    np.divide(numerator, span, out=out, where=np.broadcast_to(span != 0, X.shape))
+    return out
+
+def _vector(X, norm=None):
+    """
+    Vector normalize every column of a matrix at once.
+    Columns with a zero norm are mapped to 0.
+
+    Args:
+        X (ndarray): Decision matrix (shape: n x m).
+        norm (ndarray, optional): Column norms (shape: m), e.g. of the whole dataset when X is a chunk.
 
+    Returns:
+        ndarray: The normalized matrix.
+    """
+    norm = np.sqrt((X * X).sum(axis=0)) if norm is None else norm
+    out = np.zeros_like(X)
+    np.divide(X, norm, out=out, where=np.broadcast_to(norm != 0, X.shape))
+    return out
+
+@instrumented("normalize.min_max")
 def normalize_min_max(df, criteria_columns, criteria_type):
     """
     Normalize the data using Min-Max normalization.
     For benefit criteria: (x - min) / (max - min)
     For cost criteria: (max - x) / (max - min)
-    
+
     Args:
         df (DataFrame): The input data.
         criteria_columns (list): List of criteria column names.
         criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
-        
+
     Returns:
         DataFrame: Normalized values in the range [0, 1].
     """
-    df_norm = df.copy()
-    for col in criteria_columns:
-        min_val = df[col].min()
-        max_val = df[col].max()
-        if max_val == min_val:
-            df_norm[col] = 0.0
-        else:
-            if criteria_type.get(col, "benefit") == "benefit":
-                df_norm[col] = (df[col] - min_val) / (max_val - min_val)
-            else:  # cost criterion
-                df_norm[col] = (max_val - df[col]) / (max_val - min_val)
+    X = df[criteria_columns].to_numpy(dtype=float)
+    benefit = np.array([criteria_type.get(col, "benefit") == "benefit" for col in criteria_columns])
+    # Shallow copy: the other columns (e.g. 'model_name') are shared, not duplicated
+    df_norm = df.copy(deep=False)
+    df_norm[criteria_columns] = _min_max(X, benefit)
     return df_norm
 
+@instrumented("normalize.vector")
 def normalize_vector(df, criteria_columns):
     """
     Normalize the data using vector normalization (used in TOPSIS).
     Formula: r_ij = x_ij / sqrt(sum_i(x_ij^2))
-    
+
     Args:
         df (DataFrame): The input data.
         criteria_columns (list): List of criteria column names.
-    
+
     Returns:
         DataFrame: The normalized data.
     """
-    df_norm = df.copy()
-    for col in criteria_columns:
-        norm = np.sqrt((df[col]**2).sum())
-        if norm != 0:
-            df_norm[col] = df[col] / norm
-        else:
-            df_norm[col] = 0.0
+    df_norm = df.copy(deep=False)
+    df_norm[criteria_columns] = _vector(df[criteria_columns].to_numpy(dtype=float))
     return df_norm
+
+class DecisionMatrix:
+    """
+    Decision matrix shared by all ranking methods.
+    The criteria are held as one contiguous (n x m) float array together with a benefit/cost mask,
+    and every normalization is computed lazily once and cached, so several ranking methods
+    can run on the same dataset without copying or re-normalizing it.
+
+    Attributes:
+        values (ndarray): Criteria values (shape: n x m), C-contiguous.
+        criteria_columns (list): List of criteria column names.
+        criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
+        benefit (ndarray): Boolean mask (shape: m), True for benefit criteria.
+        alternatives (ndarray): Name of each alternative (shape: n).
+            Names given as a UTF-8 bytes array (e.g. memory-mapped from a binary dataset) are decoded on first use.
+    """
+
+    def __init__(self, values, criteria_columns, criteria_type=None, alternatives=None, dtype=np.float64):
+        self.values = np.ascontiguousarray(values, dtype=dtype)
+        if self.values.ndim != 2 or self.values.shape[1] != len(criteria_columns):
+            raise ValueError("The decision matrix must have one column per criterion.")
+        self.criteria_columns = list(criteria_columns)
+        criteria_type = criteria_type or {}
+        self.criteria_type = {col: criteria_type.get(col, "benefit") for col in self.criteria_columns}
+        self.benefit = np.array([self.criteria_type[col] == "benefit" for col in self.criteria_columns])
+        if alternatives is None:
+            alternatives = np.arange(self.values.shape[0])
+        if isinstance(alternatives, np.ndarray) and alternatives.dtype.kind == "S":
+            self._alternatives = alternatives
+        else:
+            self._alternatives = np.asarray(alternatives, dtype=object)
+        self._cache = {}
+
+    @classmethod
+    def from_dataframe(cls, df, criteria_columns=None, criteria_type=None, dtype=np.float64,
+                       name_column="model_name"):
+        """
+        Build a decision matrix from a DataFrame.
+
+        Args:
+            df (DataFrame): The input data.
+            criteria_columns (list, optional): Criteria column names. Defaults to every column except name_column.
+            criteria_type (dict, optional): Mapping of criteria names to "benefit" or "cost".
+            dtype (type): Floating point type of the matrix (np.float64 or np.float32).
+            name_column (str): Column holding the alternative names.
+
+        Returns:
+            DecisionMatrix: The decision matrix.
+        """
+        if criteria_columns is None:
+            criteria_columns = [col for col in df.columns if col != name_column]
+        alternatives = df[name_column].to_numpy() if name_column in df.columns else df.index.to_numpy()
+        return cls(df[criteria_columns].to_numpy(dtype=dtype), criteria_columns, criteria_type,
+                   alternatives, dtype)
+
+    @classmethod
+    def from_csv(cls, path, criteria_columns=None, criteria_type=None, dtype=np.float64, name_column="model_name"):
+        """
+        Read a decision matrix from a CSV file with NumPy's C parser (np.loadtxt), without pandas.
+        Files that np.loadtxt cannot parse (e.g. with missing values) are read with pandas.
+
+        Args:
+            path (str): CSV file with a header row.
+            criteria_columns (list, optional): Criteria column names. Defaults to every column except name_column.
+            criteria_type (dict, optional): Mapping of criteria names to "benefit" or "cost".
+            dtype (type): Floating point type of the matrix (np.float64 or np.float32).
+            name_column (str): Column holding the alternative names.
+
+        Returns:
+            DecisionMatrix: The decision matrix.
+
+        Raises:
+            ValueError: If a criteria column is missing from the file.
+        """
+        with open(path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), [])
+        if criteria_columns is None:
+            criteria_columns = [col for col in header if col != name_column]
+        missing = [col for col in criteria_columns if col not in header]
+        if missing:
+            raise ValueError(f"Columns not found in {path}: {', '.join(missing)}")
+        usecols = [header.index(col) for col in criteria_columns]
+        try:
+            values = np.loadtxt(path, dtype=dtype, delimiter=",", skiprows=1, usecols=usecols, quotechar='"',
+                                ndmin=2, encoding="utf-8")
+            alternatives = None
+            if name_column in header:
+                alternatives = np.loadtxt(path, dtype=str, delimiter=",", skiprows=1,
+                                          usecols=header.index(name_column), quotechar='"', ndmin=1,
+                                          encoding="utf-8").astype(object)
+        except ValueError:
+            import pandas as pd
+            return cls.from_dataframe(pd.read_csv(path), criteria_columns, criteria_type, dtype, name_column)
+        return cls(values, criteria_columns, criteria_type, alternatives, dtype)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def alternatives(self):
+        if self._alternatives.dtype.kind == "S":
+            return self._cached("alternatives", lambda: self.names(slice(None)), stage="decode")
+        return self._alternatives
+
+    def names(self, indices):
+        """
+        Return the names of some alternatives, decoding only those when the names are stored as bytes.
+
+        Args:
+            indices (ndarray or slice): Positions of the alternatives.
+
+        Returns:
+            ndarray: Names (dtype object).
+        """
+        names = self._alternatives[indices]
+        if names.dtype.kind == "S":
+            names = np.char.decode(names, "utf-8").astype(object)
+        return names
+
+    def astype(self, dtype):
+        """
+        Return the decision matrix with values of another floating point type, e.g. np.float32 to halve
+        its memory (scores then agree with float64 within FLOAT32_RTOL).
+
+        Args:
+            dtype (type): np.float64 or np.float32.
+
+        Returns:
+            DecisionMatrix: The decision matrix itself if it already has this type, otherwise a converted copy.
+        """
+        if np.dtype(dtype) == self.dtype:
+            return self
+        return DecisionMatrix(self.values.astype(dtype), self.criteria_columns, self.criteria_type,
+                              self._alternatives, dtype)
+
+    def weight_vector(self, weights):
+        """
+        Convert criteria weights to a vector aligned with the matrix columns.
+
+        Args:
+            weights (dict or array-like): Mapping of criteria names to weights, or a vector of length m.
+
+        Returns:
+            ndarray: Weight vector (shape: m).
+        """
+        if isinstance(weights, dict):
+            weights = [weights[col] for col in self.criteria_columns]
+        return np.asarray(weights, dtype=self.dtype)
+
+    def warm_up(self, normalizations=None):
+        """
+        Compute the normalizations used by the ranking methods up front,
+        e.g. before the matrix is shared between worker threads.
+
+        Args:
+            normalizations (iterable, optional): Names of the normalization properties to compute
+                                                 (e.g. the RankingMethod.normalizations). Defaults to all.
+
+        Returns:
+            DecisionMatrix: The decision matrix itself.
+        """
+        for name in normalizations or NORMALIZATIONS:
+            getattr(self, name)
+        return self
+
+    def _cached(self, key, compute, stage="normalize"):
+        if key not in self._cache:
+            with span(f"{stage}.{key}"):
+                self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def min_max(self):
+        """Min-max normalization (benefit: (x - min) / (max - min), cost: (max - x) / (max - min))."""
+        return self._cached("min_max", lambda: _min_max(self.values, self.benefit))
+
+    @property
+    def vector(self):
+        """Vector normalization: x / sqrt(sum_i(x^2))."""
+        return self._cached("vector", lambda: _vector(self.values))
+
+    @property
+    def sum(self):
+        """Sum normalization (benefit: x / sum_i(x), cost: (1 / x) / sum_i(1 / x))."""
+        def compute():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                X = np.where(self.benefit, self.values, 1.0 / self.values)
+                return X / X.sum(axis=0)
+        return self._cached("sum", compute)
+
+    @property
+    def max(self):
+        """Max normalization (benefit: x / max, cost: min / x)."""
+        def compute():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(self.benefit, self.values / self.values.max(axis=0),
+                                self.values.min(axis=0) / self.values)
+        return self._cached("max", compute)
+
+    @property
+    def log_min_max(self):
+        """Natural logarithm of the min-max normalization, with zeros mapped to 0 (see zero_min_max)."""
+        def compute():
+            N = self.min_max
+            out = np.zeros_like(N)
+            np.log(N, out=out, where=N > 0)
+            return out
+        return self._cached("log_min_max", compute)
+
+    @property
+    def zero_min_max(self):
+        """Boolean mask of the entries whose min-max normalized value is 0."""
+        return self._cached("zero_min_max", lambda: self.min_max == 0)
+
+def as_decision_matrix(data, criteria_columns=None, criteria_type=None):
+    """
+    Adapter that lets ranking methods accept either a DataFrame or a DecisionMatrix.
+
+    Args:
+        data (DataFrame or DecisionMatrix): The input data.
+        criteria_columns (list, optional): List of criteria column names (ignored for a DecisionMatrix).
+        criteria_type (dict, optional): Mapping of criteria names to "benefit" or "cost" (ignored for a DecisionMatrix).
+
+    Returns:
+        DecisionMatrix: The decision matrix.
+    """
+    if isinstance(data, DecisionMatrix):
+        return data
+    return DecisionMatrix.from_dataframe(data, criteria_columns, criteria_type)
+
+def top_k_order(keys, k):
+    """
+    Positions of the k smallest keys, in the order of a stable sort (ties keep the lower position),
+    found by partial selection in O(n + k log k) instead of a full O(n log n) sort.
+
+    Args:
+        keys (ndarray): Sort keys (shape: n).
+        k (int): Number of positions to return (clipped to the range 0..n).
+
+    Returns:
+        ndarray: The first k positions of np.argsort(keys, kind="stable").
+    """
+    n = keys.shape[0]
+    k = max(0, min(int(k), n))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    if k == n:
+        return np.argsort(keys, kind="stable")
+    kth = np.partition(keys, k - 1)[k - 1]
+    if np.isnan(kth):
+        return np.argsort(keys, kind="stable")[:k]
+    better = np.flatnonzero(keys < kth)
+    ties = np.flatnonzero(keys == kth)[:k - better.size]
+    candidates = np.concatenate([better, ties])
+    return candidates[np.argsort(keys[candidates], kind="stable")]
+
+class LazyRanking:
+    """
+    Full ranking computed on demand. It only holds the score vector: head() and page() select the
+    requested rows by partial selection and materialize the names of those rows only; the full sort
+    and the full DataFrame are built the first time they are needed (to_frame, to_excel).
+
+    Attributes:
+        scores (ndarray): Score of each alternative (shape: n), in the row order of the decision matrix.
+        ascending (bool): Whether lower scores are preferred.
+        attrs (dict): Extra results of the method (e.g. the VIKOR compromise set).
+    """
+
+    def __init__(self, dm, scores, ascending=False):
+        self._dm = dm
+        self.scores = scores
+        self.ascending = ascending
+        self.attrs = {}
+        self._order = None
+        self._frame = None
+
+    def __len__(self):
+        return self.scores.shape[0]
+
+    @property
+    def nbytes(self):
+        """Memory held by the ranking itself (the decision matrix is shared and not counted)."""
+        size = self.scores.nbytes
+        if self._order is not None:
+            size += self._order.nbytes
+        if self._frame is not None:
+            size += int(self._frame.memory_usage(index=True, deep=True).sum())
+        return size
+
+    def names(self, indices):
+        """Names of the alternatives at the given rows of the score vector."""
+        return self._dm.names(indices)
+
+    def _keys(self):
+        return self.scores if self.ascending else -self.scores
+
+    def _rows(self, order):
+        import pandas as pd
+        return pd.DataFrame({"model_name": self.names(order), "score": self.scores[order]})
+
+    def positions(self, start, stop):
+        """
+        Positions (in the decision matrix) of the alternatives ranked start..stop-1 (0-based), best first,
+        without sorting the rest and without building a DataFrame (see page).
+
+        Args:
+            start (int): First rank.
+            stop (int): Rank after the last one.
+
+        Returns:
+            ndarray: The positions.
+        """
+        stop = min(stop, len(self))
+        # Past a quarter of the alternatives, one full sort is cheaper than repeated partial selections
+        if self._order is not None or 4 * stop >= len(self):
+            return self.order()[start:stop]
+        with span("rank.select"):
+            return top_k_order(self._keys(), stop)[start:]
+
+    def order(self):
+        """Positions of all alternatives, best first (computed once)."""
+        if self._order is None:
+            with span("rank.sort"):
+                self._order = np.argsort(self._keys(), kind="stable")
+        return self._order
+
+    def page(self, start, stop):
+        """
+        Rows start..stop-1 of the ranking (0-based), without sorting the rest.
+
+        Args:
+            start (int): First rank of the page.
+            stop (int): Rank after the last one of the page.
+
+        Returns:
+            DataFrame: Rows with columns 'model_name' and 'score'.
+        """
+        return self._rows(self.positions(start, stop))
+
+    def head(self, k=5):
+        """The k best alternatives (DataFrame with columns 'model_name' and 'score')."""
+        return self.page(0, k)
+
+    def to_frame(self):
+        """The full ranking as a DataFrame with columns 'model_name' and 'score', best first (built once)."""
+        if self._frame is None:
+            order = self.order()
+            with span("rank.frame"):
+                self._frame = self._rows(order)
+            self._frame.attrs.update(self.attrs)
+        return self._frame
+
+    def to_excel(self, *args, **kwargs):
+        with span("export.xlsx"):
+            return self.to_frame().to_excel(*args, **kwargs)
+
+def build_ranking(dm, scores, ascending=False, top_k=None, lazy=False):
+    """
+    Build the ranking DataFrame from a score vector.
+
+    Args:
+        dm (DecisionMatrix): The decision matrix the scores were computed on.
+        scores (ndarray): Score of each alternative (shape: n).
+        ascending (bool): Whether lower scores are preferred.
+        top_k (int, optional): Only keep the k best alternatives, selected without a full sort.
+        lazy (bool): Return a LazyRanking instead of a DataFrame.
+
+    Returns:
+        DataFrame or LazyRanking: Ranking result with columns 'model_name' and 'score', sorted by score.
+    """
+    if lazy:
+        return LazyRanking(dm, scores, ascending)
+    import pandas as pd
+    keys = scores if ascending else -scores
+    with span("rank.sort" if top_k is None else "rank.select"):
+        order = np.argsort(keys, kind="stable") if top_k is None else top_k_order(keys, top_k)
+    return pd.DataFrame({"model_name": dm.names(order), "score": scores[order]})
+
+def select_top_k(scores, k, ascending=False):
+    """
+    Select the k best alternatives along the last axis by partial selection (argpartition)
+    instead of a full sort; only the k winners are sorted.
+
+    Args:
+        scores (ndarray): Scores (shape: n, or k_rows x n).
+        k (int): Number of alternatives to keep (clipped to the range 1..n).
+        ascending (bool): Whether lower scores are preferred.
+
+    Returns:
+        tuple: (indices, scores) of the best k alternatives, best first (shape: k, or k_rows x k).
+    """
+    keys = scores if ascending else -scores
+    n = keys.shape[-1]
+    k = max(1, min(int(k), n))
+    if k < n:
+        candidates = np.argpartition(keys, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), keys.shape)
+    order = np.argsort(np.take_along_axis(keys, candidates, axis=-1), axis=-1, kind="stable")
+    indices = np.take_along_axis(candidates, order, axis=-1)
+    return indices, np.take_along_axis(scores, indices, axis=-1)
@@ -0,0 +1,55 @@
+from .module_stream import (
+    compute_column_stats,
+    compute_entropy_weights_streaming,
+    rank_csv_streaming,
+    STREAM_METHODS,
+)
+from .module_binary import (
+    convert_csv,
+    save_decision_matrix,
+    load_decision_matrix,
+    read_decision_matrix_bytes,
+    is_binary_dataset,
+    MappedDecisionMatrix,
+)
+from .module_preprocess import (
+    preprocess_phones,
+    prepare_dataset,
+    build_decision_matrix,
+    criteria_type_from_schema,
+    release_age_days,
+    CRITERIA_SCHEMA,
+    PHONES_CRITERIA,
+    PHONES_REFERENCE_DATE,
+)
+from .module_shared import (
+    publish_decision_matrix,
+    attach_decision_matrix,
+    shared_decision_matrix,
+    SharedDecisionMatrix,
+)
+
+__all__ = [
+    "compute_column_stats",
+    "compute_entropy_weights_streaming",
+    "rank_csv_streaming",
+    "STREAM_METHODS",
+    "convert_csv",
+    "save_decision_matrix",
+    "load_decision_matrix",
+    "read_decision_matrix_bytes",
+    "is_binary_dataset",
+    "MappedDecisionMatrix",
+    "preprocess_phones",
+    "prepare_dataset",
+    "build_decision_matrix",
+    "criteria_type_from_schema",
+    "release_age_days",
+    "CRITERIA_SCHEMA",
+    "PHONES_CRITERIA",
+    "PHONES_REFERENCE_DATE",
+    "publish_decision_matrix",
+    "attach_decision_matrix",
+    "shared_decision_matrix",
+    "SharedDecisionMatrix",
+]
@@ -0,0 +1,224 @@
+# module_binary.py
+import json
+import os
+
+import numpy as np
+
+from common_utils import DecisionMatrix
+from dataio.module_stream import DEFAULT_CHUNK_ROWS, iter_csv_chunks
+
+# File signature and version of the binary decision matrix format
+MAGIC = b"MCDMMAT1"
+FORMAT_VERSION = 1
+# Alignment (bytes) of the data blocks, so they can be memory-mapped and vectorized efficiently
+ALIGNMENT = 64
+BINARY_EXTENSION = ".mcdm"
+
+
+class MappedDecisionMatrix(DecisionMatrix):
+    """
+    Decision matrix whose values and names are memory-mapped from a binary dataset file.
+    Pickling it (e.g. to send it to worker processes) only transfers the file path:
+    every process maps the same file, so they all share one page-cached copy.
+
+    Attributes:
+        path (str): Path of the binary dataset file.
+    """
+
+    def __init__(self, path, values, criteria_columns, criteria_type, alternatives):
+        super().__init__(values, criteria_columns, criteria_type, alternatives, values.dtype)
+        self.path = path
+
+    def __reduce__(self):
+        return load_decision_matrix, (self.path,)
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _layout(header):
+    """Complete a header with the offsets of the values and names blocks and return the encoded header."""
+    header = dict(header, values_offset=0, names_offset=0)
+    while True:
+        encoded = json.dumps(header).encode("utf-8")
+        values_offset = _align(len(MAGIC) + 8 + len(encoded))
+        values_size = header["n"] * header["m"] * np.dtype(header["dtype"]).itemsize
+        names_offset = _align(values_offset + values_size)
+        if (values_offset, names_offset) == (header["values_offset"], header["names_offset"]):
+            return header, encoded
+        header.update(values_offset=values_offset, names_offset=names_offset)
+
+
+def _write_header(f, header):
+    header, encoded = _layout(header)
+    f.write(MAGIC)
+    f.write(len(encoded).to_bytes(8, "little"))
+    f.write(encoded)
+    names_size = header["n"] * np.dtype(header["names_dtype"]).itemsize
+    f.truncate(header["names_offset"] + names_size)
+    return header
+
+
+def _read_header(buffer):
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a binary decision matrix (bad file signature).")
+    size = int.from_bytes(bytes(buffer[len(MAGIC):len(MAGIC) + 8]), "little")
+    header = json.loads(bytes(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + size]).decode("utf-8"))
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported binary decision matrix version {header.get('version')}.")
+    return header
+
+
+def is_binary_dataset(data):
+    """
+    Check whether a path or a byte string holds a binary decision matrix.
+
+    Args:
+        data (str or bytes): File path or file contents.
+
+    Returns:
+        bool: True if the data starts with the binary format signature.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return bytes(data[:len(MAGIC)]) == MAGIC
+    try:
+        with open(data, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def save_decision_matrix(dm, path):
+    """
+    Write a decision matrix to the binary format:
+    a JSON header (criteria names and types, shape, dtypes, block offsets), the (n x m) criteria values
+    as one aligned row-major block, and the names as a fixed-width UTF-8 string table.
+
+    Args:
+        dm (DecisionMatrix): The decision matrix.
+        path (str): Output file path.
+    """
+    names = np.char.encode(np.asarray(dm.alternatives, dtype=str), "utf-8")
+    header = {
+        "version": FORMAT_VERSION,
+        "n": dm.shape[0],
+        "m": dm.shape[1],
+        "dtype": dm.dtype.str,
+        "names_dtype": names.dtype.str,
+        "criteria_columns": dm.criteria_columns,
+        "criteria_type": dm.criteria_type,
+    }
+    with open(path, "wb") as f:
+        header = _write_header(f, header)
+        f.seek(header["values_offset"])
+        f.write(np.ascontiguousarray(dm.values).tobytes())
+        f.seek(header["names_offset"])
+        f.write(names.tobytes())
+
+
+def convert_csv(csv_path, out_path, criteria_columns=None, criteria_type=None, dtype=np.float64,
+                chunksize=DEFAULT_CHUNK_ROWS, name_column="model_name"):
+    """
+    Convert a CSV dataset to the binary format in constant memory:
+    1. First pass over the names column: number of rows and longest UTF-8 name.
+    2. Second pass: copy every chunk of values and names into the pre-allocated file.
+
+    Args:
+        csv_path (str): Path to the CSV file.
+        out_path (str): Output file path.
+        criteria_columns (list, optional): Criteria column names. Defaults to every column except name_column.
+        criteria_type (dict, optional): Mapping of criteria names to "benefit" or "cost".
+        dtype (type): Floating point type of the stored values.
+        chunksize (int): Number of rows per chunk.
+        name_column (str): Column holding the alternative names.
+
+    Returns:
+        dict: The file header (n, m, criteria names and types...).
+    """
+    import pandas as pd
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    if criteria_columns is None:
+        criteria_columns = [col for col in columns if col != name_column]
+    n, width = 0, 1
+    if name_column in columns:
+        for chunk in pd.read_csv(csv_path, usecols=[name_column], chunksize=chunksize):
+            n += len(chunk)
+            if len(chunk):
+                width = max(width, int(chunk[name_column].astype(str).str.encode("utf-8").str.len().max()))
+    else:
+        for chunk in pd.read_csv(csv_path, usecols=[columns[0]], chunksize=chunksize):
+            n += len(chunk)
+        width = len(str(max(n - 1, 0)))
+    criteria_type = criteria_type or {}
+    header = {
+        "version": FORMAT_VERSION,
+        "n": n,
+        "m": len(criteria_columns),
+        "dtype": np.dtype(dtype).str,
+        "names_dtype": np.dtype(f"S{width}").str,
+        "criteria_columns": list(criteria_columns),
+        "criteria_type": {col: criteria_type.get(col, "benefit") for col in criteria_columns},
+    }
+    with open(out_path, "wb") as f:
+        header = _write_header(f, header)
+    values = np.memmap(out_path, dtype=header["dtype"], mode="r+", offset=header["values_offset"],
+                       shape=(n, header["m"]))
+    names = np.memmap(out_path, dtype=header["names_dtype"], mode="r+", offset=header["names_offset"], shape=(n,))
+    for start, chunk_names, X in iter_csv_chunks(csv_path, criteria_columns, chunksize, name_column):
+        values[start:start + len(X)] = X
+        names[start:start + len(X)] = np.char.encode(np.asarray(chunk_names, dtype=str), "utf-8")
+    values.flush()
+    names.flush()
+    del values, names
+    return header
+
+
+def _from_buffer(buffer, header):
+    n, m = header["n"], header["m"]
+    values = np.frombuffer(buffer, dtype=header["dtype"], count=n * m, offset=header["values_offset"])
+    names = np.frombuffer(buffer, dtype=header["names_dtype"], count=n, offset=header["names_offset"])
+    return values.reshape(n, m), names
+
+
+def load_decision_matrix(path, mmap=True):
+    """
+    Load a binary decision matrix. With mmap, the values and names are memory-mapped read-only:
+    nothing is parsed or copied, pages are read on first access and shared between processes.
+
+    Args:
+        path (str): Path of the binary dataset file.
+        mmap (bool): Memory-map the file instead of reading it into memory.
+
+    Returns:
+        DecisionMatrix: The decision matrix (a MappedDecisionMatrix when mmap is True).
+
+    Raises:
+        ValueError: If the file is not a binary decision matrix.
+    """
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        header = _read_header(buffer)
+        values, names = _from_buffer(buffer, header)
+        return MappedDecisionMatrix(path, values, header["criteria_columns"], header["criteria_type"], names)
+    with open(path, "rb") as f:
+        return read_decision_matrix_bytes(f.read())
+
+
+def read_decision_matrix_bytes(data):
+    """
+    Build a decision matrix from the contents of a binary dataset file (e.g. an upload) without copying them.
+
+    Args:
+        data (bytes): File contents.
+
+    Returns:
+        DecisionMatrix: The decision matrix.
+
+    Raises:
+        ValueError: If the data is not a binary decision matrix.
+    """
+    header = _read_header(memoryview(data))
+    values, names = _from_buffer(data, header)
+    return DecisionMatrix(values, header["criteria_columns"], header["criteria_type"], names, values.dtype)
+
@@ -0,0 +1,198 @@
+# module_preprocess.py
+import os
+
+import numpy as np
+
+from common_utils import DecisionMatrix
+from instrumentation import span
+
+# Declarative criterion schema: criterion column -> "benefit" or "cost".
+# release_date is stored as the age of the phone in days (see preprocess_phones), so a larger value is worse.
+CRITERIA_SCHEMA = {
+    "popularity": "benefit",
+    "best_price": "cost",
+    "lowest_price": "cost",
+    "highest_price": "cost",
+    "sellers_amount": "benefit",
+    "screen_size": "benefit",
+    "memory_size": "benefit",
+    "battery_size": "benefit",
+    "release_date": "cost",
+}
+# Type of the columns missing from the schema (e.g. uploaded datasets): name fragments of cost criteria
+COST_NAME_HINTS = ("price", "date")
+# Criteria kept by preprocess_phones, in output order (the columns of cleaned_samsung_phones.csv)
+PHONES_CRITERIA = ["popularity", "best_price", "highest_price", "screen_size", "memory_size", "battery_size",
+                   "release_date"]
+# Format of the raw release dates ("10-2020")
+RELEASE_DATE_FORMAT = "%m-%Y"
+# Date the release ages of cleaned_samsung_phones.csv are measured at: the default of preprocess_phones,
+# so that preprocessing the same raw file always gives the same dataset
+PHONES_REFERENCE_DATE = "2025-02-26"
+MISSING_POLICIES = ("drop", "median", "mean")
+
+
+def criteria_type_from_schema(criteria_columns, schema=None, overrides=None):
+    """
+    Criterion types of a dataset: from the schema for the known columns; a column missing from it is a cost
+    criterion if its name contains one of COST_NAME_HINTS, otherwise a benefit criterion.
+
+    Args:
+        criteria_columns (list): Criteria column names.
+        schema (dict, optional): Mapping of criteria names to "benefit" or "cost". Defaults to CRITERIA_SCHEMA.
+        overrides (dict, optional): Types taking precedence over the schema.
+
+    Returns:
+        dict: Mapping of every criterion to "benefit" or "cost".
+    """
+    schema = CRITERIA_SCHEMA if schema is None else schema
+    criteria_type = {}
+    for col in criteria_columns:
+        if col in schema:
+            criteria_type[col] = schema[col]
+        elif any(hint in col.lower() for hint in COST_NAME_HINTS):
+            criteria_type[col] = "cost"
+        else:
+            criteria_type[col] = "benefit"
+    criteria_type.update({col: t for col, t in (overrides or {}).items() if col in criteria_type})
+    return criteria_type
+
+
+def release_age_days(release_dates, reference_date=None, date_format=RELEASE_DATE_FORMAT):
+    """
+    Age in days of every release date, computed on the whole column at once.
+
+    Args:
+        release_dates (Series): Release dates as strings (e.g. "10-2020").
+        reference_date (optional): Date the ages are measured at (anything pandas.Timestamp accepts).
+                                   Defaults to today.
+        date_format (str): strptime format of the dates.
+
+    Returns:
+        Series: Ages in days (floats); NaN for missing or unparsable dates.
+    """
+    import pandas as pd
+    reference = pd.Timestamp.now() if reference_date is None else pd.Timestamp(reference_date)
+    dates = pd.to_datetime(release_dates, format=date_format, errors="coerce")
+    return (reference - dates).dt.days.astype(np.float64)
+
+
+def preprocess_phones(source, brand="Samsung", os_name=None, criteria_columns=None, missing="drop",
+                      reference_date=PHONES_REFERENCE_DATE, name_column="model_name"):
+    """
+    Clean the raw phones dataset (phones_data.csv) into a dataset of alternatives with numeric criteria,
+    with vectorized column operations only:
+    1. Keep the rows of one brand and/or operating system (case-insensitive).
+    2. Convert the release dates ("MM-YYYY") to ages in days and the other criteria to numbers
+       (unparsable values become missing).
+    3. Handle the missing values: drop the incomplete rows, or fill them with the median or mean of the column.
+
+    Args:
+        source (str or DataFrame): Path of the raw CSV file, or its contents.
+        brand (str, optional): Brand kept (column 'brand_name'); None keeps every brand.
+        os_name (str, optional): Operating system kept (column 'os'); None keeps every system.
+        criteria_columns (list, optional): Criteria kept, in order. Defaults to PHONES_CRITERIA.
+        missing (str): "drop", "median" or "mean".
+        reference_date (optional): Date the release ages are measured at ("today" for the current date).
+                                   Defaults to PHONES_REFERENCE_DATE.
+        name_column (str): Column holding the alternative names.
+
+    Returns:
+        DataFrame: name_column followed by the criteria columns, with a fresh index.
+
+    Raises:
+        ValueError: If a column is missing, the missing-value policy is unknown or no row is left.
+    """
+    import pandas as pd
+    if missing not in MISSING_POLICIES:
+        raise ValueError(f"Unknown missing-value policy '{missing}'. Choose from {', '.join(MISSING_POLICIES)}.")
+    criteria_columns = list(PHONES_CRITERIA if criteria_columns is None else criteria_columns)
+    with span("preprocess.read"):
+        df = pd.read_csv(source) if isinstance(source, (str, os.PathLike)) else source
+    filters = [(column, value) for column, value in (("brand_name", brand), ("os", os_name)) if value is not None]
+    absent = [col for col in [name_column] + criteria_columns + [column for column, _ in filters]
+              if col not in df.columns]
+    if absent:
+        raise ValueError(f"Columns not found in the raw dataset: {', '.join(absent)}")
+
+    with span("preprocess.filter"):
+        keep = np.ones(len(df), dtype=bool)
+        for column, value in filters:
+            keep &= (df[column].astype("string").str.casefold() == value.casefold()).fillna(False).to_numpy()
+        df = df.loc[keep, [name_column] + criteria_columns]
+
+    with span("preprocess.derive"):
+        out = pd.DataFrame({name_column: df[name_column].to_numpy()})
+        for col in criteria_columns:
+            if col == "release_date":
+                out[col] = release_age_days(df[col], reference_date).to_numpy()
+            else:
+                out[col] = pd.to_numeric(df[col], errors="coerce").to_numpy()
+
+    with span("preprocess.missing"):
+        if missing == "drop":
+            out = out.dropna()
+        else:
+            out = out.dropna(subset=[name_column])
+            fill = out[criteria_columns].median() if missing == "median" else out[criteria_columns].mean()
+            out[criteria_columns] = out[criteria_columns].fillna(fill)
+    if out.empty:
+        raise ValueError("No alternative is left after preprocessing.")
+    if "release_date" in out:
+        # Whole days, as in the notebook output
+        out["release_date"] = out["release_date"].astype(np.int64)
+    return out.reset_index(drop=True)
+
+
+def build_decision_matrix(df, schema=None, dtype=np.float64, name_column="model_name"):
+    """
+    Decision matrix of a preprocessed dataset, typed with the criterion schema.
+
+    Args:
+        df (DataFrame): Output of preprocess_phones (or any dataset with a name column and numeric criteria).
+        schema (dict, optional): Criterion schema. Defaults to CRITERIA_SCHEMA.
+        dtype (type): Floating point type of the decision matrix.
+        name_column (str): Column holding the alternative names.
+
+    Returns:
+        DecisionMatrix: The decision matrix.
+    """
+    criteria_columns = [col for col in df.columns if col != name_column]
+    return DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type_from_schema(criteria_columns, schema),
+                                         dtype, name_column)
+
+
+def prepare_dataset(raw_path, out_path, schema=None, dtype=np.float64, force=False, **options):
+    """
+    Preprocess the raw phones dataset once and store the result: a binary dataset (.mcdm, memory-mapped by
+    every later ranking run, see save_decision_matrix) or a cleaned CSV file. An output newer than the raw
+    file is reused as is, unless force is set.
+
+    Args:
+        raw_path (str): Path of the raw CSV file.
+        out_path (str): Output path; the binary format is written for the .mcdm extension, CSV otherwise.
+        schema (dict, optional): Criterion schema of the binary dataset. Defaults to CRITERIA_SCHEMA.
+        dtype (type): Floating point type of the binary dataset.
+        force (bool): Rebuild the output even if it is up to date.
+        **options: Options of preprocess_phones (brand, os_name, criteria_columns, missing, reference_date).
+
+    Returns:
+        tuple: (output path, number of alternatives or None if the output was reused).
+    """
+    from dataio.module_binary import BINARY_EXTENSION, save_decision_matrix
+    if not force and os.path.exists(out_path) and os.path.getmtime(out_path) >= os.path.getmtime(raw_path):
+        return out_path, None
+    df = preprocess_phones(raw_path, **options)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    try:
+        with span("preprocess.write"):
+            if out_path.lower().endswith(BINARY_EXTENSION):
+                save_decision_matrix(build_decision_matrix(df, schema, dtype), tmp_path)
+            else:
+                df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return out_path, len(df)
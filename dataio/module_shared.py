@@ -0,0 +1,245 @@
+# module_shared.py
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from common_utils import DecisionMatrix, NORMALIZATIONS
+from dataio.module_binary import FORMAT_VERSION, MAGIC, _align, _from_buffer, _layout, _read_header
+
+# Seconds shared_decision_matrix waits for another process to finish publishing a block, and polling interval
+PUBLISH_TIMEOUT = 60.0
+PUBLISH_POLL = 0.005
+
+# Matrices attached by this process, by block name: attaching twice returns the same matrix
+_attached = weakref.WeakValueDictionary()
+_attached_lock = threading.Lock()
+
+
+class _SharedBlock(shared_memory.SharedMemory):
+    def __del__(self):
+        # Arrays viewing the block may outlive it at interpreter exit; the mapping is then released by the OS
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+
+class SharedDecisionMatrix(DecisionMatrix):
+    """
+    Decision matrix whose values, names and normalizations live in a named shared memory block
+    (see publish_decision_matrix). Pickling it (e.g. to send it to worker processes) only transfers
+    the block name: every process attaches the same block, so they all rank against one physical copy.
+
+    Attributes:
+        shm (SharedMemory): The shared memory block.
+        owner (bool): Whether this process created the block (and is responsible for unlinking it).
+    """
+
+    def __init__(self, shm, values, criteria_columns, criteria_type, alternatives, normalizations=None,
+                 owner=False):
+        super().__init__(values, criteria_columns, criteria_type, alternatives, values.dtype)
+        self._cache.update(normalizations or {})
+        self.shm = shm
+        self.owner = owner
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __reduce__(self):
+        return attach_decision_matrix, (self.shm.name,)
+
+    def unlink(self):
+        """
+        Remove the block name, so that no other process can attach it.
+        The memory is released once every process holding the matrix has dropped it.
+        """
+        with _attached_lock:
+            _attached.pop(self.shm.name, None)
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class _NotReadyError(ValueError):
+    """The block exists but its publisher has not finished writing it (its signature is still zero)."""
+
+
+def _normalization_blocks(header):
+    """Offsets of the normalization arrays, stored one after the other behind the names block."""
+    offset = header["names_offset"] + header["n"] * np.dtype(header["names_dtype"]).itemsize
+    blocks = []
+    for name, dtype in header.get("normalizations", []):
+        offset = _align(offset)
+        blocks.append((name, dtype, offset))
+        offset += header["n"] * header["m"] * np.dtype(dtype).itemsize
+    return blocks, offset
+
+
+def _view(shm, header):
+    """Read-only views of the values, names and normalizations of a block, without copying them."""
+    values, names = _from_buffer(shm.buf, header)
+    normalizations = {}
+    for name, dtype, offset in _normalization_blocks(header)[0]:
+        normalizations[name] = np.frombuffer(shm.buf, dtype=dtype, count=header["n"] * header["m"],
+                                             offset=offset).reshape(header["n"], header["m"])
+    for array in (values, names, *normalizations.values()):
+        array.flags.writeable = False
+    return values, names, normalizations
+
+
+def _shares_tracker(publisher_pid):
+    """Whether this process uses the resource tracker of the publisher (it is the publisher or one of its workers)."""
+    parent = multiprocessing.parent_process()
+    return publisher_pid in (os.getpid(), parent.pid if parent is not None else None)
+
+
+def publish_decision_matrix(dm, name=None, normalizations=NORMALIZATIONS):
+    """
+    Copy a decision matrix into a named shared memory block, in the binary dataset layout
+    (see save_decision_matrix) followed by its precomputed normalizations:
+    1. Compute the normalizations, so that no process has to allocate its own.
+    2. Write the header, the values, the names and the normalizations into one block.
+
+    Args:
+        dm (DecisionMatrix): The decision matrix.
+        name (str, optional): Block name, e.g. derived from the dataset contents so that independent
+                              worker processes find the same block. Defaults to a random name.
+        normalizations (iterable): DecisionMatrix normalizations stored in the block.
+
+    Returns:
+        SharedDecisionMatrix: The matrix backed by the block, owned by this process.
+
+    Raises:
+        FileExistsError: If a block with this name already exists (see attach_decision_matrix).
+    """
+    dm.warm_up(normalizations)
+    names = np.char.encode(np.asarray(dm.alternatives, dtype=str), "utf-8")
+    arrays = {key: np.ascontiguousarray(getattr(dm, key)) for key in normalizations}
+    header, encoded = _layout({
+        "version": FORMAT_VERSION,
+        "n": dm.shape[0],
+        "m": dm.shape[1],
+        "dtype": dm.dtype.str,
+        "names_dtype": names.dtype.str,
+        "criteria_columns": dm.criteria_columns,
+        "criteria_type": dm.criteria_type,
+        "normalizations": [[key, array.dtype.str] for key, array in arrays.items()],
+        "publisher_pid": os.getpid(),
+    })
+    blocks, size = _normalization_blocks(header)
+    shm = _SharedBlock(name=name, create=True, size=max(size, 1))
+    try:
+        # The block is visible to other processes as soon as it is created: its signature is written last,
+        # once the header and the data are complete, and attach_decision_matrix waits for it
+        shm.buf[len(MAGIC) + 8:len(MAGIC) + 8 + len(encoded)] = encoded
+        shm.buf[len(MAGIC):len(MAGIC) + 8] = len(encoded).to_bytes(8, "little")
+        values, shared_names = _from_buffer(shm.buf, header)
+        values[...] = dm.values
+        shared_names[...] = names
+        for key, dtype, offset in blocks:
+            np.frombuffer(shm.buf, dtype=dtype, count=arrays[key].size, offset=offset)[...] = arrays[key].ravel()
+        del values, shared_names
+        shm.buf[:len(MAGIC)] = MAGIC
+    except BaseException:
+        shm.close()
+        shm.unlink()
+        raise
+    values, shared_names, shared_normalizations = _view(shm, header)
+    shared = SharedDecisionMatrix(shm, values, header["criteria_columns"], header["criteria_type"], shared_names,
+                                  shared_normalizations, owner=True)
+    with _attached_lock:
+        _attached[shm.name] = shared
+    return shared
+
+
+def attach_decision_matrix(name):
+    """
+    Attach a decision matrix published by another process (see publish_decision_matrix).
+    Nothing is copied: the values, names and normalizations are read-only views of the block.
+
+    Args:
+        name (str): Block name.
+
+    Returns:
+        SharedDecisionMatrix: The matrix backed by the block.
+
+    Raises:
+        FileNotFoundError: If no block with this name exists.
+        ValueError: If the block does not hold a decision matrix, or is still being published
+                    (see shared_decision_matrix, which waits for it).
+    """
+    with _attached_lock:
+        shared = _attached.get(name)
+        if shared is not None:
+            return shared
+        try:
+            # Only the publisher unlinks the block (Python 3.13+)
+            shm = _SharedBlock(name=name, track=False)
+            tracked = False
+        except TypeError:
+            shm = _SharedBlock(name=name)
+            tracked = True
+        if not any(shm.buf[:len(MAGIC)]):
+            # Still being written; an older Python keeps tracking the name until the block is attached
+            shm.close()
+            raise _NotReadyError(f"The shared decision matrix '{name}' is still being published.")
+        try:
+            header = _read_header(shm.buf)
+            values, names, normalizations = _view(shm, header)
+        except ValueError:
+            shm.close()
+            raise
+        if tracked and not _shares_tracker(header.get("publisher_pid")):
+            # Older Pythons track every attachment: keep this process's resource tracker from unlinking
+            # the block at exit (the publisher's tracker, shared with its pool workers, still does on a crash)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        shared = SharedDecisionMatrix(shm, values, header["criteria_columns"], header["criteria_type"], names,
+                                      normalizations)
+        _attached[name] = shared
+        return shared
+
+
+def shared_decision_matrix(name, load, normalizations=NORMALIZATIONS, timeout=PUBLISH_TIMEOUT):
+    """
+    Attach the decision matrix published under a name, or load and publish it if no process has yet:
+    the first worker process to load a dataset publishes it and the others rank against its copy.
+    A process finding the block while it is still being written waits until it is complete.
+
+    Args:
+        name (str): Block name (at most 30 characters for portability), e.g. derived from a dataset hash.
+        load (callable): Function without arguments returning the DecisionMatrix to publish.
+        normalizations (iterable): DecisionMatrix normalizations stored in the block.
+        timeout (float): Maximum number of seconds to wait for another process to finish publishing the block.
+
+    Returns:
+        SharedDecisionMatrix: The shared matrix (owned by this process if it published it).
+
+    Raises:
+        TimeoutError: If the block is still incomplete after timeout seconds (e.g. its publisher hung).
+    """
+    deadline = time.monotonic() + timeout
+    dm = None
+    while True:
+        try:
+            return attach_decision_matrix(name)
+        except FileNotFoundError:
+            pass
+        except _NotReadyError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"The shared decision matrix '{name}' was not published within {timeout} s.")
+            time.sleep(PUBLISH_POLL)
+            continue
+        if dm is None:
+            dm = load()
+        try:
+            return publish_decision_matrix(dm, name, normalizations)
+        except FileExistsError:
+            # Published concurrently by another process: attach it once it is complete
+            continue
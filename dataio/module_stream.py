@@ -0,0 +1,267 @@
+# module_stream.py
+import csv
+import heapq
+import os
+import tempfile
+
+import numpy as np
+
+from common_utils import _min_max, _vector
+from weights.module_entropy import _xlogx, compute_entropy_weights_from_stats
+from ranking.module_wsm import compute_wsm_scores
+from ranking.module_wpm import compute_wpm_scores
+from ranking.module_topsis import compute_topsis_scores
+
+# Ranking methods that only need per-column statistics plus one scoring pass
+STREAM_METHODS = ("wsm", "wpm", "topsis")
+# Rows read from the CSV file per chunk
+DEFAULT_CHUNK_ROWS = 100_000
+# Maximum number of sorted runs merged at once when the full ranking is spilled to disk
+MAX_MERGE_RUNS = 64
+
+
+def _read_header(path):
+    """Column names of a CSV file (its first row)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def _criteria_columns(path, criteria_columns, name_column):
+    if criteria_columns is not None:
+        return list(criteria_columns)
+    return [col for col in _read_header(path) if col != name_column]
+
+
+def iter_csv_chunks(path, criteria_columns, chunksize=DEFAULT_CHUNK_ROWS, name_column="model_name"):
+    """
+    Read a CSV file chunk by chunk, keeping only the name and criteria columns.
+
+    Args:
+        path (str): Path to the CSV file.
+        criteria_columns (list): List of criteria column names.
+        chunksize (int): Number of rows per chunk.
+        name_column (str): Column holding the alternative names (row numbers are used if it is missing).
+
+    Yields:
+        tuple: (first row number, names (ndarray), criteria values (ndarray, float64, chunk x m)).
+    """
+    import pandas as pd
+    has_names = name_column in _read_header(path)
+    usecols = ([name_column] if has_names else []) + list(criteria_columns)
+    start = 0
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize):
+        X = chunk[criteria_columns].to_numpy(dtype=np.float64)
+        names = chunk[name_column].to_numpy() if has_names else np.arange(start, start + len(chunk))
+        yield start, names, X
+        start += len(chunk)
+
+
+def compute_column_stats(path, criteria_columns=None, chunksize=DEFAULT_CHUNK_ROWS, name_column="model_name"):
+    """
+    First streaming pass: compute the per-column sufficient statistics of a CSV file in constant memory.
+
+    Args:
+        path (str): Path to the CSV file.
+        criteria_columns (list, optional): Criteria column names. Defaults to every column except name_column.
+        chunksize (int): Number of rows per chunk.
+        name_column (str): Column holding the alternative names.
+
+    Returns:
+        dict: 'criteria_columns', 'count' (int), and per column (ndarray, shape m): 'min', 'max', 'sum',
+              'sum_sq' and 'xlogx' (sum of x * ln x, with 0 * ln 0 = 0).
+
+    Raises:
+        ValueError: If the file has no rows.
+    """
+    criteria_columns = _criteria_columns(path, criteria_columns, name_column)
+    m = len(criteria_columns)
+    stats = {
+        "criteria_columns": criteria_columns,
+        "count": 0,
+        "min": np.full(m, np.inf),
+        "max": np.full(m, -np.inf),
+        "sum": np.zeros(m),
+        "sum_sq": np.zeros(m),
+        "xlogx": np.zeros(m),
+    }
+    for _, _, X in iter_csv_chunks(path, criteria_columns, chunksize, name_column):
+        if not len(X):
+            continue
+        stats["count"] += X.shape[0]
+        np.minimum(stats["min"], X.min(axis=0), out=stats["min"])
+        np.maximum(stats["max"], X.max(axis=0), out=stats["max"])
+        stats["sum"] += X.sum(axis=0)
+        stats["sum_sq"] += (X * X).sum(axis=0)
+        stats["xlogx"] += _xlogx(X).sum(axis=0)
+    if stats["count"] == 0:
+        raise ValueError(f"'{path}' has no rows.")
+    return stats
+
+
+def compute_entropy_weights_streaming(path, criteria_columns=None, criteria_type=None, stats=None,
+                                      chunksize=DEFAULT_CHUNK_ROWS, name_column="model_name"):
+    """
+    Compute entropy weights of a CSV file from its column statistics (see compute_entropy_weights_from_stats).
+    Benefit criteria need no extra pass. Cost criteria are first reflected (x' = max + min - x), which depends
+    on the column bounds, so their sum(x' * ln x') is computed in one extra pass over the file.
+
+    Args:
+        path (str): Path to the CSV file.
+        criteria_columns (list, optional): Criteria column names. Defaults to every column except name_column.
+        criteria_type (dict, optional): Mapping of criteria names to "benefit" or "cost".
+        stats (dict, optional): Result of compute_column_stats, to skip the first pass.
+        chunksize (int): Number of rows per chunk.
+        name_column (str): Column holding the alternative names.
+
+    Returns:
+        dict: A dictionary mapping criteria names to their computed weights.
+    """
+    if stats is None:
+        stats = compute_column_stats(path, criteria_columns, chunksize, name_column)
+    criteria_columns = stats["criteria_columns"]
+    criteria_type = criteria_type or {}
+    cost = np.array([criteria_type.get(col, "benefit") == "cost" for col in criteria_columns])
+    reflect = stats["max"] + stats["min"]
+    entropy_stats = {
+        "count": stats["count"],
+        "sum": np.where(cost, stats["count"] * reflect - stats["sum"], stats["sum"]),
+        "xlogx": stats["xlogx"].copy(),
+    }
+    if cost.any():
+        entropy_stats["xlogx"][cost] = 0.0
+        for _, _, X in iter_csv_chunks(path, criteria_columns, chunksize, name_column):
+            entropy_stats["xlogx"][cost] += _xlogx(reflect[cost] - X[:, cost]).sum(axis=0)
+    return compute_entropy_weights_from_stats(entropy_stats, criteria_columns)
+
+
+def _score_chunk(method, X, w, benefit, stats):
+    """Score one chunk with the bounds of the whole dataset."""
+    if method == "topsis":
+        norm = np.sqrt(stats["sum_sq"])
+        col_min = np.zeros_like(norm)
+        col_max = np.zeros_like(norm)
+        np.divide(stats["min"], norm, out=col_min, where=norm != 0)
+        np.divide(stats["max"], norm, out=col_max, where=norm != 0)
+        return compute_topsis_scores(_vector(X, norm), w, benefit, col_min, col_max)
+    N = _min_max(X, benefit, stats["min"], stats["max"])
+    if method == "wsm":
+        return compute_wsm_scores(N, w)
+    log_N = np.zeros_like(N)
+    np.log(N, out=log_N, where=N > 0)
+    return compute_wpm_scores(log_N, N == 0, w)
+
+
+def _merge_top(top, rows, names, scores, k):
+    """
+    Merge one scored chunk into the running top k (rows, names, scores), best first.
+    Ties keep the earlier row, as the stable sort of build_ranking does, so a chunk row equal to
+    the current k-th score can never enter a full top k.
+    """
+    if len(top[0]) == k:
+        keep = scores > top[2][-1]
+        rows, names, scores = rows[keep], names[keep], scores[keep]
+    if len(scores) > k:
+        kth = np.partition(-scores, k - 1)[k - 1]
+        keep = -scores <= kth
+        rows, names, scores = rows[keep], names[keep], scores[keep]
+    rows = np.concatenate([top[0], rows])
+    names = np.concatenate([top[1], names])
+    scores = np.concatenate([top[2], scores])
+    order = np.lexsort((rows, -scores))[:k]
+    return rows[order], names[order], scores[order]
+
+
+def _write_run(directory, index, rows, names, scores):
+    """Write one chunk, sorted best first, as a run file for the external merge sort."""
+    import pandas as pd
+    order = np.lexsort((rows, -scores))
+    path = os.path.join(directory, f"run_{index:06d}.csv")
+    pd.DataFrame({"row": rows[order], "model_name": names[order], "score": scores[order]}).to_csv(path, index=False)
+    return path
+
+
+def _read_run(path):
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row, name, score in reader:
+            yield -float(score), int(row), name, score
+
+
+def _merge_runs(paths, out_path, directory, final=True):
+    """
+    k-way merge of sorted run files. Groups of MAX_MERGE_RUNS runs are merged first,
+    so the number of open files stays bounded.
+    """
+    level = 0
+    while len(paths) > MAX_MERGE_RUNS:
+        merged = []
+        for i in range(0, len(paths), MAX_MERGE_RUNS):
+            path = os.path.join(directory, f"merge_{level}_{i:06d}.csv")
+            _merge_runs(paths[i:i + MAX_MERGE_RUNS], path, directory, final=False)
+            merged.append(path)
+        paths, level = merged, level + 1
+    with open(out_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "model_name", "score"] if final else ["row", "model_name", "score"])
+        for rank, (_, row, name, score) in enumerate(heapq.merge(*(_read_run(p) for p in paths)), start=1):
+            writer.writerow([rank if final else row, name, score])
+
+
+def rank_csv_streaming(path, criteria_columns=None, weights=None, criteria_type=None, method="topsis", top_k=10,
+                       spill_path=None, stats=None, chunksize=DEFAULT_CHUNK_ROWS, name_column="model_name"):
+    """
+    Rank the alternatives of a CSV file that may not fit in memory:
+    1. First pass (skipped if stats is given): per-column min, max, sum, sum of squares and entropy terms.
+    2. Weights: entropy weights from the statistics when none are given.
+    3. Second pass: score every chunk with the dataset-wide bounds and keep a bounded top-k.
+    4. Optionally spill the full ranking to disk as sorted runs merged into one CSV file.
+    Memory is bounded by the chunk size and top_k, not by the number of rows.
+
+    Args:
+        path (str): Path to the CSV file.
+        criteria_columns (list, optional): Criteria column names. Defaults to every column except name_column.
+        weights (dict, optional): Criteria weights. Defaults to streaming entropy weights.
+        criteria_type (dict, optional): Mapping of criteria names to "benefit" or "cost".
+        method (str): "wsm", "wpm" or "topsis".
+        top_k (int): Number of best alternatives returned.
+        spill_path (str, optional): CSV file receiving the full ranking (columns rank, model_name, score).
+        stats (dict, optional): Result of compute_column_stats.
+        chunksize (int): Number of rows per chunk.
+        name_column (str): Column holding the alternative names.
+
+    Returns:
+        DataFrame: The top_k alternatives with columns 'model_name' and 'score', sorted in descending order.
+
+    Raises:
+        ValueError: If the method is not supported in streaming mode or top_k is not positive.
+    """
+    if method not in STREAM_METHODS:
+        raise ValueError(f"Method '{method}' is not supported in streaming mode. Choose from {', '.join(STREAM_METHODS)}.")
+    if top_k is None or top_k < 1:
+        raise ValueError("top_k must be a positive integer.")
+    if stats is None:
+        stats = compute_column_stats(path, criteria_columns, chunksize, name_column)
+    criteria_columns = stats["criteria_columns"]
+    criteria_type = criteria_type or {}
+    if weights is None:
+        weights = compute_entropy_weights_streaming(path, criteria_columns, criteria_type, stats, chunksize, name_column)
+    w = np.array([weights[col] for col in criteria_columns], dtype=np.float64)
+    benefit = np.array([criteria_type.get(col, "benefit") == "benefit" for col in criteria_columns])
+
+    top = (np.empty(0, dtype=np.int64), np.empty(0, dtype=object), np.empty(0))
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(spill_path)) if spill_path else None) as tmp:
+        runs = []
+        for start, names, X in iter_csv_chunks(path, criteria_columns, chunksize, name_column):
+            if not len(X):
+                continue
+            scores = _score_chunk(method, X, w, benefit, stats)
+            rows = np.arange(start, start + len(scores))
+            names = np.asarray(names, dtype=object)
+            if spill_path:
+                runs.append(_write_run(tmp, len(runs), rows, names, scores))
+            top = _merge_top(top, rows, names, scores, top_k)
+        if spill_path:
+            _merge_runs(runs, spill_path, tmp)
+    import pandas as pd
+    return pd.DataFrame({"model_name": top[1], "score": top[2]})
@@ -0,0 +1,306 @@
+# instrumentation.py
+import cProfile
+import functools
+import io
+import math
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+# Upper bounds (seconds) of the latency histogram buckets: 1 us to ~137 s, doubling (last bucket: +inf)
+BUCKET_BOUNDS = tuple(1e-6 * 2.0 ** i for i in range(28))
+
+_enabled = os.environ.get("MCDM_METRICS", "0").lower() in ("1", "true", "yes")
+_histograms = {}
+_histograms_lock = threading.Lock()
+_stack = threading.local()
+
+
+class Histogram:
+    """
+    Latency histogram of one span name, with log-spaced buckets (see BUCKET_BOUNDS).
+
+    Attributes:
+        count (int): Number of recorded spans.
+        total (float): Sum of the span durations (seconds), children included.
+        self_total (float): Sum of the span durations minus the time spent in nested spans.
+        min, max (float): Shortest and longest duration.
+        buckets (ndarray): Number of durations in every bucket.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.self_total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = np.zeros(len(BUCKET_BOUNDS) + 1, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def record(self, seconds, self_seconds=None):
+        bucket = int(np.searchsorted(BUCKET_BOUNDS, seconds))
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self.self_total += seconds if self_seconds is None else self_seconds
+            self.min = min(self.min, seconds)
+            self.max = max(self.max, seconds)
+            self.buckets[bucket] += 1
+
+    def quantile(self, q):
+        """Approximate quantile: upper bound of the bucket holding it (clipped to the observed range)."""
+        if self.count == 0:
+            return 0.0
+        bucket = int(np.searchsorted(np.cumsum(self.buckets), q * self.count))
+        bound = BUCKET_BOUNDS[bucket] if bucket < len(BUCKET_BOUNDS) else self.max
+        return min(max(bound, self.min), self.max)
+
+    def summary(self):
+        """count, total, self, mean, min, max, p50, p90 and p99 (seconds), and the non-empty buckets."""
+        with self._lock:
+            return {
+                "count": self.count,
+                "total": self.total,
+                "self": self.self_total,
+                "mean": self.total / self.count if self.count else 0.0,
+                "min": self.min if self.count else 0.0,
+                "max": self.max,
+                "p50": self.quantile(0.5),
+                "p90": self.quantile(0.9),
+                "p99": self.quantile(0.99),
+                "buckets": {("+Inf" if i == len(BUCKET_BOUNDS) else f"{BUCKET_BOUNDS[i]:.6g}"): int(c)
+                            for i, c in enumerate(self.buckets) if c},
+            }
+
+
+class _Span:
+    __slots__ = ("name", "start", "child_time")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_stack, "spans", None)
+        if stack is None:
+            stack = _stack.spans = []
+        stack.append(self)
+        self.child_time = 0.0
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _stack.spans
+        stack.pop()
+        if stack:
+            stack[-1].child_time += elapsed
+        record(self.name, elapsed, elapsed - self.child_time)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable(enabled=True):
+    """Turn the recording of spans on or off (default: the MCDM_METRICS environment variable)."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled():
+    return _enabled
+
+
+def span(name):
+    """
+    Time a block of code under a stage name, e.g. ``with span("normalize.min_max"): ...``.
+    Nested spans are subtracted from the self time of their parent. When recording is disabled,
+    a shared no-op context manager is returned, so a span costs one function call.
+
+    Args:
+        name (str): Stage name (dotted, e.g. "rank.topsis").
+
+    Returns:
+        context manager: The span.
+    """
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def instrumented(name):
+    """
+    Decorator recording every call of a function as a span.
+
+    Args:
+        name (str): Stage name.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record(name, seconds, self_seconds=None):
+    """Add a duration measured elsewhere (e.g. in a worker process) to the histogram of a stage."""
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(name, Histogram())
+    histogram.record(seconds, self_seconds)
+
+
+def get_metrics():
+    """
+    Return the latency summary of every recorded stage.
+
+    Returns:
+        dict: Mapping of stage names to Histogram.summary() dicts, sorted by name.
+    """
+    with _histograms_lock:
+        histograms = dict(_histograms)
+    return {name: histograms[name].summary() for name in sorted(histograms)}
+
+
+def reset_metrics():
+    """Drop every recorded span."""
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def format_metrics(metrics=None):
+    """
+    Format the stage latencies as a text table (times in milliseconds), slowest total first.
+
+    Args:
+        metrics (dict, optional): Output of get_metrics(). Defaults to the current metrics.
+
+    Returns:
+        str: The table.
+    """
+    metrics = get_metrics() if metrics is None else metrics
+    width = max([len("stage")] + [len(name) for name in metrics])
+    lines = [f"{'stage':<{width}} {'count':>7} {'total':>11} {'self':>11} {'mean':>10} {'p50':>10} {'p99':>10}"]
+    for name, m in sorted(metrics.items(), key=lambda item: -item[1]["total"]):
+        lines.append(f"{name:<{width}} {m['count']:>7} {1e3 * m['total']:>11.3f} {1e3 * m['self']:>11.3f} "
+                     f"{1e3 * m['mean']:>10.3f} {1e3 * m['p50']:>10.3f} {1e3 * m['p99']:>10.3f}")
+    return "\n".join(lines)
+
+
+def prometheus_metrics(metrics=None, prefix="mcdm_stage_seconds"):
+    """
+    Format the stage latencies in the Prometheus text exposition format (one histogram per stage).
+
+    Args:
+        metrics (dict, optional): Output of get_metrics(). Defaults to the current metrics.
+        prefix (str): Metric name.
+
+    Returns:
+        str: The exposition text.
+    """
+    metrics = get_metrics() if metrics is None else metrics
+    lines = [f"# TYPE {prefix} histogram"]
+    for name, m in metrics.items():
+        cumulative = 0
+        for bound in list(f"{b:.6g}" for b in BUCKET_BOUNDS) + ["+Inf"]:
+            cumulative += m["buckets"].get(bound, 0)
+            lines.append(f'{prefix}_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{prefix}_sum{{stage="{name}"}} {m["total"]}')
+        lines.append(f'{prefix}_count{{stage="{name}"}} {m["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+class Capture:
+    """
+    cProfile and/or tracemalloc capture of a block of code, for the slow cases:
+    ``with Capture(cpu=True, memory=True) as capture: ...`` then ``capture.report()``.
+    cProfile only sees the calling thread; tracemalloc traces every thread of the process.
+
+    Attributes:
+        cpu (bool): Profile the function calls (cProfile).
+        memory (bool): Trace the memory allocations (tracemalloc).
+        elapsed (float): Wall time of the block (seconds).
+        peak (int or None): Peak traced memory during the block (bytes).
+    """
+
+    def __init__(self, cpu=True, memory=False):
+        self.cpu = cpu
+        self.memory = memory
+        self.elapsed = 0.0
+        self.peak = None
+        self._profile = None
+        self._stats = None
+        self._top = None
+        self._owns_tracing = False
+
+    def __enter__(self):
+        if self.memory:
+            self._owns_tracing = not tracemalloc.is_tracing()
+            if self._owns_tracing:
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._before = tracemalloc.take_snapshot()
+        if self.cpu:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self._start
+        if self.cpu:
+            self._profile.disable()
+        if self.memory:
+            # Snapshot before building the cProfile statistics, which would otherwise show up as allocations
+            self.peak = tracemalloc.get_traced_memory()[1]
+            self._top = tracemalloc.take_snapshot().compare_to(self._before, "lineno")
+            self._before = None
+            if self._owns_tracing:
+                tracemalloc.stop()
+        if self.cpu:
+            self._stats = pstats.Stats(self._profile)
+        return False
+
+    def report(self, limit=25, sort="cumulative"):
+        """
+        Text report: the slowest functions (cProfile) and the largest allocation sites (tracemalloc).
+
+        Args:
+            limit (int): Number of functions and allocation sites listed.
+            sort (str): pstats sort key of the functions.
+
+        Returns:
+            str: The report.
+        """
+        out = io.StringIO()
+        out.write(f"Wall time: {self.elapsed:.6f} s\n")
+        if self._stats is not None:
+            self._stats.stream = out
+            out.write("\nFunctions (cProfile, calling thread):\n")
+            self._stats.sort_stats(sort).print_stats(limit)
+        if self._top is not None:
+            out.write(f"\nPeak traced memory: {self.peak / 1024 / 1024:.3f} MiB\n")
+            out.write("Allocation sites still holding memory (tracemalloc):\n")
+            for stat in self._top[:limit]:
+                out.write(f"{stat}\n")
+        return out.getvalue()
@@ -1,19 +1,325 @@
 # main.py
 import argparse
+import csv
+import os
+import sys
 import time
-import pandas as pd
+from collections import OrderedDict
+from datetime import date
 
-# Import algorithm modules
-from weights import *
-from ranking import *
+from ranking_daemon import call_daemon, daemon_address, default_address, serve_daemon, stop_daemon
+
+# The algorithm modules are imported by the commands that use them: a ranking only loads NumPy and the
+# ranking core, pandas is loaded by 'preprocess', 'compare', 'convert', 'batch' and the streaming mode, and a command forwarded
+# to the ranking daemon (MCDM_DAEMON) loads nothing but the standard library.
+
+# Datasets kept loaded between the commands run by the ranking daemon, by path, size and modification time
+DATASET_CACHE_SIZE = 8
+_datasets = OrderedDict()
+
+def default_criteria_type(criteria_columns):
+    """Criterion types of the declarative schema (see dataio.module_preprocess.CRITERIA_SCHEMA)."""
+    from dataio.module_preprocess import criteria_type_from_schema
+    return criteria_type_from_schema(criteria_columns)
+
+def csv_criteria_columns(path):
+    """Criteria columns of a CSV file: every column of its header row except 'model_name'."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [col for col in next(csv.reader(f), []) if col != "model_name"]
+
+def compute_ahp_from_args(args):
+    """AHP weights of the --pairwise_file workbook, or group AHP weights of several comma-separated workbooks."""
+    from weights import compute_ahp_weights_from_excel, compute_group_ahp_weights_from_excel, format_consistency_ratio
+    files = [f for f in args.pairwise_file.split(",") if f]
+    if len(files) > 1:
+        weights = compute_group_ahp_weights_from_excel(files, args.ahp_aggregation, args.ahp_method)
+    else:
+        weights = compute_ahp_weights_from_excel(files[0], args.ahp_method)
+    print(format_consistency_ratio(weights))
+    return weights
+
+def add_method_params(parser):
+    """Add one command-line flag per parameter of the registered ranking methods."""
+    from ranking import available_methods
+    flags = set()
+    for method in available_methods():
+        for param in method.params:
+            if param.flag in flags:
+                continue
+            flags.add(param.flag)
+            default = f", default: {param.default}" if param.default is not None else ""
+            parser.add_argument(f"--{param.flag}", type=param.type, choices=param.choices, default=None,
+                                help=f"{param.help} ({method.label}{default})")
+
+def method_params_from_args(method, args):
+    """Parameters of a ranking method given on the command line (the others keep their defaults)."""
+    return {p.name: getattr(args, p.flag) for p in method.params if getattr(args, p.flag, None) is not None}
+
+def load_dataset(path):
+    """
+    Load a dataset: a binary dataset is memory-mapped, with the criteria types stored in the file;
+    a CSV file is parsed with NumPy (see DecisionMatrix.from_csv).
+    The last DATASET_CACHE_SIZE datasets stay loaded while the file is unchanged (ranking daemon).
+
+    Returns:
+        tuple: (DecisionMatrix, criteria_columns, criteria_type).
+    """
+    from common_utils import DecisionMatrix
+    from dataio import is_binary_dataset, load_decision_matrix
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key in _datasets:
+        _datasets.move_to_end(key)
+        return _datasets[key]
+    if is_binary_dataset(path):
+        dm = load_decision_matrix(path)
+    else:
+        # Identify criteria columns (all columns except 'model_name')
+        criteria_columns = csv_criteria_columns(path)
+        # Criterion types come from the declarative schema
+        dm = DecisionMatrix.from_csv(path, criteria_columns, default_criteria_type(criteria_columns))
+    _datasets[key] = dm, dm.criteria_columns, dm.criteria_type
+    while len(_datasets) > DATASET_CACHE_SIZE:
+        _datasets.popitem(last=False)
+    return _datasets[key]
+
+def print_ranking(ranking, positions):
+    """Print the given rows of a LazyRanking, best first (rank, name, score), without building a DataFrame."""
+    names = [str(name) for name in ranking.names(positions)]
+    width = max([len("model_name")] + [len(name) for name in names])
+    print(f"{'rank':>5}  {'model_name':<{width}}  {'score':>12}")
+    for rank, (name, score) in enumerate(zip(names, ranking.scores[positions]), start=1):
+        print(f"{rank:>5}  {name:<{width}}  {score:>12.6f}")
+
+def compare_command(argv):
+    """Compare the rankings of several methods and print consensus rankings: python main.py compare --file x.csv"""
+    import pandas as pd
+    from analysis import compare_rankings
+    from ranking import available_methods
+    from weights import compute_entropy_weights
+    ranking_methods = {method.name: method for method in available_methods()}
+    parser = argparse.ArgumentParser(prog="main.py compare",
+                                     description="Rank correlations between MCDM methods and consensus rankings")
+    parser.add_argument("--file", type=str, default="cleaned_samsung_phones.csv",
+                        help="Path to the CSV data file, or a binary dataset")
+    parser.add_argument("--weight_method", type=str, choices=["ahp", "entropy"], default="entropy",
+                        help="Method to compute criteria weights (ahp or entropy)")
+    parser.add_argument("--pairwise_file", type=str, default="pairwise_matrix.xlsx",
+                        help="Pairwise comparison workbook(s) for AHP (comma-separated for group AHP)")
+    parser.add_argument("--ahp_method", type=str, choices=["eig", "power", "geometric"], default="eig",
+                        help="AHP priority vector method")
+    parser.add_argument("--ahp_aggregation", type=str, choices=["aij", "aip"], default="aij",
+                        help="Group AHP aggregation")
+    parser.add_argument("--methods", type=str, default=",".join(ranking_methods),
+                        help="Comma-separated ranking methods to compare")
+    parser.add_argument("--top_k", type=int, default=10, help="Size of the compared tops and of the printed consensus")
+    parser.add_argument("--output", type=str, default=None, help="CSV file receiving the full consensus ranking")
+    parser.add_argument("--precision", type=str, choices=["float64", "float32"], default=None,
+                        help="Floating point type of the decision matrix (default: float64, or the type of a binary "
+                             "dataset)")
+    add_method_params(parser)
+    args = parser.parse_args(argv)
+    methods = [m for m in args.methods.split(",") if m]
+    unknown = [m for m in methods if m not in ranking_methods]
+    if unknown:
+        parser.error(f"Unknown ranking methods: {', '.join(unknown)}")
+
+    dm, criteria_columns, criteria_type = load_dataset(args.file)
+    if args.precision:
+        dm = dm.astype(args.precision)
+    try:
+        if args.weight_method == "ahp":
+            weights = compute_ahp_from_args(args)
+        else:
+            weights = compute_entropy_weights(dm, criteria_columns, criteria_type)
+    except ValueError as e:
+        print("Error in weight computation:", e)
+        return
+    start = time.perf_counter()
+    rankings = {m: ranking_methods[m].rank(dm, criteria_columns, weights, criteria_type, lazy=True,
+                                           **method_params_from_args(ranking_methods[m], args))
+                for m in methods}
+    comparison = compare_rankings(rankings, top_k=args.top_k)
+    end = time.perf_counter()
+
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print("Kendall's tau-b:")
+        print(comparison["kendall"].round(4))
+        print("\nSpearman's rho:")
+        print(comparison["spearman"].round(4))
+        print(f"\nTop-{args.top_k} overlap:")
+        print(comparison["overlap"].round(4))
+        print(f"\nConsensus ranking (top {args.top_k}):")
+        print(comparison["consensus"].head(args.top_k))
+    print("Ranking and comparison time: {:.6f} seconds".format(end - start))
+    if args.output:
+        comparison["consensus"].to_csv(args.output, index=False)
+        print(f"Consensus ranking written to {args.output}")
+
+def convert_command(argv):
+    """Convert a CSV dataset to the memory-mappable binary format: python main.py convert --file x.csv --output x.mcdm"""
+    from dataio import convert_csv
+    parser = argparse.ArgumentParser(prog="main.py convert",
+                                     description="Convert a CSV dataset to the binary decision matrix format")
+    parser.add_argument("--file", type=str, default="cleaned_samsung_phones.csv", help="Path to the CSV data file")
+    parser.add_argument("--output", type=str, default=None, help="Output file (default: the CSV path with .mcdm)")
+    parser.add_argument("--dtype", type=str, choices=["float64", "float32"], default="float64",
+                        help="Floating point type of the stored values")
+    parser.add_argument("--chunksize", type=int, default=100000, help="Rows read per chunk")
+    args = parser.parse_args(argv)
+    output = args.output or f"{args.file.rsplit('.', 1)[0]}.mcdm"
+    criteria_columns = csv_criteria_columns(args.file)
+    start = time.perf_counter()
+    header = convert_csv(args.file, output, criteria_columns, default_criteria_type(criteria_columns),
+                         dtype=args.dtype, chunksize=args.chunksize)
+    end = time.perf_counter()
+    print(f"Wrote {output}: {header['n']} alternatives x {header['m']} criteria ({header['dtype']})")
+    print("Conversion time: {:.6f} seconds".format(end - start))
+
+def preprocess_command(argv):
+    """Clean the raw phones dataset: python main.py preprocess --file phones_data.csv --output samsung.mcdm"""
+    from dataio import PHONES_REFERENCE_DATE, prepare_dataset
+    parser = argparse.ArgumentParser(prog="main.py preprocess",
+                                     description="Filter, clean and type the raw phones dataset, and write it as "
+                                                 "a CSV file or directly as a binary dataset (.mcdm)")
+    parser.add_argument("--file", type=str, default="phones_data.csv", help="Path to the raw CSV data file")
+    parser.add_argument("--output", type=str, required=True,
+                        help="Output file: a binary dataset for the .mcdm extension, CSV otherwise")
+    parser.add_argument("--brand", type=str, default="Samsung", help="Brand kept ('all' keeps every brand)")
+    parser.add_argument("--os", type=str, default=None, help="Operating system kept (default: every system)")
+    parser.add_argument("--missing", type=str, choices=["drop", "median", "mean"], default="drop",
+                        help="Drop the rows with missing values, or fill them with the column median or mean")
+    parser.add_argument("--reference_date", type=str, default=PHONES_REFERENCE_DATE,
+                        help="Date the release ages are measured at, e.g. 2024-01-01, or 'today' "
+                             f"(default: {PHONES_REFERENCE_DATE}, the date of cleaned_samsung_phones.csv)")
+    parser.add_argument("--dtype", type=str, choices=["float64", "float32"], default="float64",
+                        help="Floating point type of a binary output")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild the output even if it is newer than the raw file")
+    args = parser.parse_args(argv)
+    # A concrete date, printed below, so that the run can be reproduced
+    reference_date = date.today().isoformat() if args.reference_date == "today" else args.reference_date
+    start = time.perf_counter()
+    try:
+        output, n = prepare_dataset(args.file, args.output, dtype=args.dtype, force=args.force,
+                                    brand=None if args.brand.lower() == "all" else args.brand, os_name=args.os,
+                                    missing=args.missing, reference_date=reference_date)
+    except ValueError as e:
+        print("Error in preprocessing:", e)
+        return
+    end = time.perf_counter()
+    if n is None:
+        print(f"{output} is up to date (use --force to rebuild it)")
+    else:
+        print(f"Wrote {output}: {n} alternatives, release ages measured at {reference_date}")
+    print("Preprocessing time: {:.6f} seconds".format(end - start))
+
+def batch_command(argv):
+    """Rank every scenario of a manifest: python main.py batch --manifest scenarios.json --output results.csv"""
+    from services import get_executor, load_manifest, run_scenarios
+    parser = argparse.ArgumentParser(prog="main.py batch",
+                                     description="Rank datasets x weight sources x methods x parameters from a "
+                                                 "JSON scenario manifest and write all rankings into one table")
+    parser.add_argument("--manifest", type=str, required=True, help="Path to the JSON scenario manifest")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Output table, .csv or .parquet (default: the 'output' of the manifest)")
+    parser.add_argument("--jobs", type=int, default=0,
+                        help="Worker processes (default: the number of CPUs; 1 runs every task in this process)")
+    parser.add_argument("--timings", type=str, default=None, help="CSV file receiving the time of every task")
+    parser.add_argument("--quiet", action="store_true", help="Only print the summary")
+    args = parser.parse_args(argv)
+    try:
+        plan = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print("Error in scenario manifest:", e)
+        return
+    output = args.output or plan["output"]
+    if not output:
+        print("Error: no output file (use --output or set 'output' in the manifest).")
+        return
+    jobs = args.jobs or os.cpu_count() or 1
+    n_scenarios = len(plan["datasets"]) * len(plan["weights"]) * len(plan["scenarios"])
+    print(f"{n_scenarios} scenarios: {len(plan['datasets'])} datasets x {len(plan['weights'])} weight sources x "
+          f"{len(plan['scenarios'])} method settings, {jobs} worker{'s' if jobs > 1 else ''}")
+
+    def progress(task, elapsed, error, done, total):
+        if error is not None:
+            print(f"[{done:>{len(str(total))}}/{total}] {task.kind:<7} {task.label}  FAILED: {error}", flush=True)
+        elif not args.quiet:
+            print(f"[{done:>{len(str(total))}}/{total}] {task.kind:<7} {task.label}  {1e3 * elapsed:.3f} ms",
+                  flush=True)
+
+    try:
+        run = run_scenarios(plan, output, get_executor("process", jobs) if jobs > 1 else None, progress)
+    except ValueError as e:
+        print("Error in batch run:", e)
+        return
+    print("\nTask times (ms):")
+    print(f"{'task':<8} {'count':>7} {'failed':>7} {'total':>11} {'mean':>10} {'max':>10}")
+    for kind in ("load", "weights", "rank"):
+        ids = [task.id for task in run["tasks"] if task.kind == kind]
+        times = [run["timings"][i] for i in ids if i not in run["errors"]] or [0.0]
+        failed = sum(i in run["errors"] for i in ids)
+        print(f"{kind:<8} {len(ids):>7} {failed:>7} {1e3 * sum(times):>11.3f} {1e3 * sum(times) / len(times):>10.3f} "
+              f"{1e3 * max(times):>10.3f}")
+    if args.timings:
+        with open(args.timings, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["kind", "task", "seconds", "error"])
+            for task in run["tasks"]:
+                writer.writerow([task.kind, task.label, run["timings"].get(task.id, ""),
+                                 run["errors"].get(task.id, "")])
+    print(f"Wrote {run['output']}: {run['rows']} rows")
+    print("Batch time: {:.6f} seconds".format(run["elapsed"]))
+    if run["errors"]:
+        print(f"{len(run['errors'])} tasks failed.")
+        sys.exit(1)
+
+def daemon_command(argv):
+    """Keep the modules and the datasets loaded for later commands: python main.py daemon (then MCDM_DAEMON=1)"""
+    parser = argparse.ArgumentParser(prog="main.py daemon",
+                                     description="Run the ranking daemon: main.py commands run with MCDM_DAEMON=1 "
+                                                 "(or the socket path) are executed by this process")
+    parser.add_argument("--socket", type=str, default=None,
+                        help=f"Unix socket path (default: MCDM_DAEMON if it is a path, else {default_address()})")
+    parser.add_argument("--preload", type=str, default="",
+                        help="Comma-separated datasets loaded before the first command")
+    parser.add_argument("--idle_timeout", type=float, default=None,
+                        help="Exit after this many seconds without a command")
+    parser.add_argument("--stop", action="store_true", help="Stop the running daemon")
+    args = parser.parse_args(argv)
+    address = args.socket or daemon_address() or default_address()
+    if args.stop:
+        print("Ranking daemon stopped." if stop_daemon(address) else f"No ranking daemon listens on {address}.")
+        return
+    # Import the ranking core and load the datasets once, before the first command
+    import ranking
+    import weights
+    for path in (p for p in args.preload.split(",") if p):
+        load_dataset(path)
+    print(f"Ranking daemon listening on {address}", flush=True)
+    try:
+        serve_daemon(main, address, args.idle_timeout)
+    except RuntimeError as e:
+        print(e)
+
+SUBCOMMANDS = {"preprocess": preprocess_command, "convert": convert_command, "compare": compare_command,
+               "batch": batch_command, "daemon": daemon_command}
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in SUBCOMMANDS:
+        SUBCOMMANDS[argv[0]](argv[1:])
+        return
+    from instrumentation import Capture, enable, format_metrics, is_enabled, reset_metrics
+    from ranking import available_methods
 
-def main():
     parser = argparse.ArgumentParser(
         description="Multi-Criteria Decision Making (MCDM) for Samsung Phones Dataset"
     )
     parser.add_argument(
         "--file", type=str, default="cleaned_samsung_phones.csv",
-        help="Path to the CSV data file"
+        help="Path to the CSV data file, or a binary dataset written by 'main.py convert'"
     )
     parser.add_argument(
         "--weight_method", type=str, choices=["ahp", "entropy"], default="entropy",
@@ -21,37 +327,97 @@ def main():
     )
     parser.add_argument(
         "--pairwise_file", type=str, default="pairwise_matrix.xlsx",
-        help="Path to the Excel file containing the pairwise comparison matrix (for AHP)"
+        help="Path to the Excel file containing the pairwise comparison matrix (for AHP); "
+             "several comma-separated files (one per expert) compute group AHP weights"
+    )
+    parser.add_argument(
+        "--ahp_method", type=str, choices=["eig", "power", "geometric"], default="eig",
+        help="AHP priority vector: eigen-decomposition, power iteration or geometric mean"
+    )
+    parser.add_argument(
+        "--ahp_aggregation", type=str, choices=["aij", "aip"], default="aij",
+        help="Group AHP: aggregate the experts' judgments (aij) or their priorities (aip)"
     )
     parser.add_argument(
         "--rank_method", type=str,
-        choices=["wsm", "wpm", "waspas", "topsis", "promethee", "vikor"],
+        choices=[method.name for method in available_methods()],
         default="topsis", help="Method to rank alternatives"
     )
-    args = parser.parse_args()
-    
-    # Load dataset
-    df = pd.read_csv(args.file)
-    
-    # Identify criteria columns (all columns except 'model_name')
-    criteria_columns = [col for col in df.columns if col != "model_name"]
-    
-    # Define criteria types: if column name contains 'price' or 'date', treat as cost; otherwise, benefit.
-    criteria_type = {}
-    for col in criteria_columns:
-        if "price" in col.lower() or "date" in col.lower():
-            criteria_type[col] = "cost"
+    add_method_params(parser)
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Rank the CSV file chunk by chunk in constant memory (wsm, wpm or topsis)"
+    )
+    parser.add_argument(
+        "--top_k", type=int, default=10,
+        help="Number of best alternatives printed (0 prints the full ranking; must be positive with --stream, "
+             "use --spill_file for the full ranking)"
+    )
+    parser.add_argument(
+        "--precision", type=str, choices=["float64", "float32"], default=None,
+        help="Floating point type of the decision matrix (default: float64, or the type of a binary dataset); "
+             "float32 halves its memory"
+    )
+    parser.add_argument(
+        "--chunksize", type=int, default=100000,
+        help="Rows read per chunk in streaming mode"
+    )
+    parser.add_argument(
+        "--spill_file", type=str, default=None,
+        help="CSV file receiving the full ranking in streaming mode"
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Record the latency of every stage (load, weights, normalization, kernel, sort) and print it"
+    )
+    parser.add_argument(
+        "--profile_capture", type=str, choices=["cpu", "memory", "all"], default=None,
+        help="Profile the run with cProfile (cpu) and/or tracemalloc (memory) and print the report"
+    )
+    args = parser.parse_args(argv)
+    if args.stream and args.top_k < 1:
+        parser.error("--top_k must be positive with --stream (use --spill_file for the full ranking)")
+
+    metrics_enabled = is_enabled()
+    if args.profile:
+        enable()
+        reset_metrics()
+    run = run_streaming if args.stream else run_ranking
+    try:
+        if args.profile_capture:
+            with Capture(cpu=args.profile_capture in ("cpu", "all"),
+                         memory=args.profile_capture in ("memory", "all")) as capture:
+                run(args)
+            print("\nProfile:")
+            print(capture.report())
         else:
-            criteria_type[col] = "benefit"
+            run(args)
+        if args.profile:
+            print("\nStage latencies (ms):")
+            print(format_metrics())
+    finally:
+        # A daemon runs the next commands with the recording state it started with
+        enable(metrics_enabled)
+
+def run_ranking(args):
+    """Load the dataset into memory, compute the weights and rank with the selected method."""
+    from instrumentation import span
+    from ranking import get_method
+    from weights import compute_entropy_weights
+    start = time.perf_counter()
+    with span("dataset.load"):
+        dm, criteria_columns, criteria_type = load_dataset(args.file)
+    end = time.perf_counter()
+    print("Dataset load time: {:.6f} seconds".format(end - start))
     
     print("Selected Weight Computation Method:", args.weight_method)
     # Compute weights and measure execution time
     start = time.perf_counter()
     try:
         if args.weight_method == "ahp":
-            weights = compute_ahp_weights_from_excel(args.pairwise_file)
+            weights = compute_ahp_from_args(args)
         else:  # entropy
-            weights = compute_entropy_weights(df, criteria_columns, criteria_type)
+            weights = compute_entropy_weights(dm, criteria_columns, criteria_type)
     except ValueError as e:
         print("Error in weight computation:", e)
         return
@@ -62,23 +428,69 @@ def main():
     # Rank alternatives based on the selected ranking method and measure execution time
     print("\nSelected Ranking Method:", args.rank_method)
     start = time.perf_counter()
-    if args.rank_method == "wsm":
-        ranking = rank_wsm(df, criteria_columns, weights, criteria_type)
-    elif args.rank_method == "wpm":
-        ranking = rank_wpm(df, criteria_columns, weights, criteria_type)
-    elif args.rank_method == "waspas":
-        ranking = rank_waspas(df, criteria_columns, weights, criteria_type, lambda_val=0.5)
-    elif args.rank_method == "topsis":
-        ranking = rank_topsis(df, criteria_columns, weights, criteria_type)
-    elif args.rank_method == "promethee":
-        ranking = rank_promethee(df, criteria_columns, weights, criteria_type)
-    elif args.rank_method == "vikor":
-        ranking = rank_vikor(df, criteria_columns, weights, criteria_type, v=0.5)
+    if args.precision:
+        dm = dm.astype(args.precision)
+    # Only the printed alternatives are selected and named (partial selection, no full sort)
+    top_k = args.top_k if args.top_k and args.top_k > 0 else None
+    method = get_method(args.rank_method)
+    ranking = method.rank(dm, criteria_columns, weights, criteria_type, lazy=True,
+                          **method_params_from_args(method, args))
+    positions = ranking.positions(0, top_k or len(ranking))
     end = time.perf_counter()
     
-    print("Ranking Results (based on 'model_name'):")
-    print(ranking)
+    if top_k is None:
+        print("Ranking Results (based on 'model_name'):")
+    else:
+        print(f"Top {top_k} Ranking Results (based on 'model_name', {dm.shape[0]} alternatives):")
+    print_ranking(ranking, positions)
+    if "error_bound" in ranking.attrs:
+        print("Sampled net flows ({} reference alternatives): every score is within {:.6f} of the exact one "
+              "with probability {:.0%} (largest standard error {:.6f})".format(
+                  ranking.attrs["sample_size"], ranking.attrs["error_bound"], 1 - ranking.attrs["delta"],
+                  float(max(ranking.attrs["stderr"]))))
     print("Ranking computation time: {:.6f} seconds".format(end - start))
     
+def run_streaming(args):
+    """Rank a CSV file larger than memory: one statistics pass, then one scoring pass with a bounded top-k."""
+    from dataio import STREAM_METHODS, compute_column_stats, compute_entropy_weights_streaming, rank_csv_streaming
+    if args.rank_method not in STREAM_METHODS:
+        print("Streaming mode supports the ranking methods:", ", ".join(STREAM_METHODS))
+        return
+    criteria_columns = csv_criteria_columns(args.file)
+    criteria_type = default_criteria_type(criteria_columns)
+
+    print("Selected Weight Computation Method:", args.weight_method)
+    start = time.perf_counter()
+    try:
+        stats = compute_column_stats(args.file, criteria_columns, args.chunksize)
+        if args.weight_method == "ahp":
+            weights = compute_ahp_from_args(args)
+        else:  # entropy
+            weights = compute_entropy_weights_streaming(args.file, criteria_columns, criteria_type, stats,
+                                                        args.chunksize)
+    except ValueError as e:
+        print("Error in weight computation:", e)
+        return
+    end = time.perf_counter()
+    print("Computed Weights:", weights)
+    print("Weight computation time: {:.6f} seconds".format(end - start))
+
+    print("\nSelected Ranking Method:", args.rank_method)
+    start = time.perf_counter()
+    ranking = rank_csv_streaming(args.file, criteria_columns, weights, criteria_type, args.rank_method,
+                                 args.top_k, args.spill_file, stats, args.chunksize)
+    end = time.perf_counter()
+    print(f"Top {args.top_k} Ranking Results (based on 'model_name', {stats['count']} alternatives):")
+    print(ranking)
+    if args.spill_file:
+        print("Full ranking written to", args.spill_file)
+    print("Ranking computation time: {:.6f} seconds".format(end - start))
+
 if __name__ == "__main__":
-    main()
+    # Forward the command to the ranking daemon if one is enabled and running, otherwise run it here
+    address = daemon_address()
+    status = call_daemon(sys.argv[1:], address) if address and sys.argv[1:2] != ["daemon"] else None
+    if status is None:
+        main()
+    else:
+        sys.exit(status)
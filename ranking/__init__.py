@@ -4,6 +4,9 @@ from .module_waspas import rank_waspas
 from .module_topsis import rank_topsis
 from .module_promethee import rank_promethee
 from .module_vikor import rank_vikor
+from .module_batch import rank_batch
+from .module_incremental import RankingSession
+from .module_registry import RankingMethod, MethodParam, register_method, get_method, available_methods
 
 __all__ = [
     "rank_wsm",
@@ -11,5 +14,12 @@ __all__ = [
     "rank_waspas",
     "rank_topsis",
     "rank_promethee",
-    "rank_vikor"
+    "rank_vikor",
+    "rank_batch",
+    "RankingSession",
+    "RankingMethod",
+    "MethodParam",
+    "register_method",
+    "get_method",
+    "available_methods",
 ]
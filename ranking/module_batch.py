@@ -0,0 +1,102 @@
+import numpy as np
+from common_utils import as_decision_matrix, select_top_k
+from ranking.module_registry import available_methods, get_method
+
+# Number of scores (weight vectors x alternatives) computed per chunk, which bounds the working memory.
+DEFAULT_CHUNK_ELEMENTS = 1 << 22
+
+# Methods registered when this module is imported (every registered method has a batch kernel)
+BATCH_METHODS = tuple(method.name for method in available_methods())
+
+
+def weight_matrix(dm, weights):
+    """
+    Convert a collection of weight vectors to a (k x m) matrix aligned with the decision matrix columns.
+
+    Args:
+        dm (DecisionMatrix): The decision matrix.
+        weights (ndarray or list): A (k x m) array, or a list of weight dicts or vectors.
+
+    Returns:
+        ndarray: Weight matrix (shape: k x m), C-contiguous.
+    """
+    if isinstance(weights, np.ndarray):
+        W = weights
+    else:
+        W = [dm.weight_vector(w) for w in weights]
+    W = np.ascontiguousarray(W, dtype=dm.dtype)
+    if W.ndim != 2 or W.shape[1] != len(dm.criteria_columns):
+        raise ValueError("The weight matrix must have one column per criterion.")
+    return W
+
+
+def build_batch_kernel(dm, method, lambda_val=0.5, v=0.5, preference="vshape", thresholds=None, **params):
+    """
+    Build the scoring kernel of a registered ranking method for a block of weight vectors.
+    Normalizations (and PROMETHEE's per-criterion flows) are computed once, when the kernel is built.
+
+    Args:
+        dm (DecisionMatrix): The decision matrix.
+        method (str): A registered method name (see ranking.available_methods).
+        lambda_val (float): WASPAS balancing parameter.
+        v (float): VIKOR strategy weight.
+        preference (str or dict): PROMETHEE preference function.
+        thresholds (dict, optional): PROMETHEE thresholds.
+        **params: Parameters of other registered methods.
+
+    Returns:
+        tuple: (kernel, ascending), where kernel maps a (k x m) weight matrix to (k x n) scores.
+
+    Raises:
+        ValueError: If the method is not registered.
+    """
+    spec = get_method(method)
+    kernel = spec.build_kernel(dm, lambda_val=lambda_val, v=v, preference=preference, thresholds=thresholds, **params)
+    return kernel, spec.ascending
+
+
+def rank_batch(df, criteria_columns, weights, criteria_type, method="wsm", lambda_val=0.5, v=0.5,
+               preference="vshape", thresholds=None, top_k=None, chunk_size=None, **params):
+    """
+    Score one dataset under many weight vectors at once.
+    Weight vectors are processed in chunks; each chunk is scored with matrix products
+    (a single GEMM for WSM, WASPAS and PROMETHEE, log-space GEMM for WPM, weighted squared distances for TOPSIS).
+
+    Args:
+        df (DataFrame or DecisionMatrix): Original dataset.
+        criteria_columns (list): List of criteria column names.
+        weights (ndarray or list): Weight matrix (shape: k x m), or a list of weight dicts.
+        criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
+        method (str): A registered method name ("wsm", "wpm", "waspas", "topsis", "promethee", "vikor"...).
+        lambda_val (float): WASPAS balancing parameter (default 0.5).
+        v (float): VIKOR strategy weight (default 0.5).
+        preference (str or dict): PROMETHEE preference function (default "vshape").
+        thresholds (dict, optional): PROMETHEE thresholds.
+        top_k (int, optional): If given, only the k best alternatives per weight vector are kept.
+        chunk_size (int, optional): Number of weight vectors scored per chunk.
+        **params: Parameters of other registered methods.
+
+    Returns:
+        ndarray: Score matrix (shape: k x n), or if top_k is given a tuple (indices, scores)
+                 of shape (k x top_k) with the best alternative first (lowest Q for VIKOR).
+    """
+    dm = as_decision_matrix(df, criteria_columns, criteria_type)
+    W = weight_matrix(dm, weights)
+    kernel, ascending = build_batch_kernel(dm, method, lambda_val, v, preference, thresholds, **params)
+    k, n = W.shape[0], dm.shape[0]
+    if chunk_size is None:
+        chunk_size = max(1, DEFAULT_CHUNK_ELEMENTS // max(n, 1))
+
+    if top_k is None:
+        scores = np.empty((k, n), dtype=dm.dtype)
+        for start in range(0, k, chunk_size):
+            scores[start:start + chunk_size] = kernel(W[start:start + chunk_size])
+        return scores
+
+    top_k = min(int(top_k), n)
+    indices = np.empty((k, top_k), dtype=np.intp)
+    scores = np.empty((k, top_k), dtype=dm.dtype)
+    for start in range(0, k, chunk_size):
+        stop = min(start + chunk_size, k)
+        indices[start:stop], scores[start:stop] = select_top_k(kernel(W[start:stop]), top_k, ascending)
+    return indices, scores
@@ -0,0 +1,333 @@
+import numpy as np
+from common_utils import as_decision_matrix, build_ranking
+from ranking.module_promethee import (PREFERENCE_FUNCTIONS, _resolve_preferences,
+                                      compute_promethee_criterion_flows)
+from ranking.module_wsm import compute_wsm_scores
+from ranking.module_wpm import compute_wpm_scores
+from ranking.module_topsis import compute_topsis_scores
+from ranking.module_vikor import compute_vikor_compromise
+
+INCREMENTAL_METHODS = ("wsm", "wpm", "waspas", "topsis", "promethee", "vikor")
+# Methods whose score of an alternative only depends on its own normalized row
+ROW_METHODS = ("wsm", "wpm", "waspas", "vikor_S", "vikor_R")
+
+
+class RankingSession:
+    """
+    Incremental ranking of a changing set of alternatives.
+    The session keeps the raw criteria values, the per-criterion min/max, the min-max normalized matrix,
+    the per-row scores of WSM, WPM, WASPAS and VIKOR (S, R) and the per-criterion PROMETHEE flows.
+    Inserting, deleting or updating an alternative adjusts them in O(n*m) instead of re-running
+    the O(n^2*m) pairwise comparison:
+    - PROMETHEE flows gain or lose only the pairs that involve the changed alternative.
+    - When a criterion's min or max moves, every normalized difference on it is rescaled by the same factor;
+      the "usual" and V-shape (p >= 1) flows are rescaled in O(n), other preference functions recompute
+      that criterion's flows.
+    - Row scores are only recomputed when a min/max boundary moves; TOPSIS (whose vector norms change
+      with every edit) and the VIKOR Q index are recomputed in O(n*m) when requested.
+
+    Attributes:
+        criteria_columns (list): List of criteria column names.
+        criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
+    """
+
+    def __init__(self, df, criteria_columns, weights, criteria_type, preference="vshape", thresholds=None,
+                 lambda_val=0.5, v=0.5):
+        dm = as_decision_matrix(df, criteria_columns, criteria_type)
+        self.criteria_columns = dm.criteria_columns
+        self.criteria_type = dm.criteria_type
+        self._benefit = dm.benefit
+        self._w = dm.weight_vector(weights).astype(float)
+        self._preferences = _resolve_preferences(self.criteria_columns, preference, thresholds)
+        self._lambda_val = lambda_val
+        self._v = v
+
+        n, m = dm.shape
+        capacity = max(16, 2 * n)
+        self._values = np.empty((capacity, m))
+        self._values[:n] = dm.values
+        self._names = np.empty(capacity, dtype=object)
+        self._names[:n] = dm.alternatives
+        self._ids = np.empty(capacity, dtype=np.int64)
+        self._ids[:n] = np.arange(n)
+        self._row = {i: i for i in range(n)}
+        self._n = n
+        self._next_id = n
+
+        self._norm = np.zeros((capacity, m))
+        self._phi_plus = np.zeros((capacity, m))
+        self._phi_minus = np.zeros((capacity, m))
+        self._row_scores = {name: np.zeros(capacity) for name in ROW_METHODS}
+        self._min = self._values[:n].min(axis=0) if n else np.full(m, np.inf)
+        self._max = self._values[:n].max(axis=0) if n else np.full(m, -np.inf)
+        self._refresh_norm()
+        self._refresh_flows(np.arange(m))
+
+    # ----- public API -----
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def ids(self):
+        """Identifier of each alternative, in the row order of the score arrays."""
+        return self._ids[:self._n].copy()
+
+    @property
+    def alternatives(self):
+        """Name of each alternative, in the row order of the score arrays."""
+        return self._names[:self._n]
+
+    def names(self, indices):
+        """Names of the alternatives at the given rows of the score arrays."""
+        return self.alternatives[indices]
+
+    def insert(self, name, values):
+        """
+        Add an alternative.
+
+        Args:
+            name (str): Model name of the alternative.
+            values (dict or array-like): Criteria values, by criteria name or in column order.
+
+        Returns:
+            int: Identifier of the new alternative.
+        """
+        alt_id = self._next_id
+        self._next_id += 1
+        self._add(alt_id, name, self._as_row(values))
+        return alt_id
+
+    def delete(self, alt_id):
+        """
+        Remove an alternative.
+
+        Args:
+            alt_id (int): Identifier of the alternative (see insert and ids).
+
+        Raises:
+            KeyError: If there is no such alternative.
+        """
+        self._remove(alt_id)
+
+    def update(self, alt_id, values, name=None):
+        """
+        Change the criteria values (and optionally the name) of an alternative; its identifier is kept.
+
+        Args:
+            alt_id (int): Identifier of the alternative.
+            values (dict or array-like): New criteria values.
+            name (str, optional): New model name.
+
+        Raises:
+            KeyError: If there is no such alternative.
+        """
+        row = self._as_row(values)
+        old_name = self._remove(alt_id)
+        self._add(alt_id, old_name if name is None else name, row)
+
+    def scores(self, method):
+        """
+        Current scores of every alternative, in the row order of ids.
+
+        Args:
+            method (str): One of "wsm", "wpm", "waspas", "topsis", "promethee" or "vikor".
+
+        Returns:
+            ndarray: Score of each alternative (VIKOR: Q index, lower is better).
+
+        Raises:
+            ValueError: If the method is unknown.
+        """
+        n = self._n
+        if method in ("wsm", "wpm", "waspas"):
+            return self._row_scores[method][:n].copy()
+        if method == "promethee":
+            return (self._phi_plus[:n] - self._phi_minus[:n]) @ self._w
+        if method == "topsis":
+            X = self._values[:n]
+            norm = np.sqrt((X * X).sum(axis=0))
+            V = np.zeros_like(X)
+            np.divide(X, norm, out=V, where=np.broadcast_to(norm != 0, X.shape))
+            return compute_topsis_scores(V, self._w, self._benefit)
+        if method == "vikor":
+            return self._vikor()[2]
+        raise ValueError(f"Unknown ranking method '{method}'. Choose from {', '.join(INCREMENTAL_METHODS)}.")
+
+    def rank(self, method, top_k=None):
+        """
+        Current ranking.
+
+        Args:
+            method (str): One of "wsm", "wpm", "waspas", "topsis", "promethee" or "vikor".
+            top_k (int, optional): Only return the k best alternatives, selected without a full sort.
+
+        Returns:
+            DataFrame: Ranking result with columns 'model_name' and 'score', best first.
+                       For VIKOR, the compromise solution set is stored in result.attrs['compromise'].
+        """
+        if method != "vikor":
+            return build_ranking(self, self.scores(method), top_k=top_k)
+        S, R, Q = self._vikor()
+        result = build_ranking(self, Q, ascending=True, top_k=top_k)
+        result.attrs['compromise'] = self.alternatives[compute_vikor_compromise(S, R, Q)].tolist()
+        return result
+
+    # ----- internal state maintenance -----
+
+    def _as_row(self, values):
+        if isinstance(values, dict):
+            values = [values[col] for col in self.criteria_columns]
+        row = np.asarray(values, dtype=float)
+        if row.shape != (len(self.criteria_columns),):
+            raise ValueError("An alternative must have one value per criterion.")
+        return row
+
+    def _normalize(self, X):
+        span = self._max - self._min
+        numerator = np.where(self._benefit, X - self._min, self._max - X)
+        out = np.zeros_like(numerator)
+        np.divide(numerator, span, out=out, where=np.broadcast_to(span > 0, numerator.shape))
+        return out
+
+    def _refresh_norm(self):
+        """Recompute the normalized matrix and the row scores (after a min/max boundary moved)."""
+        n = self._n
+        self._norm[:n] = self._normalize(self._values[:n])
+        self._score_rows(slice(0, n))
+
+    def _score_rows(self, rows):
+        N = self._norm[rows]
+        log_N = np.zeros_like(N)
+        np.log(N, out=log_N, where=N > 0)
+        wsm = compute_wsm_scores(N, self._w)
+        wpm = compute_wpm_scores(log_N, N == 0, self._w)
+        self._row_scores["wsm"][rows] = wsm
+        self._row_scores["wpm"][rows] = wpm
+        self._row_scores["waspas"][rows] = self._lambda_val * wsm + (1 - self._lambda_val) * wpm
+        # After min-max normalization the best value is 1 and the worst 0 (both 0 for a constant criterion)
+        span = (self._max - self._min > 0).astype(float)
+        weighted = (span - N) * (self._w / (span + 1e-6))
+        self._row_scores["vikor_S"][rows] = weighted.sum(axis=1)
+        self._row_scores["vikor_R"][rows] = weighted.max(axis=1) if N.shape[0] else 0.0
+
+    def _vikor(self):
+        n = self._n
+        S, R = self._row_scores["vikor_S"][:n], self._row_scores["vikor_R"][:n]
+        v = self._v
+        Q = v * (S - S.min()) / (S.max() - S.min() + 1e-6) + (1 - v) * (R - R.min()) / (R.max() - R.min() + 1e-6)
+        return S, R, Q
+
+    def _refresh_flows(self, columns):
+        """Recompute the PROMETHEE flows of the given criteria from scratch (O(n^2) per criterion)."""
+        if len(columns) == 0:
+            return
+        n = self._n
+        preferences = [self._preferences[j] for j in columns]
+        phi_plus, phi_minus = compute_promethee_criterion_flows(self._norm[:n][:, columns], preferences)
+        self._phi_plus[:n, columns] = phi_plus
+        self._phi_minus[:n, columns] = phi_minus
+
+    def _rescale(self, old_min, old_max):
+        """Bring the normalized matrix, the flows and the row scores to the current min/max."""
+        old_span = old_max - old_min
+        new_span = self._max - self._min
+        moved = np.flatnonzero((old_min != self._min) | (old_max != self._max))
+        if len(moved) == 0:
+            return
+        self._refresh_norm()
+        n = self._n
+        recompute = []
+        for j in moved:
+            func, q, p, s = self._preferences[j]
+            if old_span[j] > 0 and new_span[j] > 0 and func is PREFERENCE_FUNCTIONS["usual"]:
+                continue
+            if old_span[j] > 0 and new_span[j] > 0 and func is PREFERENCE_FUNCTIONS["vshape"] and p >= 1.0:
+                # Normalized differences lie in [-1, 1], so P(d) = max(d, 0) / p scales with 1 / span
+                factor = old_span[j] / new_span[j]
+                self._phi_plus[:n, j] *= factor
+                self._phi_minus[:n, j] *= factor
+            else:
+                recompute.append(j)
+        self._refresh_flows(np.array(recompute, dtype=np.intp))
+
+    def _pair_flows(self, row):
+        """Preference of row over every active row and of every active row over row, per criterion."""
+        n = self._n
+        diff = self._norm[row] - self._norm[:n]
+        forward = np.empty_like(diff)
+        backward = np.empty_like(diff)
+        for j, (func, q, p, s) in enumerate(self._preferences):
+            forward[:, j] = func(diff[:, j], q, p, s)
+            backward[:, j] = func(-diff[:, j], q, p, s)
+        return forward, backward
+
+    def _grow(self):
+        capacity = 2 * self._values.shape[0]
+        for attr in ("_values", "_names", "_ids", "_norm", "_phi_plus", "_phi_minus"):
+            old = getattr(self, attr)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, attr, new)
+        for name, old in self._row_scores.items():
+            new = np.zeros(capacity)
+            new[:self._n] = old[:self._n]
+            self._row_scores[name] = new
+
+    def _add(self, alt_id, name, row_values):
+        if self._n == self._values.shape[0]:
+            self._grow()
+        # Bring the existing rows to the new min/max first, then compare the new row with all of them
+        old_min, old_max = self._min.copy(), self._max.copy()
+        self._min = np.minimum(self._min, row_values)
+        self._max = np.maximum(self._max, row_values)
+        self._rescale(old_min, old_max)
+        r = self._n
+        self._values[r] = row_values
+        self._names[r] = name
+        self._ids[r] = alt_id
+        self._row[alt_id] = r
+        self._n += 1
+        self._norm[r] = self._normalize(row_values[None, :])[0]
+        self._score_rows(slice(r, r + 1))
+        self._add_pairs(r)
+
+    def _add_pairs(self, r):
+        # The comparison of r with itself has a zero difference, hence zero preference
+        forward, backward = self._pair_flows(r)
+        n = self._n
+        self._phi_plus[:n] += backward
+        self._phi_minus[:n] += forward
+        self._phi_plus[r] = forward.sum(axis=0)
+        self._phi_minus[r] = backward.sum(axis=0)
+
+    def _remove(self, alt_id):
+        r = self._row.pop(alt_id)
+        name = self._names[r]
+        removed = self._values[r].copy()
+        forward, backward = self._pair_flows(r)
+        n = self._n
+        self._phi_plus[:n] -= backward
+        self._phi_minus[:n] -= forward
+        # Swap-remove: move the last row into the freed slot
+        last = n - 1
+        if r != last:
+            for arr in (self._values, self._names, self._ids, self._norm, self._phi_plus, self._phi_minus):
+                arr[r] = arr[last]
+            for arr in self._row_scores.values():
+                arr[r] = arr[last]
+            self._row[int(self._ids[r])] = r
+        self._n = last
+        on_boundary = (removed == self._min) | (removed == self._max)
+        if np.any(on_boundary):
+            if self._n:
+                old_min, old_max = self._min.copy(), self._max.copy()
+                self._min = self._values[:self._n].min(axis=0)
+                self._max = self._values[:self._n].max(axis=0)
+                self._rescale(old_min, old_max)
+            else:
+                # No alternative left: start over like an empty session
+                m = len(self.criteria_columns)
+                self._min = np.full(m, np.inf)
+                self._max = np.full(m, -np.inf)
+        return name
@@ -1,43 +1,460 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
 import numpy as np
-import pandas as pd
-from common_utils import normalize_min_max
+from common_utils import as_decision_matrix, build_ranking
+from instrumentation import span
+
+# Number of pairwise differences evaluated per block (rows x alternatives).
+# 2**16 float64 values is 512 KiB, which keeps every temporary inside L2 cache.
+DEFAULT_BLOCK_ELEMENTS = 1 << 16
+
+# Default thresholds: q (indifference), p (strict preference), s (Gaussian inflection).
+DEFAULT_THRESHOLDS = {"q": 0.0, "p": 1.0, "s": 0.5}
+
+# Flow computations: "auto" picks "sorted" when it applies to more than AUTO_SORTED_MIN_N alternatives
+PROMETHEE_ALGORITHMS = ("auto", "pairwise", "sorted", "parallel", "sampled")
+AUTO_SORTED_MIN_N = 2048
+
+# Number of reference alternatives compared with every alternative by the "sampled" algorithm
+DEFAULT_SAMPLE_SIZE = 2000
+
+
+def _pref_usual(d, q, p, s):
+    return (d > 0).astype(float)
+
+
+def _pref_ushape(d, q, p, s):
+    return (d > q).astype(float)
+
+
+def _pref_vshape(d, q, p, s):
+    return np.clip(d / p, 0.0, 1.0)
+
+
+def _pref_level(d, q, p, s):
+    return np.where(d > p, 1.0, np.where(d > q, 0.5, 0.0))
+
+
+def _pref_linear(d, q, p, s):
+    return np.clip((d - q) / (p - q), 0.0, 1.0)
+
+
+def _pref_gaussian(d, q, p, s):
+    return np.where(d > 0, -np.expm1(-(d * d) / (2.0 * s * s)), 0.0)
+
+
+PREFERENCE_FUNCTIONS = {
+    "usual": _pref_usual,
+    "ushape": _pref_ushape,
+    "vshape": _pref_vshape,
+    "level": _pref_level,
+    "linear": _pref_linear,
+    "gaussian": _pref_gaussian,
+}
+
+
+def _resolve_preferences(criteria_columns, preference, thresholds):
+    """
+    Expand the preference function and thresholds into one (function, q, p, s) tuple per criterion.
+
+    Args:
+        criteria_columns (list): List of criteria column names.
+        preference (str or dict): Preference function name, or a mapping of criteria names to names.
+        thresholds (dict or None): Either a single {"q", "p", "s"} mapping applied to every criterion,
+                                   or a mapping of criteria names to such mappings.
+
+    Returns:
+        list: One (function, q, p, s) tuple per criterion.
+
+    Raises:
+        ValueError: If a preference function is unknown or its thresholds are invalid.
+    """
+    thresholds = thresholds or {}
+    shared = not any(col in thresholds for col in criteria_columns)
+    resolved = []
+    for col in criteria_columns:
+        name = preference.get(col, "vshape") if isinstance(preference, dict) else preference
+        if name not in PREFERENCE_FUNCTIONS:
+            raise ValueError(f"Unknown PROMETHEE preference function '{name}' for criterion '{col}'.")
+        params = dict(DEFAULT_THRESHOLDS)
+        params.update(thresholds if shared else thresholds.get(col, {}))
+        q, p, s = float(params["q"]), float(params["p"]), float(params["s"])
+        if name in ("vshape", "linear", "level") and p <= (q if name != "vshape" else 0.0):
+            raise ValueError(f"Preference threshold p must exceed q for criterion '{col}'.")
+        if name == "gaussian" and s <= 0:
+            raise ValueError(f"Gaussian threshold s must be positive for criterion '{col}'.")
+        resolved.append((PREFERENCE_FUNCTIONS[name], q, p, s))
+    return resolved
+
+
+def _accumulate_flows(columns, preferences, start, stop, block_size, phi_plus, phi_minus, progress=None):
+    """Add the flows of rows start..stop-1 compared with every alternative to phi_plus and phi_minus."""
+    for block_start in range(start, stop, block_size):
+        block_stop = min(block_start + block_size, stop)
+        for j, (func, q, p, s) in enumerate(preferences):
+            col = columns[:, j]
+            pref = func(col[block_start:block_stop, None] - col[None, :], q, p, s)
+            phi_plus[block_start:block_stop, j] = pref.sum(axis=1)
+            phi_minus[:, j] += pref.sum(axis=0)
+        if progress is not None:
+            progress((block_stop - start) / (stop - start))
+
+
+def _default_block_size(n):
+    return max(1, DEFAULT_BLOCK_ELEMENTS // max(n, 1))
+
+
+def _pairwise_criterion_flows(X, preferences, block_size=None, progress=None):
+    n, m = X.shape
+    phi_plus = np.zeros((n, m))
+    phi_minus = np.zeros((n, m))
+    # Column-major copies make X[:, j] a contiguous slice inside the block loop
+    columns = np.asfortranarray(X)
+    _accumulate_flows(columns, preferences, 0, n, block_size or _default_block_size(n), phi_plus, phi_minus,
+                      progress)
+    return phi_plus, phi_minus
+
+
+# Piecewise-linear preference functions as a sum of steps (height h, threshold t): h * [d > t]
+# and of ramps (t0, t1): clip((d - t0) / (t1 - t0), 0, 1), which have closed-form flows on sorted values.
+SORTED_PREFERENCES = {
+    _pref_usual: lambda q, p, s: ([(1.0, 0.0)], []),
+    _pref_ushape: lambda q, p, s: ([(1.0, q)], []),
+    _pref_level: lambda q, p, s: ([(0.5, q), (0.5, p)], []),
+    _pref_vshape: lambda q, p, s: ([], [(0.0, p)]),
+    _pref_linear: lambda q, p, s: ([], [(q, p)]),
+}
+
+
+def supports_sorted(preferences):
+    """Whether every preference function has an exact sort-based flow computation (all but "gaussian")."""
+    return all(func in SORTED_PREFERENCES for func, _, _, _ in preferences)
+
+
+def _count_steps(v, x, t):
+    """
+    For every alternative i: #{k: x_i - x_k > t} and #{k: x_k - x_i > t}, by vectorized bisection over the
+    sorted values v. The tests are the same floating-point differences as in the pairwise comparison
+    (a binary search for x_i - t can round differently exactly at the threshold).
+    """
+    n = v.shape[0]
+    counts = []
+    for plus in (True, False):
+        lo = np.zeros(x.shape[0], dtype=np.intp)
+        hi = np.full(x.shape[0], n, dtype=np.intp)
+        for _ in range(n.bit_length()):
+            mid = (lo + hi) >> 1
+            vm = v[np.minimum(mid, n - 1)]
+            # Both tests hold on a prefix of the sorted values
+            holds = ((x - vm > t) if plus else (vm - x <= t)) & (mid < hi)
+            lo = np.where(holds, mid + 1, lo)
+            hi = np.where(holds, hi, mid)
+        counts.append(lo)
+    return counts[0], n - counts[1]
+
+
+def _sorted_criterion_flows(X, preferences, progress=None):
+    """
+    Exact flows in O(m * n log n): per criterion, sort the values once; the flows of a step are counts
+    (binary searches) and the flows of a ramp are counts plus sums of a value range (prefix sums).
+    Ramps are continuous, so rounding at their thresholds only changes the flows by a few ulps.
+    """
+    n, m = X.shape
+    phi_plus = np.zeros((n, m))
+    phi_minus = np.zeros((n, m))
+    for j, (func, q, p, s) in enumerate(preferences):
+        x = np.ascontiguousarray(X[:, j])
+        v = np.sort(x)
+        prefix = np.concatenate([[0.0], np.cumsum(v)])
+        steps, ramps = SORTED_PREFERENCES[func](q, p, s)
+        for h, t in steps:
+            plus, minus = _count_steps(v, x, t)
+            phi_plus[:, j] += h * plus
+            phi_minus[:, j] += h * minus
+        for t0, t1 in ramps:
+            # phi+_i: #{x_k <= x_i - t1} + sum over x_i - t1 < x_k < x_i - t0 of (x_i - t0 - x_k) / (t1 - t0)
+            lo = np.searchsorted(v, x - t1, side="right")
+            hi = np.maximum(np.searchsorted(v, x - t0, side="left"), lo)
+            phi_plus[:, j] += lo + ((x - t0) * (hi - lo) - (prefix[hi] - prefix[lo])) / (t1 - t0)
+            # phi-_i: #{x_k >= x_i + t1} + sum over x_i + t0 < x_k < x_i + t1 of (x_k - x_i - t0) / (t1 - t0)
+            lo = np.searchsorted(v, x + t0, side="right")
+            hi = np.maximum(np.searchsorted(v, x + t1, side="left"), lo)
+            phi_minus[:, j] += (n - hi) + ((prefix[hi] - prefix[lo]) - (x + t0) * (hi - lo)) / (t1 - t0)
+        if progress is not None:
+            progress((j + 1) / m)
+    return phi_plus, phi_minus
+
 
-def rank_promethee(df, criteria_columns, weights, criteria_type):
+def _parallel_worker(names, shape, n_jobs, preferences, task, start, stop, block_size):
+    n, m = shape
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    try:
+        columns = np.ndarray((n, m), dtype=float, buffer=blocks[0].buf, order="F")
+        phi_plus = np.ndarray((n, m), dtype=float, buffer=blocks[1].buf)
+        phi_minus = np.ndarray((n_jobs, n, m), dtype=float, buffer=blocks[2].buf)[task]
+        _accumulate_flows(columns, preferences, start, stop, block_size, phi_plus, phi_minus)
+        del columns, phi_plus, phi_minus
+    finally:
+        for block in blocks:
+            block.close()
+
+
+def _parallel_criterion_flows(X, preferences, block_size=None, n_jobs=None, progress=None):
+    """
+    Pairwise flows computed by a process pool. The matrix and the outputs live in shared memory:
+    every worker compares one contiguous range of rows with all alternatives, writes its rows of phi+
+    and accumulates phi- into its own slice, so no data is pickled and no write is shared.
+    """
+    n, m = X.shape
+    n_jobs = max(1, min(int(n_jobs or os.cpu_count() or 1), n))
+    block_size = block_size or _default_block_size(n)
+    if n_jobs == 1:
+        return _pairwise_criterion_flows(X, preferences, block_size, progress)
+    sizes = (X.size * 8, X.size * 8, n_jobs * X.size * 8)
+    blocks = [shared_memory.SharedMemory(create=True, size=max(size, 1)) for size in sizes]
+    try:
+        columns = np.ndarray((n, m), dtype=float, buffer=blocks[0].buf, order="F")
+        columns[:] = X
+        phi_plus = np.ndarray((n, m), dtype=float, buffer=blocks[1].buf)
+        partial_minus = np.ndarray((n_jobs, n, m), dtype=float, buffer=blocks[2].buf)
+        partial_minus[:] = 0.0
+        bounds = np.linspace(0, n, n_jobs + 1).astype(int)
+        names = [block.name for block in blocks]
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(_parallel_worker, names, (n, m), n_jobs, preferences, task,
+                                       bounds[task], bounds[task + 1], block_size) for task in range(n_jobs)]
+            # Progress is reported per finished worker (the row blocks run in other processes)
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                if progress is not None:
+                    progress(done / n_jobs)
+        result = phi_plus.copy(), partial_minus.sum(axis=0)
+        del columns, phi_plus, partial_minus
+        return result
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _resolve_algorithm(algorithm, X, preferences):
+    if algorithm not in PROMETHEE_ALGORITHMS or algorithm == "sampled":
+        raise ValueError(f"Unknown PROMETHEE algorithm '{algorithm}'. "
+                         f"Choose from {', '.join(a for a in PROMETHEE_ALGORITHMS if a != 'sampled')}.")
+    sortable = supports_sorted(preferences) and not np.isnan(X).any()
+    if algorithm == "sorted" and not sortable:
+        raise ValueError("The sorted PROMETHEE algorithm needs piecewise-linear preference functions "
+                         "(usual, ushape, vshape, level, linear) and no missing values.")
+    if algorithm == "auto":
+        return "sorted" if sortable and X.shape[0] > AUTO_SORTED_MIN_N else "pairwise"
+    return algorithm
+
+
+def compute_promethee_criterion_flows(X, preferences, block_size=None, algorithm="auto", n_jobs=None,
+                                      progress=None):
+    """
+    Compute the unweighted positive and negative flows of every criterion.
+    - "pairwise": rows are compared in blocks so that only a (block_size x n) difference matrix exists
+      at a time; no n x n x m tensor is ever built. O(n^2 * m), any preference function.
+    - "parallel": the same pairwise computation, with the rows split across worker processes
+      that share the matrix and the outputs through shared memory.
+    - "sorted": exact O(m * n log n) computation from sorted values and prefix sums, for the
+      piecewise-linear preference functions (all but "gaussian"); equal to "pairwise" up to rounding.
+    - "auto": "sorted" above AUTO_SORTED_MIN_N alternatives when possible, otherwise "pairwise".
+
+    Args:
+        X (ndarray): Normalized decision matrix (shape: n x m), higher is better on every criterion.
+        preferences (list): One (function, q, p, s) tuple per criterion (see _resolve_preferences).
+        block_size (int, optional): Number of rows per block. Defaults to a cache-sized block.
+        algorithm (str): "auto", "pairwise", "sorted" or "parallel".
+        n_jobs (int, optional): Number of worker processes for "parallel" (defaults to the number of CPUs).
+        progress (callable, optional): Called with the completed fraction (0 to 1) after every row block
+                                       ("pairwise"), criterion ("sorted") or worker ("parallel").
+
+    Returns:
+        tuple: (phi_plus, phi_minus) arrays of shape (n x m).
+
+    Raises:
+        ValueError: If the algorithm is unknown or cannot handle the preference functions.
+    """
+    X = np.ascontiguousarray(X, dtype=float)
+    algorithm = _resolve_algorithm(algorithm, X, preferences)
+    with span("promethee.flows." + algorithm):
+        if algorithm == "sorted":
+            return _sorted_criterion_flows(X, preferences, progress)
+        if algorithm == "parallel":
+            return _parallel_criterion_flows(X, preferences, block_size, n_jobs, progress)
+        return _pairwise_criterion_flows(X, preferences, block_size, progress)
+
+
+def compute_promethee_net_flow(X, w, preferences, block_size=None, algorithm="auto", n_jobs=None, progress=None):
+    """
+    Compute the PROMETHEE II net flow (phi+ - phi-) for a weight vector.
+    The net flow is linear in the weights, so the per-criterion flows are computed once
+    and combined with the weights in a single matrix product.
+
+    Args:
+        X (ndarray): Normalized decision matrix (shape: n x m).
+        w (ndarray): Criteria weights (shape: m), or one weight vector per row (shape: k x m).
+        preferences (list): One (function, q, p, s) tuple per criterion.
+        block_size (int, optional): Number of rows per block.
+        algorithm (str): "auto", "pairwise", "sorted" or "parallel" (see compute_promethee_criterion_flows).
+        n_jobs (int, optional): Number of worker processes for "parallel".
+        progress (callable, optional): Called with the completed fraction of the flow computation.
+
+    Returns:
+        ndarray: Net flow of each alternative (shape: n, or k x n for a weight matrix).
+    """
+    phi_plus, phi_minus = compute_promethee_criterion_flows(X, preferences, block_size, algorithm, n_jobs,
+                                                            progress)
+    return np.asarray(w, dtype=float) @ (phi_plus - phi_minus).T
+
+
+def compute_promethee_net_flow_sampled(X, w, preferences, sample_size=DEFAULT_SAMPLE_SIZE, seed=0, delta=0.05,
+                                       block_size=None, progress=None):
+    """
+    Estimate the PROMETHEE II net flow by comparing every alternative with a uniform random sample
+    of s reference alternatives (drawn without replacement) instead of all n: O(n * s * m).
+    Each comparison term t_ik = sum_j w_j * (P_j(x_ij - x_kj) - P_j(x_kj - x_ij)) lies in [-W, W] with
+    W = sum_j |w_j|, and the estimate is n * mean_k(t_ik). By Serfling's inequality and a union bound,
+    all n estimates are within the returned bound of the exact net flows with probability at least 1 - delta.
+
+    Args:
+        X (ndarray): Normalized decision matrix (shape: n x m).
+        w (ndarray): Criteria weights (shape: m).
+        preferences (list): One (function, q, p, s) tuple per criterion.
+        sample_size (int): Number of reference alternatives s (the result is exact if s >= n).
+        seed (int): Seed of the random generator.
+        delta (float): Failure probability of the error bound.
+        block_size (int, optional): Number of rows per block.
+        progress (callable, optional): Called with the completed fraction after every row block.
+
+    Returns:
+        tuple: (net flow estimates (shape: n), standard errors (shape: n), simultaneous error bound (float)).
+
+    Raises:
+        ValueError: If w is not a single weight vector, or sample_size or delta is out of range.
+    """
+    X = np.ascontiguousarray(X, dtype=float)
+    w = np.asarray(w, dtype=float)
+    if w.ndim != 1:
+        raise ValueError("The sampled PROMETHEE algorithm takes a single weight vector.")
+    if sample_size is None or sample_size < 1:
+        raise ValueError("sample_size must be a positive integer.")
+    if not 0 < delta < 1:
+        raise ValueError("delta must be between 0 and 1.")
+    n, m = X.shape
+    s = min(int(sample_size), n)
+    reference = np.sort(np.random.default_rng(seed).choice(n, s, replace=False))
+    R = X[reference]
+    block_size = block_size or max(1, DEFAULT_BLOCK_ELEMENTS // s)
+    total = np.zeros(n)
+    total_sq = np.zeros(n)
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        T = np.zeros((stop - start, s))
+        for j, (func, q, p, s_) in enumerate(preferences):
+            d = X[start:stop, j, None] - R[None, :, j]
+            T += w[j] * (func(d, q, p, s_) - func(-d, q, p, s_))
+        total[start:stop] = T.sum(axis=1)
+        total_sq[start:stop] = (T * T).sum(axis=1)
+        if progress is not None:
+            progress(stop / n)
+    if s == n:
+        return total, np.zeros(n), 0.0
+    mean = total / s
+    variance = np.maximum(total_sq / s - mean * mean, 0.0) * s / max(s - 1, 1)
+    stderr = n * np.sqrt(variance / s * (n - s) / (n - 1))
+    W = np.abs(w).sum()
+    bound = n * 2.0 * W * np.sqrt((1.0 - (s - 1) / n) * np.log(2.0 * n / delta) / (2.0 * s))
+    return n * mean, stderr, float(bound)
+
+
+def compute_promethee_kernel_flows(dm, preference="vshape", thresholds=None, algorithm="auto", n_jobs=None):
+    """
+    Per-criterion net flows (phi+ - phi-) of the PROMETHEE kernel, transposed (shape: m x n, type of dm).
+    Computing them once and passing them to build_promethee_kernel (flows) spares worker processes
+    the O(n^2 * m) pairwise comparison.
+
+    Raises:
+        ValueError: If the algorithm is "sampled", which estimates the net flows of one weight vector
+                    (see rank_promethee) and has no kernel.
+    """
+    if algorithm == "sampled":
+        raise ValueError("The sampled PROMETHEE algorithm only ranks with one weight vector; batch rankings, "
+                         "sensitivity analyses and other kernel uses need an exact algorithm (auto, pairwise, "
+                         "sorted or parallel).")
+    preferences = _resolve_preferences(dm.criteria_columns, preference, thresholds)
+    phi_plus, phi_minus = compute_promethee_criterion_flows(dm.min_max, preferences, algorithm=algorithm,
+                                                            n_jobs=n_jobs)
+    return np.ascontiguousarray((phi_plus - phi_minus).T, dtype=dm.dtype)
+
+
+def build_promethee_kernel(dm, preference="vshape", thresholds=None, algorithm="auto", n_jobs=None, flows=None):
+    """
+    PROMETHEE scoring kernel: maps a (k x m) weight matrix to (k x n) net flows.
+    The net flow is linear in the weights, so the per-criterion flows are computed once, here,
+    unless flows (from compute_promethee_kernel_flows) are given.
+
+    Raises:
+        ValueError: If the algorithm is "sampled" (see compute_promethee_kernel_flows).
+    """
+    if flows is None:
+        flows = compute_promethee_kernel_flows(dm, preference, thresholds, algorithm, n_jobs)
+    return lambda W: W @ flows
+
+
+def rank_promethee(df, criteria_columns, weights, criteria_type, preference="vshape", thresholds=None,
+                   block_size=None, top_k=None, lazy=False, algorithm="auto", n_jobs=None,
+                   sample_size=DEFAULT_SAMPLE_SIZE, seed=0, delta=0.05, progress=None):
     """
     Rank alternatives using PROMETHEE:
     1. Normalize the data using min-max normalization.
-    2. Use a simple preference function: if the difference (i - k) > 0 then preference = difference; otherwise 0.
-    3. Compute the positive flow (phi+) and negative flow (phi-) by pairwise comparison.
+    2. Apply a preference function to every pairwise difference on every criterion.
+       Supported functions: "usual", "ushape", "vshape", "level", "linear" and "gaussian".
+       The default V-shape with p = 1 gives preference = difference if the difference > 0, otherwise 0.
+    3. Compute the positive flow (phi+) and negative flow (phi-): block-wise pairwise comparison,
+       split across processes ("parallel"), exact sort-based ("sorted") or estimated on a sample ("sampled").
     4. The net flow (phi+ - phi-) is used as the ranking score.
-    
+
     Args:
-        df (DataFrame): Original dataset.
+        df (DataFrame or DecisionMatrix): Original dataset.
         criteria_columns (list): List of criteria column names.
         weights (dict): Criteria weights.
         criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
-        
+        preference (str or dict): Preference function, or a mapping of criteria names to functions (default "vshape").
+        thresholds (dict, optional): Thresholds q, p and s, shared or per criterion (defaults q=0, p=1, s=0.5).
+        block_size (int, optional): Number of rows compared per block.
+        top_k (int, optional): Only return the k best alternatives, selected without a full sort.
+        lazy (bool): Return a LazyRanking, which sorts and builds the full DataFrame only on demand.
+        algorithm (str): "auto", "pairwise", "sorted", "parallel" or "sampled" (see PROMETHEE_ALGORITHMS).
+        n_jobs (int, optional): Number of worker processes for "parallel" (defaults to the number of CPUs).
+        sample_size (int): Number of reference alternatives for "sampled".
+        seed (int): Seed of the reference sample for "sampled".
+        delta (float): Failure probability of the "sampled" error bound.
+        progress (callable, optional): Called with the completed fraction (0 to 1) of the flow computation,
+                                       e.g. to report the progress of a background job.
+
     Returns:
-        DataFrame: Ranking result with columns 'model_name' and 'score', sorted in descending order.
-    """
-    df_norm = normalize_min_max(df, criteria_columns, criteria_type)
-    n = df.shape[0]
-    phi_plus = np.zeros(n)
-    phi_minus = np.zeros(n)
-    
-    # Perform pairwise comparisons for each alternative pair
-    for i in range(n):
-        for k in range(n):
-            if i == k:
-                continue
-            pref = 0
-            for col in criteria_columns:
-                diff = df_norm.iloc[i][col] - df_norm.iloc[k][col]
-                # Preference function: positive difference only
-                pref += weights[col] * (diff if diff > 0 else 0)
-            phi_plus[i] += pref
-            phi_minus[k] += pref
-    net_flow = phi_plus - phi_minus
-    result = df[['model_name']].copy()
-    result['score'] = net_flow
-    result = result.sort_values(by='score', ascending=False).reset_index(drop=True)
+        DataFrame or LazyRanking: Ranking result with columns 'model_name' and 'score', sorted in descending order.
+                   With "sampled", result.attrs holds 'error_bound' (every score is within it of the exact
+                   net flow with probability 1 - delta), 'stderr' (standard error of the estimated net flow of
+                   every alternative, in the order of the dataset rows), 'sample_size' and 'delta'.
+
+    Raises:
+        ValueError: If the algorithm is unknown or cannot handle the preference functions.
+    """
+    dm = as_decision_matrix(df, criteria_columns, criteria_type)
+    preferences = _resolve_preferences(dm.criteria_columns, preference, thresholds)
+    w = dm.weight_vector(weights)
+    if algorithm != "sampled":
+        net_flow = compute_promethee_net_flow(dm.min_max, w, preferences, block_size, algorithm, n_jobs, progress)
+        return build_ranking(dm, net_flow, top_k=top_k, lazy=lazy)
+    with span("promethee.flows.sampled"):
+        net_flow, stderr, bound = compute_promethee_net_flow_sampled(dm.min_max, w, preferences, sample_size, seed,
+                                                                     delta, block_size, progress)
+    result = build_ranking(dm, net_flow, top_k=top_k, lazy=lazy)
+    result.attrs.update(error_bound=bound, stderr=stderr, sample_size=min(sample_size, dm.shape[0]), delta=delta)
     return result
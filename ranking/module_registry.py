@@ -0,0 +1,179 @@
+# module_registry.py
+import inspect
+from collections import OrderedDict
+
+import numpy as np
+from common_utils import as_decision_matrix, build_ranking
+from instrumentation import span
+from ranking.module_wsm import rank_wsm, build_wsm_kernel
+from ranking.module_wpm import rank_wpm, build_wpm_kernel
+from ranking.module_waspas import rank_waspas, build_waspas_kernel
+from ranking.module_topsis import rank_topsis, build_topsis_kernel
+from ranking.module_promethee import (rank_promethee, build_promethee_kernel, PROMETHEE_ALGORITHMS,
+                                      DEFAULT_SAMPLE_SIZE)
+from ranking.module_vikor import rank_vikor, build_vikor_kernel
+
+_REGISTRY = OrderedDict()
+
+
+class MethodParam:
+    """
+    A scalar parameter of a ranking method, as exposed by the front ends (CLI flags, web form, REST API).
+
+    Attributes:
+        name (str): Keyword argument of the rank function.
+        type (type): float, int or str; values given as strings are converted with it.
+        default: Default value.
+        help (str): Description shown by the front ends.
+        choices (tuple, optional): Allowed values.
+        flag (str): Command-line flag name (defaults to the parameter name).
+    """
+
+    def __init__(self, name, type, default, help="", choices=None, flag=None):
+        self.name = name
+        self.type = type
+        self.default = default
+        self.help = help
+        self.choices = tuple(choices) if choices is not None else None
+        self.flag = flag or name
+
+    def parse(self, value):
+        """
+        Convert and validate a value.
+
+        Raises:
+            ValueError: If the value has the wrong type or is not one of the choices.
+        """
+        if value is None:
+            return None
+        try:
+            value = self.type(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{self.name}' must be a {'string' if self.type is str else 'number'}.")
+        if self.choices is not None and value not in self.choices:
+            raise ValueError(f"Unknown {self.name} '{value}'. Choose from {', '.join(map(str, self.choices))}.")
+        return value
+
+
+class RankingMethod:
+    """
+    A ranking method as seen by the front ends, the batch engine and the executors.
+
+    Attributes:
+        name (str): Registry key (e.g. "topsis").
+        label (str): Display name (e.g. "TOPSIS").
+        kernel (callable): kernel(dm, **params) -> function mapping a (k x m) weight matrix to (k x n) scores.
+        params (tuple): MethodParam of every front-end parameter.
+        normalizations (tuple): DecisionMatrix normalizations the method reads (see DecisionMatrix.warm_up).
+        ascending (bool): Whether lower scores are preferred.
+        progress (bool): Whether the rank function reports its progress to a 'progress' callback.
+    """
+
+    def __init__(self, name, label, kernel, rank=None, params=(), normalizations=("min_max",), ascending=False,
+                 progress=False):
+        self.name = name
+        self.label = label
+        self.kernel = kernel
+        self._rank = rank
+        self.params = tuple(params)
+        self.normalizations = tuple(normalizations)
+        self.ascending = ascending
+        self.progress = progress
+
+    def defaults(self):
+        """Default value of every parameter."""
+        return {p.name: p.default for p in self.params}
+
+    def parse_params(self, options):
+        """
+        Read the method's parameters from a mapping of options (e.g. request fields), ignoring the others.
+
+        Returns:
+            dict: Converted parameter values, for the parameters present in options.
+
+        Raises:
+            ValueError: If a value is invalid.
+        """
+        return {p.name: p.parse(options[p.name]) for p in self.params if options.get(p.name) is not None}
+
+    def build_kernel(self, dm, **params):
+        """Build the scoring kernel of the method on a decision matrix, ignoring the parameters it does not take."""
+        accepted = inspect.signature(self.kernel).parameters
+        with span("kernel." + self.name):
+            return self.kernel(dm, **{name: value for name, value in params.items() if name in accepted})
+
+    def rank(self, df, criteria_columns, weights, criteria_type, top_k=None, lazy=False, **params):
+        """
+        Rank alternatives (same interface as the rank_* functions). Methods registered without a dedicated
+        rank function are scored by their kernel with a single weight vector.
+        """
+        with span("rank." + self.name):
+            if self._rank is not None:
+                return self._rank(df, criteria_columns, weights, criteria_type, top_k=top_k, lazy=lazy, **params)
+            dm = as_decision_matrix(df, criteria_columns, criteria_type)
+            w = np.ascontiguousarray(dm.weight_vector(weights)[None, :])
+            scores = self.build_kernel(dm, **params)(w)[0]
+            return build_ranking(dm, scores, ascending=self.ascending, top_k=top_k, lazy=lazy)
+
+    __call__ = rank
+
+
+def register_method(method):
+    """
+    Add a ranking method to the registry, making it available to main.py, the web app, the REST API,
+    rank_batch and the sensitivity analysis.
+
+    Args:
+        method (RankingMethod): The method; a method registered under the same name is replaced.
+
+    Returns:
+        RankingMethod: The method.
+    """
+    _REGISTRY[method.name] = method
+    return method
+
+
+def get_method(name):
+    """
+    Look up a ranking method by name or label (case-insensitive).
+
+    Raises:
+        ValueError: If no such method is registered.
+    """
+    method = _REGISTRY.get(str(name).lower())
+    if method is None:
+        method = next((m for m in _REGISTRY.values() if m.label == name), None)
+    if method is None:
+        raise ValueError(f"Unknown ranking method '{name}'. Choose from {', '.join(_REGISTRY)}.")
+    return method
+
+
+def available_methods():
+    """Registered ranking methods, in registration order."""
+    return list(_REGISTRY.values())
+
+
+_LOG_NORMALIZATIONS = ("min_max", "log_min_max", "zero_min_max")
+
+register_method(RankingMethod("wsm", "WSM", build_wsm_kernel, rank_wsm))
+register_method(RankingMethod("wpm", "WPM", build_wpm_kernel, rank_wpm, normalizations=_LOG_NORMALIZATIONS))
+register_method(RankingMethod(
+    "waspas", "WASPAS", build_waspas_kernel, rank_waspas,
+    params=[MethodParam("lambda_val", float, 0.5, "WASPAS balancing parameter between WSM and WPM")],
+    normalizations=_LOG_NORMALIZATIONS))
+register_method(RankingMethod("topsis", "TOPSIS", build_topsis_kernel, rank_topsis, normalizations=("vector",)))
+register_method(RankingMethod(
+    "promethee", "PROMETHEE", build_promethee_kernel, rank_promethee,
+    params=[MethodParam("algorithm", str, "auto", "PROMETHEE flows: exact sort-based (sorted), pairwise, pairwise "
+                        "across processes (parallel), or estimated on a sample of alternatives (sampled, single rankings "
+                        "only: not for batch rankings or sensitivity analyses)",
+                        choices=PROMETHEE_ALGORITHMS, flag="promethee_algorithm"),
+            MethodParam("n_jobs", int, None, "Worker processes for the parallel PROMETHEE algorithm "
+                        "(defaults to the number of CPUs)", flag="jobs"),
+            MethodParam("sample_size", int, DEFAULT_SAMPLE_SIZE,
+                        "Reference alternatives for the sampled PROMETHEE algorithm")],
+    progress=True))
+register_method(RankingMethod(
+    "vikor", "VIKOR", build_vikor_kernel, rank_vikor,
+    params=[MethodParam("v", float, 0.5, "VIKOR weight of the strategy of the majority of criteria")],
+    ascending=True))
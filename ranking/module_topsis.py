@@ -1,8 +1,37 @@
 import numpy as np
-import pandas as pd
-from common_utils import normalize_vector
+from common_utils import as_decision_matrix, build_ranking
 
-def rank_topsis(df, criteria_columns, weights, criteria_type):
+def compute_topsis_scores(V, w, benefit, col_min=None, col_max=None):
+    """
+    Compute TOPSIS closeness coefficients.
+    Since weights are non-negative, the weighted ideal solution is w * ideal(V), so the squared distances
+    are sum_j( w_j^2 * (v_ij - ideal_j)^2 ), i.e. one matrix product that also works for many weight vectors.
+
+    Args:
+        V (ndarray): Vector normalized decision matrix (shape: n x m).
+        w (ndarray): Criteria weights (shape: m), or one weight vector per row (shape: k x m).
+        benefit (ndarray): Boolean mask (shape: m), True for benefit criteria.
+        col_min (ndarray, optional): Column minima of V (shape: m), e.g. of the whole dataset when V is a chunk.
+        col_max (ndarray, optional): Column maxima of V (shape: m).
+
+    Returns:
+        ndarray: Closeness coefficient of each alternative (shape: n, or k x n for a weight matrix).
+    """
+    col_max = V.max(axis=0) if col_max is None else col_max
+    col_min = V.min(axis=0) if col_min is None else col_min
+    ideal = np.where(benefit, col_max, col_min)
+    anti_ideal = np.where(benefit, col_min, col_max)
+    w_sq = w * w
+    d_plus = np.sqrt(w_sq @ ((V - ideal) ** 2).T)
+    d_minus = np.sqrt(w_sq @ ((V - anti_ideal) ** 2).T)
+    return d_minus / (d_plus + d_minus + 1e-6)
+
+def build_topsis_kernel(dm):
+    """TOPSIS scoring kernel: maps a (k x m) weight matrix to (k x n) closeness coefficients."""
+    V, benefit = dm.vector, dm.benefit
+    return lambda W: compute_topsis_scores(V, W, benefit)
+
+def rank_topsis(df, criteria_columns, weights, criteria_type, top_k=None, lazy=False):
     """
     Rank alternatives using the TOPSIS method:
     1. Normalize the data using vector normalization.
@@ -12,38 +41,16 @@ def rank_topsis(df, criteria_columns, weights, criteria_type):
     5. Compute the closeness coefficient: CC = d_minus / (d_plus + d_minus).
     
     Args:
-        df (DataFrame): Original dataset.
+        df (DataFrame or DecisionMatrix): Original dataset.
         criteria_columns (list): List of criteria column names.
         weights (dict): Criteria weights.
         criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
+        top_k (int, optional): Only return the k best alternatives, selected without a full sort.
+        lazy (bool): Return a LazyRanking, which sorts and builds the full DataFrame only on demand.
     
     Returns:
-        DataFrame: Ranking result with columns 'model_name' and 'score' (closeness coefficient), sorted in descending order.
+        DataFrame or LazyRanking: Ranking result with columns 'model_name' and 'score' (closeness coefficient), sorted in descending order.
     """
-    df_norm = normalize_vector(df, criteria_columns)
-    # Apply weights to normalized data
-    for col in criteria_columns:
-        df_norm[col] = df_norm[col] * weights[col]
-        
-    # Determine ideal and anti-ideal solutions
-    ideal = {}
-    anti_ideal = {}
-    for col in criteria_columns:
-        if criteria_type.get(col, "benefit") == "benefit":
-            ideal[col] = df_norm[col].max()
-            anti_ideal[col] = df_norm[col].min()
-        else:  # For cost criteria, reverse the order
-            ideal[col] = df_norm[col].min()
-            anti_ideal[col] = df_norm[col].max()
-    
-    # Compute Euclidean distances
-    d_plus = np.sqrt(((df_norm[criteria_columns] - pd.Series(ideal))**2).sum(axis=1))
-    d_minus = np.sqrt(((df_norm[criteria_columns] - pd.Series(anti_ideal))**2).sum(axis=1))
-    
-    # Calculate closeness coefficient
-    cc = d_minus / (d_plus + d_minus + 1e-6)
-    
-    result = df[['model_name']].copy()
-    result['score'] = cc
-    result = result.sort_values(by='score', ascending=False).reset_index(drop=True)
-    return result
+    dm = as_decision_matrix(df, criteria_columns, criteria_type)
+    scores = compute_topsis_scores(dm.vector, dm.weight_vector(weights), dm.benefit)
+    return build_ranking(dm, scores, top_k=top_k, lazy=lazy)
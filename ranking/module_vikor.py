@@ -1,8 +1,90 @@
 import numpy as np
-import pandas as pd
-from common_utils import normalize_min_max
+from common_utils import as_decision_matrix, build_ranking
 
-def rank_vikor(df, criteria_columns, weights, criteria_type, v=0.5):
+def compute_vikor(X, w, v=0.5):
+    """
+    Compute the VIKOR measures in one vectorized pass over a normalized decision matrix.
+
+    Args:
+        X (ndarray): Min-max normalized decision matrix (shape: n x m), higher is better on every criterion.
+        w (ndarray): Criteria weights (shape: m).
+        v (float or array-like): Weight of the strategy of the majority of criteria.
+                                 A sequence of k values gives one Q row per value.
+
+    Returns:
+        dict: 'S' and 'R' arrays (shape: n), 'Q' (shape: n, or k x n for a sequence of v)
+              and 'compromise' (array of alternative indices, or a list of k such arrays).
+    """
+    X = np.asarray(X, dtype=float)
+    w = np.asarray(w, dtype=float)
+    f_star = X.max(axis=0)
+    f_worst = X.min(axis=0)
+    weighted = (f_star - X) * (w / (f_star - f_worst + 1e-6))
+    S = weighted.sum(axis=1)
+    R = weighted.max(axis=1)
+
+    S_scaled = (S - S.min()) / (S.max() - S.min() + 1e-6)
+    R_scaled = (R - R.min()) / (R.max() - R.min() + 1e-6)
+    v_arr = np.asarray(v, dtype=float)
+    Q = v_arr[..., None] * S_scaled + (1 - v_arr[..., None]) * R_scaled
+    if v_arr.ndim == 0:
+        compromise = compute_vikor_compromise(S, R, Q)
+    else:
+        compromise = [compute_vikor_compromise(S, R, q_row) for q_row in Q]
+    return {"S": S, "R": R, "Q": Q, "compromise": compromise}
+
+def compute_vikor_compromise(S, R, Q):
+    """
+    Determine the VIKOR compromise solution set from the two standard conditions:
+    C1 (acceptable advantage): Q(a2) - Q(a1) >= DQ, with DQ = 1 / (n - 1).
+    C2 (acceptable stability): a1 is also ranked best by S or by R.
+    If both hold the set is {a1}; if only C2 fails it is {a1, a2};
+    if C1 fails it is every alternative with Q(a) - Q(a1) < DQ.
+
+    Args:
+        S (ndarray): Group utility of each alternative (shape: n).
+        R (ndarray): Individual regret of each alternative (shape: n).
+        Q (ndarray): VIKOR index of each alternative (shape: n).
+
+    Returns:
+        ndarray: Indices of the compromise alternatives, ordered by Q.
+    """
+    n = Q.shape[0]
+    if n == 1:
+        return np.array([0])
+    DQ = 1.0 / (n - 1)
+    # Partial selection of the two best alternatives avoids an O(n log n) sort
+    best_two = np.argpartition(Q, 1)[:2]
+    a1, a2 = best_two[np.argsort(Q[best_two], kind="stable")]
+    advantage = Q[a2] - Q[a1] >= DQ
+    stability = S[a1] <= S.min() or R[a1] <= R.min()
+    if advantage and stability:
+        return np.array([a1])
+    if advantage:
+        return np.array([a1, a2])
+    close = np.flatnonzero(Q - Q[a1] < DQ)
+    return close[np.argsort(Q[close], kind="stable")]
+
+def build_vikor_kernel(dm, v=0.5):
+    """VIKOR scoring kernel: maps a (k x m) weight matrix to the (k x n) Q index (lower is better)."""
+    N = dm.min_max
+    f_star = N.max(axis=0)
+    f_worst = N.min(axis=0)
+    D = (f_star - N) / (f_star - f_worst + 1e-6)
+    D_T = np.ascontiguousarray(D.T)
+
+    def kernel(W):
+        S = W @ D_T
+        # Running maximum over the criteria keeps the temporaries at (k x n)
+        R = W[:, :1] * D_T[0]
+        for j in range(1, D_T.shape[0]):
+            np.maximum(R, W[:, j:j + 1] * D_T[j], out=R)
+        S_min, S_max = S.min(axis=1, keepdims=True), S.max(axis=1, keepdims=True)
+        R_min, R_max = R.min(axis=1, keepdims=True), R.max(axis=1, keepdims=True)
+        return v * (S - S_min) / (S_max - S_min + 1e-6) + (1 - v) * (R - R_min) / (R_max - R_min + 1e-6)
+    return kernel
+
+def rank_vikor(df, criteria_columns, weights, criteria_type, v=0.5, top_k=None, lazy=False):
     """
     Rank alternatives using the VIKOR method:
     1. Normalize the data using min-max normalization.
@@ -11,49 +93,32 @@ def rank_vikor(df, criteria_columns, weights, criteria_type, v=0.5):
     4. Compute the VIKOR index Q for each alternative:
        Q = v*(S - S_min)/(S_max - S_min) + (1 - v)*(R - R_min)/(R_max - R_min)
     5. Alternatives with lower Q are preferred.
-    
+    6. Check the acceptable advantage and acceptable stability conditions to obtain the compromise solution set.
+
     Args:
-        df (DataFrame): Original dataset.
+        df (DataFrame or DecisionMatrix): Original dataset.
         criteria_columns (list): List of criteria column names.
         weights (dict): Criteria weights.
         criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
-        v (float): The weight of the strategy of the majority of criteria (default is 0.5).
-        
+        v (float or list): The weight of the strategy of the majority of criteria (default is 0.5).
+                           A list of values ranks once per strategy.
+        top_k (int, optional): Only return the k best alternatives, selected without a full sort.
+        lazy (bool): Return a LazyRanking, which sorts and builds the full DataFrame only on demand.
+
     Returns:
-        DataFrame: Ranking result with columns 'model_name' and 'score' (Q), sorted in ascending order.
+        DataFrame or LazyRanking: Ranking result with columns 'model_name' and 'score' (Q), sorted in ascending order.
+                   The model names of the compromise solution set are stored in result.attrs['compromise'].
+                   If v is a list, a dict mapping each v value to such a DataFrame is returned.
     """
-    df_norm = normalize_min_max(df, criteria_columns, criteria_type)
-    
-    # Determine best and worst values for each criterion
-    f_star = {}
-    f_worst = {}
-    for col in criteria_columns:
-        # For normalized data, higher is always better
-        f_star[col] = df_norm[col].max()
-        f_worst[col] = df_norm[col].min()
-    
-    n = df.shape[0]
-    S = np.zeros(n)
-    R = np.zeros(n)
-    for i in range(n):
-        s_i = 0
-        r_i = -np.inf
-        for col in criteria_columns:
-            diff = f_star[col] - df_norm.iloc[i][col]
-            range_val = f_star[col] - f_worst[col] + 1e-6
-            val = weights[col] * diff / range_val
-            s_i += val
-            if val > r_i:
-                r_i = val
-        S[i] = s_i
-        R[i] = r_i
-        
-    S_min, S_max = S.min(), S.max()
-    R_min, R_max = R.min(), R.max()
-    
-    Q = v * (S - S_min) / (S_max - S_min + 1e-6) + (1 - v) * (R - R_min) / (R_max - R_min + 1e-6)
-    
-    result = df[['model_name']].copy()
-    result['score'] = Q
-    result = result.sort_values(by='score', ascending=True).reset_index(drop=True)
-    return result
+    dm = as_decision_matrix(df, criteria_columns, criteria_type)
+    vikor = compute_vikor(dm.min_max, dm.weight_vector(weights), v)
+
+    def build_result(Q, compromise):
+        result = build_ranking(dm, Q, ascending=True, top_k=top_k, lazy=lazy)
+        result.attrs['compromise'] = dm.names(compromise).tolist()
+        return result
+
+    if np.ndim(v) == 0:
+        return build_result(vikor["Q"], vikor["compromise"])
+    return {float(v_i): build_result(Q, compromise)
+            for v_i, Q, compromise in zip(np.ravel(v), vikor["Q"], vikor["compromise"])}
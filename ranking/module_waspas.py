@@ -1,35 +1,59 @@
-import pandas as pd
-from ranking.module_wsm import rank_wsm
-from ranking.module_wpm import rank_wpm
+import numpy as np
+from common_utils import as_decision_matrix, build_ranking
+from ranking.module_wsm import compute_wsm_scores
+from ranking.module_wpm import compute_wpm_scores
 
-def rank_waspas(df, criteria_columns, weights, criteria_type, lambda_val=0.5):
+def compute_waspas_scores(N, log_N, zero_mask, w, lambda_val=0.5):
+    """
+    Compute WASPAS scores: lambda * score_WSM + (1 - lambda) * score_WPM.
+
+    Args:
+        N (ndarray): Min-max normalized decision matrix (shape: n x m).
+        log_N (ndarray): Logarithm of N, with zeros mapped to 0 (shape: n x m).
+        zero_mask (ndarray): Boolean mask of the zero entries of N (shape: n x m).
+        w (ndarray): Criteria weights (shape: m), or one weight vector per row (shape: k x m).
+        lambda_val (float): Weighting parameter to combine WSM and WPM.
+
+    Returns:
+        ndarray: Score of each alternative (shape: n, or k x n for a weight matrix).
+    """
+    return lambda_val * compute_wsm_scores(N, w) + (1 - lambda_val) * compute_wpm_scores(log_N, zero_mask, w)
+
+def build_waspas_kernel(dm, lambda_val=0.5):
+    """
+    WASPAS scoring kernel: maps a (k x m) weight matrix to (k x n) scores.
+    WSM and the WPM log-sum share one matrix product over the stacked [N; ln N] matrix.
+    """
+    n = dm.shape[0]
+    stacked_T = np.concatenate([dm.min_max, dm.log_min_max], axis=0).T
+    zero_T = dm.zero_min_max.T
+
+    def kernel(W):
+        G = W @ stacked_T
+        wpm = np.exp(G[:, n:])
+        wpm[(W > 0) @ zero_T] = 0.0
+        return lambda_val * G[:, :n] + (1 - lambda_val) * wpm
+    return kernel
+
+def rank_waspas(df, criteria_columns, weights, criteria_type, lambda_val=0.5, top_k=None, lazy=False):
     """
     Rank alternatives using WASPAS:
-    1. Compute scores using both WSM and WPM.
+    1. Compute scores using both WSM and WPM on the same normalized matrix.
     2. Combine the scores: score = lambda * score_WSM + (1 - lambda) * score_WPM.
     
     Args:
-        df (DataFrame): Original dataset.
+        df (DataFrame or DecisionMatrix): Original dataset.
         criteria_columns (list): List of criteria column names.
         weights (dict): Criteria weights.
         criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
         lambda_val (float): Weighting parameter to combine WSM and WPM (default 0.5).
+        top_k (int, optional): Only return the k best alternatives, selected without a full sort.
+        lazy (bool): Return a LazyRanking, which sorts and builds the full DataFrame only on demand.
     
     Returns:
-        DataFrame: Ranking result with columns 'model_name' and 'score', sorted in descending order.
+        DataFrame or LazyRanking: Ranking result with columns 'model_name' and 'score', sorted in descending order.
     """
-    res_wsm = rank_wsm(df, criteria_columns, weights, criteria_type)
-    res_wpm = rank_wpm(df, criteria_columns, weights, criteria_type)
-    
-    # Merge the results on 'model_name' to ensure proper alignment
-    merged = pd.merge(res_wsm[['model_name', 'score']], 
-                      res_wpm[['model_name', 'score']], 
-                      on='model_name', 
-                      suffixes=('_wsm', '_wpm'))
-    
-    # Combine scores from WSM and WPM using the balancing parameter lambda_val
-    merged['score'] = lambda_val * merged['score_wsm'] + (1 - lambda_val) * merged['score_wpm']
-    
-    # Sort alternatives by the final score in descending order
-    result = merged[['model_name', 'score']].sort_values(by='score', ascending=False).reset_index(drop=True)
-    return result
+    dm = as_decision_matrix(df, criteria_columns, criteria_type)
+    scores = compute_waspas_scores(dm.min_max, dm.log_min_max, dm.zero_min_max,
+                                   dm.weight_vector(weights), lambda_val)
+    return build_ranking(dm, scores, top_k=top_k, lazy=lazy)
@@ -1,27 +1,45 @@
 import numpy as np
-import pandas as pd
-from common_utils import normalize_min_max
+from common_utils import as_decision_matrix, build_ranking
 
-def rank_wpm(df, criteria_columns, weights, criteria_type):
+def compute_wpm_scores(log_N, zero_mask, w):
+    """
+    Compute Weighted Product Model scores in log space: score = exp( sum_j( weight_j * ln(normalized_value_j) ) ).
+    Alternatives with a normalized value of 0 on a criterion with a positive weight score exactly 0.
+
+    Args:
+        log_N (ndarray): Logarithm of the min-max normalized matrix, with zeros mapped to 0 (shape: n x m).
+        zero_mask (ndarray): Boolean mask of the zero normalized values (shape: n x m).
+        w (ndarray): Criteria weights (shape: m), or one weight vector per row (shape: k x m).
+
+    Returns:
+        ndarray: Score of each alternative (shape: n, or k x n for a weight matrix).
+    """
+    scores = np.exp(w @ log_N.T)
+    scores[(w > 0) @ zero_mask.T] = 0.0
+    return scores
+
+def build_wpm_kernel(dm):
+    """WPM scoring kernel: maps a (k x m) weight matrix to (k x n) scores."""
+    log_N, zero_mask = dm.log_min_max, dm.zero_min_max
+    return lambda W: compute_wpm_scores(log_N, zero_mask, W)
+
+def rank_wpm(df, criteria_columns, weights, criteria_type, top_k=None, lazy=False):
     """
     Rank alternatives using the Weighted Product Model (WPM):
     1. Normalize the data using min-max normalization.
     2. Compute the score: score = product_j( normalized_value_j ^ weight_j ).
     
     Args:
-        df (DataFrame): Original dataset.
+        df (DataFrame or DecisionMatrix): Original dataset.
         criteria_columns (list): List of criteria column names.
         weights (dict): Criteria weights.
         criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
+        top_k (int, optional): Only return the k best alternatives, selected without a full sort.
+        lazy (bool): Return a LazyRanking, which sorts and builds the full DataFrame only on demand.
     
     Returns:
-        DataFrame: Ranking result with columns 'model_name' and 'score', sorted in descending order.
+        DataFrame or LazyRanking: Ranking result with columns 'model_name' and 'score', sorted in descending order.
     """
-    df_norm = normalize_min_max(df, criteria_columns, criteria_type)
-    scores = np.ones(df.shape[0])
-    for col in criteria_columns:
-        scores *= df_norm[col] ** weights[col]
-    result = df[['model_name']].copy()
-    result['score'] = scores
-    result = result.sort_values(by='score', ascending=False).reset_index(drop=True)
-    return result
+    dm = as_decision_matrix(df, criteria_columns, criteria_type)
+    scores = compute_wpm_scores(dm.log_min_max, dm.zero_min_max, dm.weight_vector(weights))
+    return build_ranking(dm, scores, top_k=top_k, lazy=lazy)
@@ -1,24 +1,40 @@
-import pandas as pd
-from common_utils import normalize_min_max
+from common_utils import as_decision_matrix, build_ranking
 
-def rank_wsm(df, criteria_columns, weights, criteria_type):
+def compute_wsm_scores(N, w):
+    """
+    Compute Weighted Sum Model scores.
+
+    Args:
+        N (ndarray): Min-max normalized decision matrix (shape: n x m).
+        w (ndarray): Criteria weights (shape: m), or one weight vector per row (shape: k x m).
+
+    Returns:
+        ndarray: Score of each alternative (shape: n, or k x n for a weight matrix).
+    """
+    return w @ N.T
+
+def build_wsm_kernel(dm):
+    """WSM scoring kernel: maps a (k x m) weight matrix to (k x n) scores."""
+    N = dm.min_max
+    return lambda W: compute_wsm_scores(N, W)
+
+def rank_wsm(df, criteria_columns, weights, criteria_type, top_k=None, lazy=False):
     """
     Rank alternatives using the Weighted Sum Model (WSM):
     1. Normalize the data using min-max normalization.
     2. Compute the score: score = sum_j( weight_j * normalized_value_j ).
     
     Args:
-        df (DataFrame): Original dataset.
+        df (DataFrame or DecisionMatrix): Original dataset.
         criteria_columns (list): List of criteria column names.
         weights (dict): Criteria weights.
         criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
+        top_k (int, optional): Only return the k best alternatives, selected without a full sort.
+        lazy (bool): Return a LazyRanking, which sorts and builds the full DataFrame only on demand.
         
     Returns:
-        DataFrame: Ranking result with columns 'model_name' and 'score', sorted in descending order.
+        DataFrame or LazyRanking: Ranking result with columns 'model_name' and 'score', sorted in descending order.
     """
-    df_norm = normalize_min_max(df, criteria_columns, criteria_type)
-    scores = df_norm[criteria_columns].mul(pd.Series(weights), axis=1).sum(axis=1)
-    result = df[['model_name']].copy()
-    result['score'] = scores
-    result = result.sort_values(by='score', ascending=False).reset_index(drop=True)
-    return result
+    dm = as_decision_matrix(df, criteria_columns, criteria_type)
+    scores = compute_wsm_scores(dm.min_max, dm.weight_vector(weights))
+    return build_ranking(dm, scores, top_k=top_k, lazy=lazy)
@@ -0,0 +1,189 @@
+# ranking_daemon.py
+import contextlib
+import io
+import json
+import os
+import socket
+import sys
+import tempfile
+import traceback
+
+# Environment variable routing main.py through a running daemon: "1" for the default socket, or a socket path
+DAEMON_ENV = "MCDM_DAEMON"
+# Largest request or reply line accepted (bytes)
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+# This module only uses the standard library: the client side runs before NumPy or pandas are imported.
+
+
+def default_address():
+    """Path of the daemon socket of the current user, in the temporary directory."""
+    return os.path.join(tempfile.gettempdir(), f"mcdm-{os.getuid()}.sock")
+
+
+def daemon_address(value=None):
+    """
+    Socket path selected by the MCDM_DAEMON environment variable.
+
+    Args:
+        value (str, optional): Value to interpret instead of the environment variable.
+
+    Returns:
+        str or None: The socket path, or None if the daemon is not enabled.
+    """
+    value = os.environ.get(DAEMON_ENV, "") if value is None else value
+    if value.lower() in ("", "0", "false", "no"):
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return default_address()
+    return value
+
+
+def _send(sock, message):
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def _receive(sock):
+    with sock.makefile("rb") as f:
+        line = f.readline(MAX_MESSAGE_BYTES + 1)
+    if not line.endswith(b"\n"):
+        raise ConnectionError("Incomplete or oversized ranking daemon message.")
+    return json.loads(line)
+
+
+def _connect(address):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def call_daemon(argv, address=None):
+    """
+    Run a command line in the ranking daemon and print its output, as if it had run in this process.
+
+    Args:
+        argv (list): Command-line arguments (without the program name).
+        address (str, optional): Socket path. Defaults to the one of the current user.
+
+    Returns:
+        int or None: Exit status of the command, or None if no daemon listens on the socket
+                     (the caller then runs the command itself).
+    """
+    try:
+        sock = _connect(address or default_address())
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+    with sock:
+        _send(sock, {"argv": list(argv), "cwd": os.getcwd()})
+        reply = _receive(sock)
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    return reply["status"]
+
+
+def stop_daemon(address=None):
+    """
+    Ask the daemon listening on a socket to exit.
+
+    Returns:
+        bool: Whether a daemon was running.
+    """
+    try:
+        sock = _connect(address or default_address())
+    except (FileNotFoundError, ConnectionRefusedError):
+        return False
+    with sock:
+        _send(sock, {"command": "stop"})
+        _receive(sock)
+    return True
+
+
+def _exit_status(code):
+    """Exit status of a SystemExit code, as the interpreter computes it (a message is printed to stderr)."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _run(handler, request):
+    stdout, stderr = io.StringIO(), io.StringIO()
+    cwd = os.getcwd()
+    status = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            os.chdir(request["cwd"])
+            handler(list(request["argv"]))
+        except SystemExit as e:
+            status = _exit_status(e.code)
+        except Exception:
+            traceback.print_exc()
+            status = 1
+        finally:
+            os.chdir(cwd)
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "status": status}
+
+
+def serve_daemon(handler, address=None, idle_timeout=None):
+    """
+    Serve command lines over a Unix socket until stopped (see stop_daemon) or idle for idle_timeout seconds.
+    Every command runs in this process, one at a time, in the working directory of its client and with its
+    output captured, so repeated invocations reuse the imported modules and the loaded datasets.
+    The socket is only accessible to the current user.
+
+    Args:
+        handler (callable): handler(argv) runs a command line (e.g. main.main).
+        address (str, optional): Socket path. Defaults to the one of the current user.
+        idle_timeout (float, optional): Seconds without a request after which the daemon exits.
+
+    Raises:
+        RuntimeError: If a daemon already listens on the socket.
+    """
+    address = address or default_address()
+    if os.path.exists(address):
+        try:
+            _connect(address).close()
+        except ConnectionRefusedError:
+            # Left behind by a daemon that did not exit cleanly
+            os.unlink(address)
+        else:
+            raise RuntimeError(f"A ranking daemon already listens on {address}.")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        server.bind(address)
+    finally:
+        os.umask(umask)
+    server.listen()
+    server.settimeout(idle_timeout)
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                return
+            with conn:
+                conn.settimeout(None)
+                try:
+                    request = _receive(conn)
+                except (ConnectionError, ValueError):
+                    continue
+                stop = request.get("command") == "stop"
+                reply = {"status": 0} if stop else _run(handler, request)
+                try:
+                    _send(conn, reply)
+                except OSError:
+                    # The client went away
+                    pass
+                if stop:
+                    return
+    finally:
+        server.close()
+        if os.path.exists(address):
+            os.unlink(address)
@@ -0,0 +1,35 @@
+from .module_executor import get_executor, run_ranking_methods, submit_background, wait_background
+from .module_charts import render_weights_pie, render_times_bar
+from .module_cache import ResultCache, make_key
+from .module_jobs import Job, JobQueue
+from .module_export import (EXPORT_FORMATS, cleanup_exports, ensure_export, export_path, export_rankings,
+                            write_rankings_csv, write_rankings_xlsx)
+from .module_scenarios import (BATCH_FORMATS, Task, build_task_graph, load_manifest, run_scenarios, run_task_graph,
+                               write_batch_results)
+
+__all__ = [
+    "get_executor",
+    "run_ranking_methods",
+    "submit_background",
+    "wait_background",
+    "render_weights_pie",
+    "render_times_bar",
+    "ResultCache",
+    "make_key",
+    "Job",
+    "JobQueue",
+    "EXPORT_FORMATS",
+    "cleanup_exports",
+    "ensure_export",
+    "export_path",
+    "export_rankings",
+    "write_rankings_csv",
+    "write_rankings_xlsx",
+    "BATCH_FORMATS",
+    "Task",
+    "build_task_graph",
+    "load_manifest",
+    "run_scenarios",
+    "run_task_graph",
+    "write_batch_results",
+]
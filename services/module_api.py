@@ -0,0 +1,258 @@
+# module_api.py
+import atexit
+import io
+import json
+import math
+
+import numpy as np
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+
+from common_utils import DecisionMatrix
+from dataio import criteria_type_from_schema, read_decision_matrix_bytes, shared_decision_matrix
+from ranking import available_methods, get_method
+from weights import compute_ahp_weights, compute_entropy_weights, compute_group_ahp_weights
+from services.module_cache import make_key
+
+api = Blueprint("api", __name__, url_prefix="/api/v1")
+
+# Rows serialized per chunk of a streamed (NDJSON) response
+STREAM_CHUNK_ROWS = 1000
+# Floating point types accepted by the 'precision' option
+PRECISIONS = ("float64", "float32")
+
+
+class ApiError(ValueError):
+    """Invalid API request; reported to the client as a 400 response."""
+
+
+@api.errorhandler(ApiError)
+def handle_api_error(error):
+    return jsonify({"error": str(error)}), 400
+
+
+def _cache():
+    return current_app.extensions["result_cache"]
+
+
+def _read_request():
+    """
+    Read the request body as (options, dataset bytes).
+    A CSV body (Content-Type text/csv) or a binary dataset body (application/octet-stream, see 'main.py convert')
+    is the dataset itself and options come from the query string.
+    A JSON body holds the options and a 'data' field: a list of records or {"columns": [...], "rows": [[...]]}.
+    """
+    options = request.args.to_dict()
+    if request.mimetype in ("text/csv", "application/csv"):
+        return options, ("csv", request.get_data())
+    if request.mimetype == "application/octet-stream":
+        return options, ("binary", request.get_data())
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        raise ApiError("Send a JSON object, a CSV body (Content-Type: text/csv) "
+                       "or a binary dataset (Content-Type: application/octet-stream).")
+    options.update({k: v for k, v in payload.items() if k != "data"})
+    if "data" not in payload:
+        return options, None
+    return options, ("json", json.dumps(payload["data"], sort_keys=True).encode("utf-8"))
+
+
+def _load_dataset(source, criteria_type_overrides, dtype=np.float64):
+    """Parse the dataset of a request into (DataFrame, DecisionMatrix); criteria are typed with the schema."""
+    import pandas as pd
+    kind, body = source
+    if kind == "binary":
+        try:
+            dm = read_decision_matrix_bytes(body)
+        except ValueError as e:
+            raise ApiError(f"Error reading dataset: {e}")
+        if criteria_type_overrides:
+            dm = DecisionMatrix(dm.values, dm.criteria_columns, dict(dm.criteria_type, **criteria_type_overrides),
+                                dm.alternatives, dm.dtype)
+        dm = dm.astype(dtype)
+        return pd.DataFrame(dm.values, columns=dm.criteria_columns, copy=False), dm
+    try:
+        if kind == "csv":
+            df = pd.read_csv(io.BytesIO(body))
+        else:
+            data = json.loads(body)
+            df = pd.DataFrame(data["rows"], columns=data["columns"]) if isinstance(data, dict) else pd.DataFrame(data)
+    except (ValueError, KeyError, TypeError) as e:
+        raise ApiError(f"Error reading dataset: {e}")
+    if "model_name" not in df.columns:
+        raise ApiError("The dataset must have a 'model_name' column.")
+    criteria_columns = [col for col in df.columns if col != "model_name"]
+    criteria_type = criteria_type_from_schema(criteria_columns, overrides=criteria_type_overrides)
+    try:
+        dm = DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type, dtype)
+    except ValueError as e:
+        raise ApiError(f"Criteria columns must be numeric: {e}")
+    return df, dm
+
+
+def _dataset(options, source):
+    if source is None:
+        raise ApiError("The request has no dataset ('data' field or CSV body).")
+    overrides = options.get("criteria_type")
+    if overrides is not None and not isinstance(overrides, dict):
+        raise ApiError("'criteria_type' must map criteria names to \"benefit\" or \"cost\".")
+    precision = options.get("precision", current_app.config.get("PRECISION", "float64"))
+    if precision not in PRECISIONS:
+        raise ApiError(f"Unknown precision '{precision}'. Choose from {', '.join(PRECISIONS)}.")
+    key = make_key("api-dataset", source[1], sorted((overrides or {}).items()), precision)
+    if not current_app.config.get("SHARED_MEMORY"):
+        return key, _cache().get_or_compute(key, lambda: _load_dataset(source, overrides, precision))
+
+    def load_shared():
+        # One copy of the decision matrix for all worker processes (see app.config["SHARED_MEMORY"])
+        dm = shared_decision_matrix(f"mcdm-{key[:24]}", lambda: _load_dataset(source, overrides, precision)[1])
+        if dm.owner:
+            atexit.register(dm.unlink)
+        import pandas as pd
+        return pd.DataFrame(dm.values, columns=dm.criteria_columns, copy=False), dm
+
+    return key, _cache().get_or_compute(key, load_shared)
+
+
+def _explicit_weights(weights, criteria_columns=None):
+    """Validate explicit weights: finite numbers, covering criteria_columns when given."""
+    invalid = [k for k, v in weights.items()
+               if isinstance(v, bool) or not isinstance(v, (int, float)) or not math.isfinite(v)]
+    if invalid:
+        raise ApiError(f"Weights must be finite numbers: {', '.join(map(str, invalid))}.")
+    missing = [col for col in criteria_columns or [] if col not in weights]
+    if missing:
+        raise ApiError(f"Missing weights for criteria: {', '.join(missing)}.")
+    return {k: float(v) for k, v in weights.items()}
+
+
+def _weights(options, source, criteria_columns=None):
+    """
+    Return (weights key, weights) from explicit weights, an AHP pairwise matrix or the entropy method.
+    Explicit weights must cover criteria_columns when given.
+    """
+    if "weights" in options:
+        if not isinstance(options["weights"], dict):
+            raise ApiError("'weights' must map criteria names to numbers.")
+        weights = _explicit_weights(options["weights"], criteria_columns)
+        return make_key("api-weights", sorted(weights.items())), weights
+    method = options.get("weight_method", "entropy")
+    try:
+        if method == "ahp":
+            matrix, criteria = options.get("pairwise"), options.get("criteria")
+            if matrix is None or criteria is None:
+                raise ApiError("AHP needs a 'pairwise' matrix and its 'criteria' names.")
+            ahp_method = options.get("ahp_method", "eig")
+            aggregation = options.get("aggregation", "aij")
+            key = make_key("weights", "ahp", np.asarray(matrix, dtype=float).tobytes(), criteria, ahp_method,
+                           aggregation)
+            if np.ndim(matrix) == 3:
+                # One matrix per expert: group AHP
+                compute = lambda: compute_group_ahp_weights(matrix, criteria, aggregation, ahp_method)
+            else:
+                compute = lambda: compute_ahp_weights(matrix, criteria, ahp_method)
+        elif method == "entropy":
+            dataset_key, (_, dm) = _dataset(options, source)
+            key = make_key("weights", "entropy", dataset_key)
+            compute = lambda: compute_entropy_weights(dm, dm.criteria_columns, dm.criteria_type)
+        else:
+            raise ApiError(f"Unknown weight method '{method}'. Choose 'ahp' or 'entropy'.")
+        return key, _cache().get_or_compute(key, compute)
+    except ApiError:
+        raise
+    except ValueError as e:
+        raise ApiError(f"Error computing weights: {e}")
+
+
+def _int_option(options, name, default=None):
+    value = options.get(name, default)
+    if value is None:
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ApiError(f"'{name}' must be an integer.")
+    if value < 0:
+        raise ApiError(f"'{name}' must not be negative.")
+    return value
+
+
+@api.route("/methods", methods=["GET"])
+def methods_endpoint():
+    """List the registered ranking methods with their parameters."""
+    return jsonify({"methods": [
+        {"name": m.name, "label": m.label, "ascending": m.ascending,
+         "params": [{"name": p.name, "type": p.type.__name__, "default": p.default, "help": p.help,
+                     "choices": list(p.choices) if p.choices is not None else None} for p in m.params]}
+        for m in available_methods()]})
+
+
+@api.route("/weights", methods=["POST"])
+def weights_endpoint():
+    """
+    Compute criteria weights.
+    Body: CSV dataset (entropy), or JSON with 'weight_method' ("entropy" or "ahp"), 'data' for entropy,
+    and 'pairwise' (m x m matrix, or k x m x m for a group of experts), 'criteria' (names),
+    'ahp_method' ("eig", "power" or "geometric") and 'aggregation' ("aij" or "aip") for AHP.
+    """
+    options, source = _read_request()
+    _, weights = _weights(options, source)
+    response = {"weight_method": options.get("weight_method", "entropy"),
+                "weights": {k: float(v) for k, v in weights.items()}}
+    if "consistency_ratio" in getattr(weights, "attrs", {}):
+        response["consistency_ratio"] = weights.attrs["consistency_ratio"]
+    return jsonify(response)
+
+
+@api.route("/rank", methods=["POST"])
+def rank_endpoint():
+    """
+    Rank a dataset with one method.
+    Options (JSON fields or query parameters): 'method' (default "topsis"), 'weights' or 'weight_method',
+    the method's parameters (e.g. 'lambda_val', 'v', 'algorithm'), 'criteria_type', 'top_k', 'offset', 'limit'
+    and 'format' ("json" or "ndjson").
+    JSON responses hold the requested page; NDJSON responses stream one alternative per line.
+    """
+    options, source = _read_request()
+    # Methods and their parameters come from the ranking registry (see GET /methods)
+    try:
+        spec = get_method(options.get("method", "topsis"))
+        params = spec.parse_params(options)
+    except ValueError as e:
+        raise ApiError(str(e))
+    method = spec.name
+    top_k = _int_option(options, "top_k")
+    offset = _int_option(options, "offset", 0)
+    limit = _int_option(options, "limit")
+
+    dataset_key, (_, dm) = _dataset(options, source)
+    weights_key, weights = _weights(options, source, dm.criteria_columns)
+    missing = [col for col in dm.criteria_columns if col not in weights]
+    if missing:
+        raise ApiError(f"Missing weights for criteria: {', '.join(missing)}.")
+    ranking_key = make_key("api-ranking", dataset_key, weights_key, method, sorted(params.items()))
+    # Lazy ranking: a page only selects and names its own rows
+    ranking = _cache().get_or_compute(
+        ranking_key,
+        lambda: spec.rank(dm, dm.criteria_columns, weights, dm.criteria_type, lazy=True, **params))
+
+    total = len(ranking) if top_k is None else min(top_k, len(ranking))
+    stop = total if limit is None else min(total, offset + limit)
+
+    def rows(start, end):
+        page = ranking.page(start, end)
+        return [{"rank": start + i + 1, "model_name": str(name), "score": float(score)}
+                for i, (name, score) in enumerate(zip(page["model_name"], page["score"]))]
+
+    if options.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson":
+        def generate():
+            for start in range(offset, stop, STREAM_CHUNK_ROWS):
+                yield "".join(json.dumps(row) + "\n" for row in rows(start, min(start + STREAM_CHUNK_ROWS, stop)))
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    return jsonify({
+        "method": method,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "results": rows(offset, stop) if offset < stop else [],
+    })
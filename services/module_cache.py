@@ -0,0 +1,239 @@
+# module_cache.py
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from common_utils import DecisionMatrix, LazyRanking
+
+
+def make_key(*parts):
+    """
+    Build a content-addressed cache key: the SHA-256 of the given parts.
+    Bytes are hashed as is (e.g. uploaded file contents); other values are hashed through their repr,
+    so parameters such as lambda_val or v must have a stable repr.
+
+    Args:
+        *parts: Bytes or parameters identifying the cached value.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        data = part if isinstance(part, (bytes, bytearray, memoryview)) else repr(part).encode("utf-8")
+        digest.update(len(data).to_bytes(8, "little"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def sizeof(value, _seen=None):
+    """
+    Estimate the memory held by a cached value.
+    Every buffer is counted once: arrays viewing the same memory (e.g. a DataFrame built without a copy
+    from the values of a DecisionMatrix) count the underlying array a single time.
+
+    Args:
+        value (object): Cached value (arrays, DataFrames, DecisionMatrix, containers...).
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    # id of every counted buffer -> the buffer, kept alive so that the ids stay unique during the walk
+    seen = {} if _seen is None else _seen
+    if isinstance(value, np.ndarray):
+        root = value
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        if id(root) in seen:
+            return 0
+        seen[id(root)] = root
+        return root.nbytes
+    # A value can only be a DataFrame if pandas has been imported
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return int(value.index.memory_usage()) + sum(sizeof(value[col].to_numpy(), seen) for col in value.columns)
+    if pd is not None and isinstance(value, pd.Series):
+        return int(value.index.memory_usage()) + sizeof(value.to_numpy(), seen)
+    if isinstance(value, LazyRanking):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k, seen) + sizeof(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v, seen) for v in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + sizeof(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+def _grows(value):
+    """Whether a cached value can grow after it is stored: a DecisionMatrix caches its normalizations on use."""
+    if isinstance(value, (list, tuple)):
+        return any(_grows(v) for v in value)
+    return isinstance(value, DecisionMatrix)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by number of entries and total size, with an optional on-disk tier.
+    Values evicted from memory remain available from disk when a directory is configured.
+
+    Attributes:
+        max_entries (int): Maximum number of in-memory entries.
+        max_bytes (int): Maximum total size of the in-memory entries.
+        disk_dir (str or None): Directory of the on-disk tier (pickle files), or None.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=256 * 1024 * 1024, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # Keys of the entries measured again before every eviction check (see _grows)
+        self._growing = set()
+        # Key -> [lock, number of callers], so that concurrent misses on one key compute it once
+        self._computing = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0}
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _remeasure(self):
+        for key in self._growing:
+            value, size = self._entries[key]
+            new_size = sizeof(value)
+            self._entries[key] = (value, new_size)
+            self._bytes += new_size - size
+
+    def _store(self, key, value):
+        size = sizeof(value)
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+            self._growing.discard(key)
+        self._entries[key] = (value, size)
+        self._bytes += size
+        if _grows(value):
+            self._growing.add(key)
+        self._remeasure()
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            evicted_key, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self._growing.discard(evicted_key)
+            self._counters["evictions"] += 1
+
+    def get(self, key, default=None):
+        """
+        Look up a value, first in memory and then on disk.
+
+        Args:
+            key (str): Cache key (see make_key).
+            default (object): Value returned on a miss.
+
+        Returns:
+            object: The cached value, or default.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return self._entries[key][0]
+        if self.disk_dir and os.path.exists(self._disk_path(key)):
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                value = None
+            else:
+                with self._lock:
+                    self._counters["hits"] += 1
+                    self._counters["disk_hits"] += 1
+                    self._store(key, value)
+                return value
+        with self._lock:
+            self._counters["misses"] += 1
+        return default
+
+    def set(self, key, value):
+        """
+        Store a value in memory and, if configured, on disk.
+
+        Args:
+            key (str): Cache key (see make_key).
+            value (object): Value to cache (must be picklable for the on-disk tier).
+        """
+        with self._lock:
+            self._store(key, value)
+        if self.disk_dir:
+            tmp_path = f"{self._disk_path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._disk_path(key))
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, computing and storing it on a miss.
+        Concurrent misses on the same key compute it once: the other callers wait for the value.
+        Exceptions raised by compute propagate and nothing is cached.
+
+        Args:
+            key (str): Cache key (see make_key).
+            compute (callable): Function without arguments that produces the value.
+
+        Returns:
+            object: The cached or computed value.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        with self._lock:
+            computing = self._computing.setdefault(key, [threading.Lock(), 0])
+            computing[1] += 1
+        try:
+            with computing[0]:
+                with self._lock:
+                    entry = self._entries.get(key)
+                if entry is not None:
+                    # Computed by a concurrent caller while this one waited
+                    return entry[0]
+                value = compute()
+                self.set(key, value)
+                return value
+        finally:
+            with self._lock:
+                computing[1] -= 1
+                if not computing[1]:
+                    del self._computing[key]
+
+    def clear(self):
+        """Drop every in-memory entry (the on-disk tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._growing.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Return the cache counters, to size the cache.
+
+        Returns:
+            dict: hits, misses, disk_hits, evictions, hit_rate, entries and bytes.
+        """
+        with self._lock:
+            self._remeasure()
+            stats = dict(self._counters)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+            stats["max_entries"] = self.max_entries
+            stats["max_bytes"] = self.max_bytes
+        return stats
@@ -0,0 +1,60 @@
+# module_charts.py
+import io
+
+from instrumentation import instrumented
+
+
+def _figure():
+    # matplotlib is imported by the first chart rendered, not when the app starts
+    from matplotlib.figure import Figure
+    return Figure()
+
+
+def _to_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+@instrumented("chart.weights")
+def render_weights_pie(weights):
+    """
+    Render a pie chart of the criteria weights.
+    Uses the object-oriented matplotlib API (no pyplot global state), so it is safe to call from worker threads.
+
+    Args:
+        weights (dict): Criteria weights.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    fig = _figure()
+    ax = fig.subplots()
+    ax.pie(list(weights.values()), labels=list(weights.keys()), autopct='%1.2f%%', startangle=90)
+    ax.axis('equal')
+    return _to_png(fig)
+
+
+@instrumented("chart.times")
+def render_times_bar(ranking_times):
+    """
+    Render a bar chart comparing the ranking algorithms' execution times.
+
+    Args:
+        ranking_times (dict): Mapping of method names to execution times in seconds.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    fig = _figure()
+    ax = fig.subplots()
+    methods = list(ranking_times.keys())
+    bars = ax.bar(methods, [ranking_times[m] for m in methods], color='skyblue')
+    ax.set_ylabel("Execution Time (seconds)")
+    ax.set_title("Ranking Algorithms Execution Time Comparison")
+
+    # Annotate each bar with the execution time
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width() / 2, height + 0.001, f"{height:.6f}", ha='center', va='bottom')
+    return _to_png(fig)
@@ -0,0 +1,162 @@
+# module_executor.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from common_utils import LazyRanking
+from instrumentation import is_enabled, record
+
+# Number of background results (exports, charts) kept for later retrieval.
+MAX_PENDING = 256
+
+_executors = {}
+_executors_lock = threading.Lock()
+_background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mcdm-background")
+_pending = OrderedDict()
+_pending_lock = threading.Lock()
+
+
+def get_executor(kind=None, workers=None):
+    """
+    Return the shared pool used to run ranking methods concurrently.
+    The pool kind and size default to the MCDM_EXECUTOR ("thread" or "process") and
+    MCDM_WORKERS environment variables.
+
+    Args:
+        kind (str, optional): "thread" or "process".
+        workers (int, optional): Number of workers (defaults to the number of CPUs).
+
+    Returns:
+        Executor: A ThreadPoolExecutor or ProcessPoolExecutor, created once per (kind, workers).
+
+    Raises:
+        ValueError: If the executor kind is unknown.
+    """
+    kind = kind or os.environ.get("MCDM_EXECUTOR", "thread")
+    workers = int(workers or os.environ.get("MCDM_WORKERS", 0)) or os.cpu_count() or 1
+    if kind not in ("thread", "process"):
+        raise ValueError(f"Unknown executor kind '{kind}'. Choose 'thread' or 'process'.")
+    with _executors_lock:
+        if (kind, workers) not in _executors:
+            if kind == "thread":
+                _executors[(kind, workers)] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcdm-rank")
+            else:
+                _executors[(kind, workers)] = ProcessPoolExecutor(max_workers=workers)
+        return _executors[(kind, workers)]
+
+
+def _timed_call(func, args, kwargs):
+    """Run func inside the worker and measure only its own execution time (not the time spent queued)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _timed_scores(func, args, kwargs):
+    """
+    _timed_call for worker processes: a LazyRanking result is sent back as its scores and attrs only,
+    without the decision matrix the parent already holds (see run_ranking_methods).
+    """
+    result, elapsed = _timed_call(func, args, kwargs)
+    if isinstance(result, LazyRanking):
+        result = (result.scores, result.ascending, result.attrs)
+    return result, elapsed
+
+
+def _attach_scores(dm, result):
+    """Rebuild the LazyRanking returned by _timed_scores against the parent's decision matrix."""
+    if not isinstance(result, tuple):
+        return result
+    scores, ascending, attrs = result
+    ranking = LazyRanking(dm, scores, ascending)
+    ranking.attrs.update(attrs)
+    return ranking
+
+
+def run_ranking_methods(executor, dm, weights, ranking_methods, method_params=None, on_complete=None):
+    """
+    Run several ranking methods concurrently on the same decision matrix.
+
+    Args:
+        executor (Executor or None): Pool used to run the methods; None runs them one after the other
+                                     in the calling thread (e.g. under a profiler).
+        dm (DecisionMatrix): The decision matrix.
+        weights (dict): Criteria weights.
+        ranking_methods (dict): Mapping of method names to rank_* functions or registered RankingMethods.
+        method_params (dict, optional): Mapping of method names to extra keyword arguments.
+        on_complete (callable, optional): Called with the name of every method as soon as it finishes.
+
+    Returns:
+        dict: Mapping of method names to (result DataFrame, execution time in seconds), in the order of ranking_methods.
+    """
+    method_params = method_params or {}
+    # Compute the shared normalizations once, before the methods read them concurrently
+    # (only those the registered methods declare; plain functions get all of them)
+    needed = [getattr(func, "normalizations", None) for func in ranking_methods.values()]
+    dm.warm_up(None if any(n is None for n in needed) else {name for n in needed for name in n})
+    args = (dm, dm.criteria_columns, weights, dm.criteria_type)
+    if executor is None:
+        results = OrderedDict()
+        for method_name, func in ranking_methods.items():
+            results[method_name] = _timed_call(func, args, method_params.get(method_name, {}))
+            if on_complete is not None:
+                on_complete(method_name)
+        return results
+    process_pool = isinstance(executor, ProcessPoolExecutor)
+    futures = OrderedDict()
+    for method_name, func in ranking_methods.items():
+        futures[method_name] = executor.submit(_timed_scores if process_pool else _timed_call, func, args,
+                                               method_params.get(method_name, {}))
+        if on_complete is not None:
+            futures[method_name].add_done_callback(lambda _, name=method_name: on_complete(name))
+    results = OrderedDict((method_name, future.result()) for method_name, future in futures.items())
+    if process_pool:
+        # Lazy rankings come back as score vectors: attach them to this process's decision matrix
+        results = OrderedDict((method_name, (_attach_scores(dm, value), elapsed))
+                              for method_name, (value, elapsed) in results.items())
+    if is_enabled() and process_pool:
+        # Spans recorded in worker processes are lost: record the time measured by each worker here
+        for method_name, (_, elapsed) in results.items():
+            record("rank." + getattr(ranking_methods[method_name], "name", method_name), elapsed)
+    return results
+
+
+def submit_background(key, func, *args, **kwargs):
+    """
+    Run func in the background thread pool, off the request's critical path.
+    The future is kept under key so that a later request can wait for it (see wait_background).
+
+    Args:
+        key (str): Identifier of the background result.
+        func (callable): Function to run.
+        *args: Positional arguments for func.
+        **kwargs: Keyword arguments for func.
+
+    Returns:
+        Future: The background future.
+    """
+    future = _background.submit(func, *args, **kwargs)
+    with _pending_lock:
+        _pending[key] = future
+        _pending.move_to_end(key)
+        while len(_pending) > MAX_PENDING:
+            _pending.popitem(last=False)
+    return future
+
+
+def wait_background(key, timeout=None):
+    """
+    Wait for a background result.
+
+    Args:
+        key (str): Identifier given to submit_background.
+        timeout (float, optional): Maximum number of seconds to wait.
+
+    Returns:
+        object: The result of the background function, or None if no such result is pending.
+    """
+    with _pending_lock:
+        future = _pending.get(key)
+    return future.result(timeout) if future is not None else None
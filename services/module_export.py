@@ -0,0 +1,255 @@
+# module_export.py
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from instrumentation import span
+
+# Formats of the combined export: file extension -> MIME type
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+# Rows written per chunk of a CSV export (only the names of one chunk are materialized at a time)
+EXPORT_CHUNK_ROWS = 100000
+# Largest ranking that fits on one worksheet (Excel row limit, header row excluded)
+XLSX_MAX_ROWS = 1048575
+
+# Names of the files written by the export pipeline: cleanup_exports never touches any other file
+_EXPORT_NAME = re.compile(r"^[0-9a-f]{32}\.(csv|xlsx)$")
+_build_locks = {}
+_build_locks_lock = threading.Lock()
+
+
+def export_path(directory, export_id, fmt="csv"):
+    """
+    Path of an export file.
+
+    Args:
+        directory (str): Export directory.
+        export_id (str): Export identifier: 32 hexadecimal digits, e.g. the start of a make_key() digest.
+        fmt (str): "csv" or "xlsx".
+
+    Returns:
+        str: The path.
+
+    Raises:
+        ValueError: If the identifier or the format is invalid.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Choose one of: {', '.join(EXPORT_FORMATS)}.")
+    filename = f"{export_id}.{fmt}"
+    if not _EXPORT_NAME.match(filename):
+        raise ValueError(f"Invalid export identifier '{export_id}'.")
+    return os.path.join(directory, filename)
+
+
+def _tmp_path(path):
+    """Name a file is written under until it is complete (keeps the extension, which openpyxl checks)."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}-{threading.get_ident()}.tmp{ext}"
+
+
+def _ranks(ranking):
+    """Rank of every alternative (1 = best), in the row order of the decision matrix."""
+    ranks = np.empty(len(ranking), dtype=np.int64)
+    ranks[ranking.order()] = np.arange(1, len(ranking) + 1)
+    return ranks
+
+
+def write_rankings_csv(path, rankings, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write the rankings of several methods into one CSV file: one row per alternative (in the row order
+    of the decision matrix) with the columns 'model_name', then '<method>_score' and '<method>_rank'
+    for every method. The file is written in chunks to a temporary name and renamed when complete,
+    so a download never sees a partial file.
+
+    Args:
+        path (str): Output CSV file.
+        rankings (dict): Mapping of method names to LazyRankings of the same decision matrix.
+        chunk_rows (int): Rows written per chunk.
+
+    Returns:
+        str: The path.
+
+    Raises:
+        ValueError: If there is no ranking or the rankings differ in length.
+    """
+    if not rankings:
+        raise ValueError("No ranking to export.")
+    import pandas as pd
+    first = next(iter(rankings.values()))
+    n = len(first)
+    if any(len(ranking) != n for ranking in rankings.values()):
+        raise ValueError("The exported rankings must rank the same alternatives.")
+    columns = {}
+    for method_name, ranking in rankings.items():
+        columns[f"{method_name}_score"] = ranking.scores
+        columns[f"{method_name}_rank"] = _ranks(ranking)
+    tmp_path = _tmp_path(path)
+    try:
+        with span("export.csv"), open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            for start in range(0, max(n, 1), chunk_rows):
+                rows = np.arange(start, min(start + chunk_rows, n))
+                chunk = pd.DataFrame({"model_name": first.names(rows)})
+                for name, values in columns.items():
+                    chunk[name] = values[rows]
+                chunk.to_csv(f, header=start == 0, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def write_rankings_xlsx(csv_path, path):
+    """
+    Build the XLSX version of a combined CSV export: an "All methods" sheet with the CSV contents,
+    then one sheet per method with its full ranking, best first.
+
+    Args:
+        csv_path (str): Combined CSV export (see write_rankings_csv).
+        path (str): Output XLSX file.
+
+    Returns:
+        str: The path.
+
+    Raises:
+        ValueError: If the ranking has more rows than a worksheet holds.
+    """
+    import pandas as pd
+    combined = pd.read_csv(csv_path)
+    if len(combined) > XLSX_MAX_ROWS:
+        raise ValueError(f"{len(combined)} alternatives do not fit in an XLSX sheet "
+                         f"(at most {XLSX_MAX_ROWS}); download the CSV export instead.")
+    methods = [column[:-len("_rank")] for column in combined.columns if column.endswith("_rank")]
+    tmp_path = _tmp_path(path)
+    try:
+        with span("export.xlsx"), pd.ExcelWriter(tmp_path, engine="openpyxl") as writer:
+            combined.to_excel(writer, sheet_name="All methods", index=False)
+            for method_name in methods:
+                ranking = combined[["model_name", f"{method_name}_score", f"{method_name}_rank"]]
+                ranking = ranking.sort_values(f"{method_name}_rank", kind="stable")
+                ranking.columns = ["model_name", "score", "rank"]
+                ranking.to_excel(writer, sheet_name=method_name[:31], index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def ensure_export(directory, export_id, fmt="csv"):
+    """
+    Return the path of an export file, building the XLSX version from the CSV export on its first
+    download. Concurrent downloads of the same file wait for a single build.
+
+    Args:
+        directory (str): Export directory.
+        export_id (str): Export identifier.
+        fmt (str): "csv" or "xlsx".
+
+    Returns:
+        str or None: The path, or None if the CSV export does not exist (never written, or removed
+                     by cleanup_exports).
+
+    Raises:
+        ValueError: If the identifier or the format is invalid, or the XLSX file cannot hold the ranking.
+    """
+    path = export_path(directory, export_id, fmt)
+    csv_path = export_path(directory, export_id, "csv")
+    if fmt == "csv" or os.path.exists(path):
+        return path if os.path.exists(path) else None
+    with _build_locks_lock:
+        lock = _build_locks.setdefault(path, threading.Lock())
+    try:
+        with lock:
+            if not os.path.exists(path):
+                if not os.path.exists(csv_path):
+                    return None
+                write_rankings_xlsx(csv_path, path)
+    finally:
+        with _build_locks_lock:
+            _build_locks.pop(path, None)
+    return path
+
+
+def cleanup_exports(directory, max_age=None, max_bytes=None, keep=(), now=None):
+    """
+    Retention policy of the export directory: remove the export files older than max_age, then the
+    least recently used ones until the remaining files take at most max_bytes.
+    Only files named like exports are considered (other files of the directory are kept).
+
+    Args:
+        directory (str): Export directory.
+        max_age (float, optional): Maximum age in seconds since the last write or reuse (os.utime).
+        max_bytes (int, optional): Maximum total size of the export files.
+        keep (iterable): Paths never removed (e.g. the export being served).
+        now (float, optional): Current time (time.time()), for testing.
+
+    Returns:
+        int: Number of removed files.
+    """
+    now = time.time() if now is None else now
+    keep = {os.path.abspath(path) for path in keep}
+    files = []
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not _EXPORT_NAME.match(entry.name) or os.path.abspath(entry.path) in keep:
+            continue
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for mtime, size, path in files:
+        expired = max_age is not None and now - mtime > max_age
+        if not expired and (max_bytes is None or total <= max_bytes):
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+    return removed
+
+
+def export_rankings(directory, export_id, rankings, max_age=None, max_bytes=None):
+    """
+    Write the combined CSV export of a request (see write_rankings_csv), or refresh the retention time
+    of an identical export already on disk, then apply the retention policy (see cleanup_exports).
+    Meant to run in the background (see submit_background).
+
+    Args:
+        directory (str): Export directory.
+        export_id (str): Export identifier, e.g. derived from the cache keys of the rankings.
+        rankings (dict): Mapping of method names to LazyRankings.
+        max_age (float, optional): Retention time of the export files, in seconds.
+        max_bytes (int, optional): Maximum total size of the export files.
+
+    Returns:
+        str: Path of the CSV export.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = export_path(directory, export_id, "csv")
+    if os.path.exists(path):
+        os.utime(path)
+        xlsx_path = export_path(directory, export_id, "xlsx")
+        if os.path.exists(xlsx_path):
+            os.utime(xlsx_path)
+    else:
+        write_rankings_csv(path, rankings)
+    cleanup_exports(directory, max_age, max_bytes, keep=(path, export_path(directory, export_id, "xlsx")))
+    return path
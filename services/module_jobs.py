@@ -0,0 +1,192 @@
+# module_jobs.py
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from services.module_cache import make_key
+
+# Number of jobs whose status is kept (the results of older jobs stay available from the result cache)
+MAX_JOBS = 256
+# Smallest progress increment published to the listeners of a job
+PROGRESS_STEP = 0.01
+FINISHED_STATES = ("done", "failed")
+
+
+class Job:
+    """
+    A background job and its progress, shared between the worker running it and the requests polling it.
+
+    Attributes:
+        id (str): Job identifier.
+        state (str): "queued", "running", "done" or "failed".
+        stage (str): Current step, as reported by the job (e.g. "ranking").
+        progress (dict): Completed fraction (0 to 1) of every tracked task (e.g. per ranking method).
+        error (str or None): Error message of a failed job.
+        created, started, finished (float or None): Timestamps (time.time()).
+        version (int): Incremented on every change, so listeners can wait for the next one.
+    """
+
+    def __init__(self, job_id):
+        self.id = job_id
+        self.state = "queued"
+        self.stage = "queued"
+        self.progress = OrderedDict()
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.version = 0
+        self._published = {}
+        self._changed = threading.Condition()
+
+    def _update(self, **fields):
+        with self._changed:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.version += 1
+            self._changed.notify_all()
+
+    def set_stage(self, stage):
+        """Report the current step of the job."""
+        self._update(stage=stage)
+
+    def track(self, *tasks):
+        """Declare tasks whose progress is reported with set_progress (all at 0)."""
+        with self._changed:
+            for task in tasks:
+                self.progress.setdefault(task, 0.0)
+        self._update()
+
+    def set_progress(self, task, fraction):
+        """
+        Report the completed fraction of a task. Increments smaller than PROGRESS_STEP are recorded
+        without waking the listeners, so fine-grained reports (e.g. per row block) stay cheap.
+        """
+        fraction = min(max(float(fraction), 0.0), 1.0)
+        with self._changed:
+            self.progress[task] = fraction
+            if fraction - self._published.get(task, 0.0) < PROGRESS_STEP and fraction < 1.0:
+                return
+            self._published[task] = fraction
+            self.version += 1
+            self._changed.notify_all()
+
+    def snapshot(self):
+        """
+        Return the job status as a JSON-serializable dict.
+
+        Returns:
+            dict: id, state, stage, progress, error, created, started, finished, elapsed and version.
+        """
+        with self._changed:
+            end = self.finished or time.time()
+            return {
+                "id": self.id,
+                "state": self.state,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "error": self.error,
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished,
+                "elapsed": end - self.started if self.started else 0.0,
+                "version": self.version,
+            }
+
+    def wait(self, version, timeout=None):
+        """
+        Wait until the job changes after a given version (or finishes).
+
+        Args:
+            version (int): Last version seen by the caller.
+            timeout (float, optional): Maximum number of seconds to wait.
+
+        Returns:
+            dict: The job status (see snapshot); its version equals the given one on a timeout.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version or self.state in FINISHED_STATES, timeout)
+        return self.snapshot()
+
+
+class JobQueue:
+    """
+    Local job queue: jobs run in a thread pool of the serving process (no external broker) and their
+    results are stored in the result cache, so a finished job can be fetched again without recomputation.
+
+    Attributes:
+        workers (int): Number of jobs run at the same time.
+        result_cache (ResultCache or None): Cache receiving the job results.
+    """
+
+    def __init__(self, workers=2, result_cache=None, max_jobs=MAX_JOBS):
+        self.workers = workers
+        self.result_cache = result_cache
+        self.max_jobs = max_jobs
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcdm-job")
+        self._jobs = OrderedDict()
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def _result_key(self, job_id):
+        return make_key("job", job_id)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue a job.
+
+        Args:
+            func (callable): func(job, *args, **kwargs); reports its progress on job and returns the result.
+            *args: Positional arguments for func.
+            **kwargs: Keyword arguments for func.
+
+        Returns:
+            Job: The queued job.
+        """
+        job = Job(uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                old_id, _ = self._jobs.popitem(last=False)
+                self._results.pop(old_id, None)
+        self._pool.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        job._update(state="running", stage="running", started=time.time())
+        try:
+            result = func(job, *args, **kwargs)
+        except Exception as e:
+            job._update(state="failed", stage="failed", error=str(e), finished=time.time())
+            return
+        with self._lock:
+            if job.id in self._jobs:
+                self._results[job.id] = result
+        if self.result_cache is not None:
+            self.result_cache.set(self._result_key(job.id), result)
+        job._update(state="done", stage="done", finished=time.time())
+
+    def get(self, job_id):
+        """Return the job with this id, or None if it is unknown (or too old)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def result(self, job_id, default=None):
+        """
+        Return the result of a finished job, from memory or from the result cache.
+
+        Args:
+            job_id (str): Job identifier.
+            default (object): Value returned if the job has not finished or is unknown.
+
+        Returns:
+            object: The job result, or default.
+        """
+        with self._lock:
+            if job_id in self._results:
+                return self._results[job_id]
+        if self.result_cache is not None:
+            return self.result_cache.get(self._result_key(job_id), default)
+        return default
@@ -0,0 +1,405 @@
+# module_scenarios.py
+import csv
+import importlib.util
+import itertools
+import json
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import resource_tracker
+
+import numpy as np
+
+from instrumentation import record
+from services.module_executor import _timed_call
+
+# Output formats of the combined batch results: file extension -> description
+BATCH_FORMATS = {".csv": "CSV", ".parquet": "Parquet (requires pyarrow)"}
+# Columns of the combined batch results (one row per ranked alternative of every scenario)
+RESULT_COLUMNS = ["dataset", "weights", "method", "params", "rank", "model_name", "score"]
+
+
+class Task:
+    """
+    A node of the scenario task graph.
+
+    Attributes:
+        id (tuple): Task identifier, e.g. ("rank", dataset, weights, method, params).
+        kind (str): "load", "weights" or "rank".
+        func (callable): func(*dependency results, *args) computes the task result.
+        args (tuple): Extra positional arguments, after the dependency results.
+        deps (tuple): Identifiers of the tasks whose results func receives, in order.
+        local (bool): Run in the calling process (e.g. loads, whose result is shared with the workers)
+                      rather than in the executor.
+    """
+
+    def __init__(self, id, kind, func, args=(), deps=(), local=False):
+        self.id = id
+        self.kind = kind
+        self.func = func
+        self.args = tuple(args)
+        self.deps = tuple(deps)
+        self.local = local
+
+    @property
+    def label(self):
+        """Identifier without the kind, for progress reports."""
+        return " ".join(str(part) for part in self.id[1:] if part not in ("", None))
+
+
+def _names(entries, kind):
+    """Named manifest entries: a dict is kept as is, a list is named after the file stems (or the entries)."""
+    if isinstance(entries, dict):
+        return OrderedDict(entries)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"The manifest '{kind}' must be a non-empty list or mapping.")
+    named = OrderedDict()
+    for entry in entries:
+        spec = entry.get("ahp", entry.get("path")) if isinstance(entry, dict) else entry
+        spec = spec[0] if isinstance(spec, list) else spec
+        name = os.path.splitext(os.path.basename(str(spec)))[0]
+        named[name if name not in named else f"{name}_{len(named)}"] = entry
+    return named
+
+
+def _weight_source(spec, base_dir):
+    """Normalize a weight source: "entropy", an AHP workbook path, or {"ahp": path(s), "method", "aggregation"}."""
+    if spec == "entropy":
+        return {"kind": "entropy"}
+    if isinstance(spec, str):
+        spec = {"ahp": spec}
+    if not isinstance(spec, dict) or "ahp" not in spec:
+        raise ValueError(f"Invalid weight source {spec!r}: use \"entropy\", a workbook path or {{\"ahp\": ...}}.")
+    files = spec["ahp"] if isinstance(spec["ahp"], list) else [spec["ahp"]]
+    return {
+        "kind": "ahp",
+        "files": [os.path.join(base_dir, f) for f in files],
+        "method": spec.get("method", "eig"),
+        "aggregation": spec.get("aggregation", "aij"),
+    }
+
+
+def _method_scenarios(entry):
+    """(method name, params) of every parameter combination of a manifest method entry."""
+    from ranking import available_methods, get_method
+    if entry == "all":
+        return [(method.name, {}) for method in available_methods()]
+    if isinstance(entry, str):
+        entry = {"name": entry}
+    method = get_method(entry.get("name"))
+    declared = {p.name: p for p in method.params}
+    grid = []
+    for name, values in (entry.get("params") or {}).items():
+        if name not in declared:
+            raise ValueError(f"Unknown parameter '{name}' of ranking method '{method.name}'.")
+        grid.append([(name, declared[name].parse(value)) for value in (values if isinstance(values, list)
+                                                                        else [values])])
+    return [(method.name, dict(combination)) for combination in itertools.product(*grid)]
+
+
+def load_manifest(path_or_manifest):
+    """
+    Read a scenario manifest: datasets x weight sources x ranking methods x method parameters.
+
+        {
+          "datasets": {"budget": "segments/budget.mcdm", "flagship": "segments/flagship.csv"},
+          "weights": ["entropy", "pairwise_matrix_AHP1.xlsx", {"ahp": ["a.xlsx", "b.xlsx"], "aggregation": "aip"}],
+          "methods": ["topsis", {"name": "waspas", "params": {"lambda_val": [0.3, 0.5, 0.7]}}],
+          "top_k": 0,
+          "output": "batch_results.csv"
+        }
+
+    Datasets and weight sources are lists (named after the file stems) or mappings of names to entries;
+    "all" in the methods selects every registered method with its default parameters. Relative paths
+    are resolved from the directory of the manifest file.
+
+    Args:
+        path_or_manifest (str or dict): Path of the JSON manifest, or its contents.
+
+    Returns:
+        dict: datasets (name -> path), weights (name -> source), scenarios (list of (method, params)),
+              top_k (int or None) and output (str or None).
+
+    Raises:
+        ValueError: If the manifest is invalid.
+    """
+    if isinstance(path_or_manifest, dict):
+        manifest, base_dir = path_or_manifest, ""
+    else:
+        with open(path_or_manifest, encoding="utf-8") as f:
+            try:
+                manifest = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid scenario manifest: {e}")
+        base_dir = os.path.dirname(path_or_manifest)
+    if not isinstance(manifest, dict):
+        raise ValueError("The scenario manifest must be a JSON object.")
+    datasets = OrderedDict()
+    for name, entry in _names(manifest.get("datasets"), "datasets").items():
+        path = entry.get("path") if isinstance(entry, dict) else entry
+        if not isinstance(path, str):
+            raise ValueError(f"Invalid dataset {entry!r}: use a path or {{\"path\": ...}}.")
+        datasets[name] = os.path.join(base_dir, path)
+    weights = OrderedDict((name, _weight_source(spec, base_dir))
+                          for name, spec in _names(manifest.get("weights", ["entropy"]), "weights").items())
+    methods = manifest.get("methods", ["all"])
+    scenarios = []
+    for entry in methods if isinstance(methods, list) else [methods]:
+        scenarios.extend(s for s in _method_scenarios(entry) if s not in scenarios)
+    top_k = manifest.get("top_k") or None
+    if top_k is not None and (not isinstance(top_k, int) or top_k < 0):
+        raise ValueError("'top_k' must be a non-negative integer.")
+    output = manifest.get("output")
+    return {"datasets": datasets, "weights": weights, "scenarios": scenarios, "top_k": top_k,
+            "output": os.path.join(base_dir, output) if output else None}
+
+
+def _load_task(path, share):
+    """Load a dataset (see main.py); shared with process workers through shared memory unless memory-mapped."""
+    from common_utils import DecisionMatrix
+    from dataio import criteria_type_from_schema, is_binary_dataset, load_decision_matrix, publish_decision_matrix
+    if is_binary_dataset(path):
+        # Pickled as its path: every worker maps the same file
+        return load_decision_matrix(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        criteria_columns = [col for col in next(csv.reader(f), []) if col != "model_name"]
+    dm = DecisionMatrix.from_csv(path, None, criteria_type_from_schema(criteria_columns))
+    return publish_decision_matrix(dm) if share else dm
+
+
+def _ahp_task(source):
+    from weights import compute_ahp_weights_from_excel, compute_group_ahp_weights_from_excel
+    if len(source["files"]) > 1:
+        return compute_group_ahp_weights_from_excel(source["files"], source["aggregation"], source["method"])
+    return compute_ahp_weights_from_excel(source["files"][0], source["method"])
+
+
+def _entropy_task(dm):
+    from weights import compute_entropy_weights
+    return compute_entropy_weights(dm, dm.criteria_columns, dm.criteria_type)
+
+
+def _rank_task(dm, weights, method_name, params, top_k):
+    """
+    Rank one scenario.
+
+    Returns:
+        tuple: (positions of the ranked alternatives, best first; their scores).
+    """
+    from ranking import get_method
+    missing = [col for col in dm.criteria_columns if col not in weights]
+    if missing:
+        raise ValueError(f"The weights have no value for the criteria: {', '.join(missing)}")
+    ranking = get_method(method_name).rank(dm, dm.criteria_columns, weights, dm.criteria_type, lazy=True, **params)
+    positions = ranking.positions(0, top_k or len(ranking))
+    return positions, ranking.scores[positions]
+
+
+def build_task_graph(plan, share=False):
+    """
+    Task graph of a scenario plan (see load_manifest): every dataset is loaded once, AHP weights are
+    computed once per weight source for all datasets, entropy weights once per dataset, and every
+    (dataset, weight source, method, params) scenario is one ranking task depending on them.
+
+    Args:
+        plan (dict): Output of load_manifest.
+        share (bool): Publish the CSV datasets in shared memory, for process workers.
+
+    Returns:
+        list: Tasks in a dependency order (every task comes after its dependencies).
+    """
+    tasks = []
+    for name, source in plan["weights"].items():
+        if source["kind"] == "ahp":
+            tasks.append(Task(("weights", "", name), "weights", _ahp_task, (source,)))
+    for dataset, path in plan["datasets"].items():
+        load_id = ("load", dataset)
+        tasks.append(Task(load_id, "load", _load_task, (path, share), local=True))
+        for name, source in plan["weights"].items():
+            weights_id = ("weights", "", name)
+            if source["kind"] == "entropy":
+                weights_id = ("weights", dataset, name)
+                tasks.append(Task(weights_id, "weights", _entropy_task, deps=(load_id,)))
+            for method_name, params in plan["scenarios"]:
+                params_key = json.dumps(params, sort_keys=True) if params else ""
+                tasks.append(Task(("rank", dataset, name, method_name, params_key), "rank", _rank_task,
+                                  (method_name, params, plan["top_k"]), deps=(load_id, weights_id)))
+    return tasks
+
+
+def run_task_graph(tasks, executor=None, on_complete=None, results=None):
+    """
+    Run a task graph: a task is submitted as soon as its dependencies have completed, so independent
+    loads, weight computations and rankings overlap in the executor. A failed task fails its dependents;
+    the other tasks still run.
+
+    Args:
+        tasks (list): Tasks in a dependency order (see build_task_graph).
+        executor (Executor or None): Pool running the non-local tasks; None runs every task in the
+                                     calling thread, one after the other.
+        on_complete (callable, optional): on_complete(task, elapsed, error, done, total) after every task.
+        results (dict, optional): Dict receiving the results as they complete (e.g. to release them
+                                  if the run is interrupted).
+
+    Returns:
+        tuple: (results, timings, errors): dicts mapping task ids to the results, execution times (seconds,
+               measured inside the worker) and error messages.
+    """
+    results = {} if results is None else results
+    timings, errors = {}, {}
+    pending = OrderedDict((task.id, task) for task in tasks)
+    running = {}
+
+    def finish(task, result=None, elapsed=0.0, error=None):
+        if error is None:
+            results[task.id] = result
+        else:
+            errors[task.id] = error
+        timings[task.id] = elapsed
+        record("batch." + task.kind, elapsed)
+        if on_complete is not None:
+            on_complete(task, elapsed, error, len(timings), len(tasks))
+
+    while pending or running:
+        completed = len(timings)
+        for task_id, task in list(pending.items()):
+            failed = [dep for dep in task.deps if dep in errors]
+            if failed:
+                del pending[task_id]
+                finish(task, error=f"skipped: {' '.join(str(part) for part in failed[0] if part)} failed")
+                continue
+            if any(dep not in results for dep in task.deps):
+                continue
+            del pending[task_id]
+            args = tuple(results[dep] for dep in task.deps) + task.args
+            if executor is None or task.local:
+                try:
+                    result, elapsed = _timed_call(task.func, args, {})
+                except Exception as e:
+                    finish(task, error=str(e))
+                else:
+                    finish(task, result, elapsed)
+            else:
+                running[executor.submit(_timed_call, task.func, args, {})] = task
+        if not running:
+            if pending and len(timings) == completed:
+                raise ValueError("The task graph has dependencies that are not tasks of the graph.")
+            continue
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            task = running.pop(future)
+            try:
+                result, elapsed = future.result()
+            except Exception as e:
+                finish(task, error=str(e))
+            else:
+                finish(task, result, elapsed)
+    return results, timings, errors
+
+
+def _output_format(path):
+    """Extension of a batch output file, checked before the tasks run."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in BATCH_FORMATS:
+        raise ValueError(f"Unknown batch output format '{ext}'. Choose one of: {', '.join(BATCH_FORMATS)}.")
+    if ext == ".parquet" and not any(importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")):
+        raise ValueError("Parquet output requires pyarrow (or fastparquet); write a .csv file instead.")
+    return ext
+
+
+def write_batch_results(path, tasks, results):
+    """
+    Write the rankings of every scenario into one long-format table with the columns of RESULT_COLUMNS,
+    scenario after scenario. CSV files are appended one scenario at a time; Parquet files (columnar,
+    requires pyarrow) are written from the concatenated columns.
+
+    Args:
+        path (str): Output file (.csv or .parquet).
+        tasks (list): The task graph.
+        results (dict): Task results (see run_task_graph); failed scenarios are left out.
+
+    Returns:
+        int: Number of written rows.
+
+    Raises:
+        ValueError: If the output format is unknown or Parquet support is not installed.
+    """
+    import pandas as pd
+    ext = _output_format(path)
+    frames = []
+    rows = 0
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            if ext == ".csv":
+                f.write(",".join(RESULT_COLUMNS) + "\n")
+            for task in tasks:
+                if task.kind != "rank" or task.id not in results:
+                    continue
+                _, dataset, weights, method_name, params = task.id
+                positions, scores = results[task.id]
+                dm = results[task.deps[0]]
+                n = len(positions)
+                frame = pd.DataFrame(OrderedDict([
+                    ("dataset", np.repeat(dataset, n)),
+                    ("weights", np.repeat(weights, n)),
+                    ("method", np.repeat(method_name, n)),
+                    ("params", np.repeat(params, n)),
+                    ("rank", np.arange(1, n + 1)),
+                    ("model_name", dm.names(positions)),
+                    ("score", scores),
+                ]))
+                rows += n
+                if ext == ".csv":
+                    frame.to_csv(f, header=False, index=False)
+                else:
+                    frames.append(frame)
+        if ext == ".parquet":
+            combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RESULT_COLUMNS)
+            combined.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return rows
+
+
+def run_scenarios(plan, output=None, executor=None, on_complete=None):
+    """
+    Run a scenario plan end to end: build the task graph, run it and write the combined results.
+
+    Args:
+        plan (dict): Output of load_manifest.
+        output (str, optional): Output file; defaults to the output of the manifest.
+        executor (Executor or None): Pool running the weight and ranking tasks (see run_task_graph).
+        on_complete (callable, optional): Progress callback (see run_task_graph).
+
+    Returns:
+        dict: tasks, results, timings, errors, rows (written rows), output and elapsed (wall time, seconds).
+
+    Raises:
+        ValueError: If the output format is unknown or not available.
+    """
+    start = time.perf_counter()
+    output = output or plan["output"]
+    if output:
+        _output_format(output)
+    share = isinstance(executor, ProcessPoolExecutor)
+    if share:
+        # Start the resource tracker before the pool forks its workers, so that they share it with this
+        # process and the published datasets are only tracked once (see attach_decision_matrix)
+        resource_tracker.ensure_running()
+    tasks = build_task_graph(plan, share)
+    results = {}
+    try:
+        _, timings, errors = run_task_graph(tasks, executor, on_complete, results)
+        rows = write_batch_results(output, tasks, results) if output else 0
+    finally:
+        # Release the shared memory blocks of the datasets published for the workers
+        for task in tasks:
+            if task.kind == "load" and getattr(results.get(task.id), "owner", False):
+                results[task.id].unlink()
+    return {"tasks": tasks, "results": results, "timings": timings, "errors": errors, "rows": rows,
+            "output": output, "elapsed": time.perf_counter() - start}
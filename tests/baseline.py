@@ -0,0 +1,163 @@
+# baseline.py
+"""
+Reference implementations of the original (loop-based) weighting and ranking methods, the oracle of the
+equivalence tests: every rewrite of a method must give the same values on the same data.
+The only changes from the original code are direct array indexing instead of per-cell DataFrame lookups
+and no printing.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cleaned_samsung_phones.csv")
+
+
+def samsung_dataset():
+    """The Samsung phones dataset, its criteria and the criterion types of the original main.py."""
+    df = pd.read_csv(DATASET)
+    criteria_columns = [col for col in df.columns if col != "model_name"]
+    criteria_type = {col: "cost" if "price" in col.lower() or "date" in col.lower() else "benefit"
+                     for col in criteria_columns}
+    return df, criteria_columns, criteria_type
+
+
+def normalize_min_max(df, criteria_columns, criteria_type):
+    df_norm = df.copy()
+    for col in criteria_columns:
+        min_val = df[col].min()
+        max_val = df[col].max()
+        if max_val == min_val:
+            df_norm[col] = 0.0
+        elif criteria_type.get(col, "benefit") == "benefit":
+            df_norm[col] = (df[col] - min_val) / (max_val - min_val)
+        else:
+            df_norm[col] = (max_val - df[col]) / (max_val - min_val)
+    return df_norm
+
+
+def promethee_scores(df, criteria_columns, weights, criteria_type):
+    """Net flows of the original PROMETHEE (V-shape preference with p = 1), in the row order of df."""
+    X = normalize_min_max(df, criteria_columns, criteria_type)[criteria_columns].to_numpy(dtype=float)
+    n = df.shape[0]
+    phi_plus = np.zeros(n)
+    phi_minus = np.zeros(n)
+    for i in range(n):
+        for k in range(n):
+            if i == k:
+                continue
+            pref = 0
+            for j, col in enumerate(criteria_columns):
+                diff = X[i, j] - X[k, j]
+                pref += weights[col] * (diff if diff > 0 else 0)
+            phi_plus[i] += pref
+            phi_minus[k] += pref
+    return phi_plus - phi_minus
+
+
+def vikor_measures(df, criteria_columns, weights, criteria_type, v=0.5):
+    """S, R and Q of the original VIKOR, in the row order of df."""
+    df_norm = normalize_min_max(df, criteria_columns, criteria_type)
+    f_star = {col: df_norm[col].max() for col in criteria_columns}
+    f_worst = {col: df_norm[col].min() for col in criteria_columns}
+    X = df_norm[criteria_columns].to_numpy(dtype=float)
+    n = df.shape[0]
+    S = np.zeros(n)
+    R = np.zeros(n)
+    for i in range(n):
+        s_i = 0
+        r_i = -np.inf
+        for j, col in enumerate(criteria_columns):
+            diff = f_star[col] - X[i, j]
+            range_val = f_star[col] - f_worst[col] + 1e-6
+            val = weights[col] * diff / range_val
+            s_i += val
+            if val > r_i:
+                r_i = val
+        S[i] = s_i
+        R[i] = r_i
+    S_min, S_max = S.min(), S.max()
+    R_min, R_max = R.min(), R.max()
+    Q = v * (S - S_min) / (S_max - S_min + 1e-6) + (1 - v) * (R - R_min) / (R_max - R_min + 1e-6)
+    return S, R, Q
+
+
+def ahp_weights(M, criteria_names):
+    """Weights and Consistency Ratio of the original AHP (principal eigenvector, Saaty's RI table)."""
+    M = np.asarray(M, dtype=float)
+    m = M.shape[0]
+    eigenvalues, eigenvectors = np.linalg.eig(M)
+    lambda_max = max(eigenvalues.real)
+    CI = (lambda_max - m) / (m - 1) if m > 1 else 0.0
+    RI_dict = {1: 0.00, 2: 0.00, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
+    RI = RI_dict.get(m, 1.49)
+    CR = CI / RI if RI != 0 else 0.0
+    max_index = np.argmax(eigenvalues.real)
+    weight_vector = np.abs(eigenvectors[:, max_index].real)
+    weight_vector = weight_vector / weight_vector.sum()
+    return {criteria_names[i]: weight_vector[i] for i in range(m)}, CR
+
+
+def entropy_weights(df, criteria_columns, criteria_type):
+    """Weights of the original entropy method."""
+    df_proc = df.copy()
+    for col in criteria_columns:
+        if criteria_type.get(col, "benefit") == "cost":
+            min_val = df[col].min()
+            max_val = df[col].max()
+            df_proc[col] = max_val - df[col] + min_val
+    p = df_proc[criteria_columns].copy()
+    p = p.apply(lambda x: x / (x.sum() + 1e-6), axis=0)
+    n = df.shape[0]
+    k = 1.0 / np.log(n + 1e-6)
+    E = {}
+    for col in criteria_columns:
+        p_col = p[col].replace(0, 1e-6)
+        E[col] = -k * (p_col * np.log(p_col)).sum()
+    d = {col: 1 - E[col] for col in criteria_columns}
+    d_sum = sum(d.values())
+    return {col: d[col] / (d_sum + 1e-6) for col in criteria_columns}
+
+
+def normalize_vector(df, criteria_columns):
+    df_norm = df.copy()
+    for col in criteria_columns:
+        norm = np.sqrt((df[col] ** 2).sum())
+        df_norm[col] = df[col] / norm if norm != 0 else 0.0
+    return df_norm
+
+
+def wsm_scores(df, criteria_columns, weights, criteria_type):
+    df_norm = normalize_min_max(df, criteria_columns, criteria_type)
+    return df_norm[criteria_columns].mul(pd.Series(weights), axis=1).sum(axis=1).to_numpy()
+
+
+def wpm_scores(df, criteria_columns, weights, criteria_type):
+    df_norm = normalize_min_max(df, criteria_columns, criteria_type)
+    scores = np.ones(df.shape[0])
+    for col in criteria_columns:
+        scores *= df_norm[col].to_numpy() ** weights[col]
+    return scores
+
+
+def waspas_scores(df, criteria_columns, weights, criteria_type, lambda_val=0.5):
+    return (lambda_val * wsm_scores(df, criteria_columns, weights, criteria_type)
+            + (1 - lambda_val) * wpm_scores(df, criteria_columns, weights, criteria_type))
+
+
+def topsis_scores(df, criteria_columns, weights, criteria_type):
+    df_norm = normalize_vector(df, criteria_columns)
+    for col in criteria_columns:
+        df_norm[col] = df_norm[col] * weights[col]
+    ideal = {}
+    anti_ideal = {}
+    for col in criteria_columns:
+        if criteria_type.get(col, "benefit") == "benefit":
+            ideal[col] = df_norm[col].max()
+            anti_ideal[col] = df_norm[col].min()
+        else:
+            ideal[col] = df_norm[col].min()
+            anti_ideal[col] = df_norm[col].max()
+    d_plus = np.sqrt(((df_norm[criteria_columns] - pd.Series(ideal)) ** 2).sum(axis=1))
+    d_minus = np.sqrt(((df_norm[criteria_columns] - pd.Series(anti_ideal)) ** 2).sum(axis=1))
+    return (d_minus / (d_plus + d_minus + 1e-6)).to_numpy()
@@ -0,0 +1,88 @@
+# test_ahp.py
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from weights import (compute_ahp_weights, compute_ahp_weights_from_excel, compute_group_ahp_weights,
+                     compute_group_ahp_weights_from_excel, format_consistency_ratio, solve_ahp)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKBOOKS = [os.path.join(ROOT, name)
+             for name in ("pairwise_matrix_AHP.xlsx", "pairwise_matrix_AHP1.xlsx", "pairwise_matrix_AHP2.xlsx")]
+
+
+def _read(path):
+    df = pd.read_excel(path, index_col=0)
+    return df.to_numpy(dtype=float), df.index.tolist()
+
+
+def _consistent_matrix(m, seed=0):
+    w = np.random.default_rng(seed).uniform(1.0, 9.0, size=m)
+    return w[:, None] / w[None, :], w / w.sum()
+
+
+@pytest.mark.parametrize("path", WORKBOOKS)
+def test_matches_original_ahp(path):
+    M, names = _read(path)
+    expected, expected_cr = baseline.ahp_weights(M, names)
+    weights = compute_ahp_weights_from_excel(path)
+    assert list(weights) == names
+    np.testing.assert_allclose([weights[name] for name in names], [expected[name] for name in names],
+                               rtol=1e-12, atol=1e-15)
+    assert weights.attrs["consistency_ratio"] == pytest.approx(expected_cr, abs=1e-12)
+    assert format_consistency_ratio(weights) == f"CR = {expected_cr:.4f}"
+
+
+@pytest.mark.parametrize("path", WORKBOOKS)
+def test_power_iteration_matches_eig(path):
+    M, _ = _read(path)
+    w_eig, lambda_eig, cr_eig = solve_ahp(M, "eig")
+    w_power, lambda_power, cr_power = solve_ahp(M, "power")
+    np.testing.assert_allclose(w_power, w_eig, rtol=1e-9)
+    assert lambda_power == pytest.approx(lambda_eig, rel=1e-9)
+    assert cr_power == pytest.approx(cr_eig, abs=1e-9)
+
+
+@pytest.mark.parametrize("method", ["eig", "power", "geometric"])
+def test_consistent_large_matrix(method):
+    # Every method is exact on a consistent matrix: w_i / w_j judgments give back w, with CR = 0
+    M, w = _consistent_matrix(40)
+    weights, lambda_max, CR = solve_ahp(M, method)
+    np.testing.assert_allclose(weights, w, rtol=1e-9)
+    assert lambda_max == pytest.approx(40.0, rel=1e-9)
+    assert abs(CR) < 1e-9
+
+
+def test_stack_matches_single_solves():
+    stack = np.stack([_read(path)[0] for path in WORKBOOKS])
+    W, lambda_max, CR = solve_ahp(stack)
+    for k, M in enumerate(stack):
+        w, lam, cr = solve_ahp(M)
+        np.testing.assert_allclose(W[k], w, rtol=1e-12)
+        assert lambda_max[k] == pytest.approx(lam, rel=1e-12)
+        assert CR[k] == pytest.approx(cr, abs=1e-12)
+
+
+def test_group_ahp_aggregations():
+    matrices, names = zip(*(_read(path) for path in WORKBOOKS[1:]))
+    names = names[0]
+    # aij: the original AHP on the element-wise geometric mean of the judgments
+    expected, expected_cr = baseline.ahp_weights(np.sqrt(matrices[0] * matrices[1]), names)
+    weights = compute_group_ahp_weights(matrices, names, "aij")
+    np.testing.assert_allclose([weights[n] for n in names], [expected[n] for n in names], rtol=1e-12)
+    assert weights.attrs["consistency_ratio"] == pytest.approx(expected_cr, abs=1e-12)
+    # aip: normalized geometric mean of the experts' priority vectors
+    individual = [baseline.ahp_weights(M, names) for M in matrices]
+    priorities = np.sqrt(np.array([[w[n] for n in names] for w, _ in individual]).prod(axis=0))
+    weights = compute_group_ahp_weights_from_excel(WORKBOOKS[1:], "aip")
+    np.testing.assert_allclose([weights[n] for n in names], priorities / priorities.sum(), rtol=1e-12)
+    np.testing.assert_allclose(weights.attrs["consistency_ratio"], [cr for _, cr in individual], atol=1e-12)
+
+
+def test_inconsistent_matrix_is_rejected():
+    M = np.array([[1.0, 9.0, 1 / 9], [1 / 9, 1.0, 9.0], [9.0, 1 / 9, 1.0]])
+    with pytest.raises(ValueError, match="Consistency Ratio"):
+        compute_ahp_weights(M, ["a", "b", "c"])
@@ -0,0 +1,75 @@
+# test_binary.py
+import pickle
+
+import numpy as np
+import pytest
+
+import baseline
+from common_utils import DecisionMatrix
+from dataio import (
+    MappedDecisionMatrix,
+    convert_csv,
+    is_binary_dataset,
+    load_decision_matrix,
+    read_decision_matrix_bytes,
+    save_decision_matrix,
+)
+from ranking import rank_promethee, rank_topsis, rank_vikor, rank_wsm
+
+
+@pytest.fixture
+def phones():
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    return df, criteria_columns, criteria_type, DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type)
+
+
+def _assert_same_matrix(loaded, dm):
+    assert loaded.criteria_columns == dm.criteria_columns
+    assert loaded.criteria_type == dm.criteria_type
+    assert loaded.dtype == dm.dtype
+    np.testing.assert_array_equal(loaded.values, dm.values)
+    assert list(loaded.alternatives) == list(dm.alternatives)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_round_trip(tmp_path, phones, dtype):
+    df, criteria_columns, criteria_type, _ = phones
+    dm = DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type, dtype=dtype)
+    path = tmp_path / "phones.mcdm"
+    save_decision_matrix(dm, str(path))
+    assert is_binary_dataset(str(path))
+    mapped = load_decision_matrix(str(path))
+    assert isinstance(mapped, MappedDecisionMatrix)
+    for loaded in (mapped, load_decision_matrix(str(path), mmap=False), read_decision_matrix_bytes(path.read_bytes())):
+        _assert_same_matrix(loaded, dm)
+
+
+def test_convert_csv_matches_save(tmp_path, phones):
+    df, criteria_columns, criteria_type, dm = phones
+    csv_path = tmp_path / "phones.csv"
+    df.to_csv(csv_path, index=False)
+    convert_csv(str(csv_path), str(tmp_path / "converted.mcdm"), criteria_columns, criteria_type, chunksize=7)
+    _assert_same_matrix(load_decision_matrix(str(tmp_path / "converted.mcdm")), dm)
+
+
+def test_mapped_matrix_rankings(tmp_path, phones):
+    df, criteria_columns, criteria_type, dm = phones
+    path = tmp_path / "phones.mcdm"
+    save_decision_matrix(dm, str(path))
+    mapped = load_decision_matrix(str(path))
+    weights = {col: 1 / len(criteria_columns) for col in criteria_columns}
+    for rank in (rank_wsm, rank_topsis, rank_vikor, rank_promethee):
+        np.testing.assert_array_equal(rank(mapped, criteria_columns, weights, criteria_type, lazy=True).scores,
+                                      rank(dm, criteria_columns, weights, criteria_type, lazy=True).scores)
+    # Pickling only transfers the path: the copy maps the same file
+    copy = pickle.loads(pickle.dumps(mapped))
+    assert isinstance(copy, MappedDecisionMatrix) and copy.path == str(path)
+    _assert_same_matrix(copy, dm)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "phones.csv"
+    path.write_text("model_name,price\nA,1\n")
+    assert not is_binary_dataset(str(path))
+    with pytest.raises(ValueError, match="signature"):
+        read_decision_matrix_bytes(path.read_bytes())
@@ -0,0 +1,69 @@
+# test_consensus.py
+import numpy as np
+import pytest
+from scipy import stats
+
+import baseline
+from analysis.module_consensus import (average_ranks, borda_scores, compare_rankings, copeland_scores,
+                                       kendall_tau_b)
+from ranking import available_methods
+
+
+def _score_pairs():
+    rng = np.random.default_rng(7)
+    x = rng.normal(size=500)
+    yield x, 0.6 * x + rng.normal(size=500)
+    # Heavy ties on both sides
+    yield rng.integers(0, 5, size=300).astype(float), rng.integers(0, 8, size=300).astype(float)
+    yield np.arange(50.0), np.arange(50.0)[::-1]
+    yield np.array([1.0, 2.0]), np.array([2.0, 1.0])
+
+
+@pytest.mark.parametrize("x, y", list(_score_pairs()))
+def test_kendall_tau_b_matches_scipy(x, y):
+    assert kendall_tau_b(x, y) == pytest.approx(stats.kendalltau(x, y).statistic, abs=1e-12)
+
+
+def test_kendall_tau_b_constant_input():
+    assert np.isnan(kendall_tau_b(np.ones(5), np.arange(5.0)))
+
+
+@pytest.mark.parametrize("ascending", [False, True])
+def test_average_ranks_match_scipy(ascending):
+    rng = np.random.default_rng(1)
+    S = rng.integers(0, 20, size=(4, 200)).astype(float)
+    expected = np.vstack([stats.rankdata(row if ascending else -row) for row in S])
+    np.testing.assert_array_equal(average_ranks(S, ascending), expected)
+    np.testing.assert_array_equal(average_ranks(S[0], ascending), expected[0])
+
+
+def test_copeland_matches_pairwise_contests():
+    rng = np.random.default_rng(2)
+    R = average_ranks(rng.integers(0, 6, size=(5, 40)).astype(float))
+    k, n = R.shape
+    expected = np.zeros(n)
+    for a in range(n):
+        for b in range(n):
+            before = (R[:, a] < R[:, b]).sum() - (R[:, a] > R[:, b]).sum()
+            expected[a] += np.sign(before)
+    np.testing.assert_array_equal(copeland_scores(R, block_size=7), expected)
+
+
+def test_compare_rankings_of_all_methods_matches_scipy():
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    weights = baseline.entropy_weights(df, criteria_columns, criteria_type)
+    rankings = {method.label: method.rank(df, criteria_columns, weights, criteria_type, lazy=True)
+                for method in available_methods()}
+    comparison = compare_rankings(rankings)
+    R = comparison["ranks"]
+    for a, first in enumerate(rankings):
+        scores = rankings[first].scores
+        np.testing.assert_array_equal(R[a], stats.rankdata(scores if rankings[first].ascending else -scores))
+        for b, second in enumerate(rankings):
+            assert comparison["kendall"].loc[first, second] == pytest.approx(
+                stats.kendalltau(R[a], R[b]).statistic, abs=1e-12)
+            assert comparison["spearman"].loc[first, second] == pytest.approx(
+                stats.spearmanr(R[a], R[b]).statistic, abs=1e-12)
+    consensus = comparison["consensus"]
+    np.testing.assert_allclose(consensus["borda"].to_numpy(),
+                               borda_scores(R)[np.argsort(-borda_scores(R), kind="stable")])
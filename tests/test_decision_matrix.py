@@ -0,0 +1,55 @@
+# test_decision_matrix.py
+import numpy as np
+import pytest
+
+import baseline
+from common_utils import DecisionMatrix
+from ranking import rank_topsis, rank_waspas, rank_wpm, rank_wsm
+
+METHODS = [
+    (rank_wsm, baseline.wsm_scores),
+    (rank_wpm, baseline.wpm_scores),
+    (rank_waspas, baseline.waspas_scores),
+    (rank_topsis, baseline.topsis_scores),
+]
+
+
+def _weights(criteria_columns):
+    return {col: (i + 1.0) / 28 for i, col in enumerate(criteria_columns)}
+
+
+@pytest.mark.parametrize("rank, reference", METHODS)
+def test_matches_original_methods(rank, reference):
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    weights = _weights(criteria_columns)
+    expected = reference(df, criteria_columns, weights, criteria_type)
+    dm = DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type)
+    # The same scores from a DataFrame and from a shared decision matrix
+    for data in (df, dm):
+        ranking = rank(data, criteria_columns, weights, criteria_type, lazy=True)
+        np.testing.assert_allclose(ranking.scores, expected, rtol=1e-12, atol=1e-14)
+    ranking = rank(df, criteria_columns, weights, criteria_type)
+    assert ranking["model_name"].tolist() == df["model_name"].to_numpy()[np.argsort(-expected, kind="stable")].tolist()
+
+
+@pytest.mark.parametrize("rank, reference", METHODS)
+def test_float32_matrix_is_close(rank, reference):
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    weights = _weights(criteria_columns)
+    dm = DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type, dtype=np.float32)
+    ranking = rank(dm, criteria_columns, weights, criteria_type, lazy=True)
+    np.testing.assert_allclose(ranking.scores, reference(df, criteria_columns, weights, criteria_type),
+                               rtol=1e-5, atol=1e-6)
+
+
+def test_normalizations_are_computed_once():
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    dm = DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type)
+    first = dm.min_max
+    for rank, _ in METHODS:
+        rank(dm, criteria_columns, _weights(criteria_columns), criteria_type)
+    assert dm.min_max is first
+    expected = baseline.normalize_min_max(df, criteria_columns, criteria_type)[criteria_columns].to_numpy()
+    np.testing.assert_allclose(dm.min_max, expected, rtol=1e-15)
+    np.testing.assert_allclose(dm.vector, baseline.normalize_vector(df, criteria_columns)[criteria_columns],
+                               rtol=1e-15)
@@ -0,0 +1,48 @@
+# test_entropy.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from common_utils import DecisionMatrix
+from dataio import compute_entropy_weights_streaming
+from weights import compute_entropy_weights
+from weights.module_entropy import compute_grouped_entropy_weights
+
+
+def _values(weights, criteria_columns):
+    return np.array([weights[col] for col in criteria_columns])
+
+
+def test_matches_original_entropy():
+    # 1 - E cancels most digits of the small weights: compare with an absolute tolerance too
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    expected = _values(baseline.entropy_weights(df, criteria_columns, criteria_type), criteria_columns)
+    np.testing.assert_allclose(_values(compute_entropy_weights(df, criteria_columns, criteria_type),
+                                       criteria_columns), expected, rtol=1e-12, atol=1e-13)
+    dm = DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type)
+    np.testing.assert_allclose(_values(compute_entropy_weights(dm, criteria_columns, criteria_type),
+                                       criteria_columns), expected, rtol=1e-12, atol=1e-13)
+
+
+@pytest.mark.parametrize("chunksize", [7, 1000])
+def test_streaming_matches_in_memory(tmp_path, chunksize):
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    path = tmp_path / "phones.csv"
+    df.to_csv(path, index=False)
+    weights = compute_entropy_weights_streaming(str(path), criteria_columns, criteria_type, chunksize=chunksize)
+    expected = compute_entropy_weights(df, criteria_columns, criteria_type)
+    np.testing.assert_allclose(_values(weights, criteria_columns), _values(expected, criteria_columns), rtol=1e-9)
+
+
+def test_grouped_matches_every_group_alone():
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    rng = np.random.default_rng(0)
+    df["brand_name"] = rng.choice(["b", "a", "c"], size=len(df))
+    df.loc[df.index[:3], "brand_name"] = None
+    grouped = compute_grouped_entropy_weights(df, criteria_columns, criteria_type)
+    assert grouped.index.tolist() == ["a", "b", "c"]
+    for brand, row in grouped.iterrows():
+        group = df[df["brand_name"] == brand].reset_index(drop=True)
+        expected = baseline.entropy_weights(group, criteria_columns, criteria_type)
+        np.testing.assert_allclose(row.to_numpy(), _values(expected, criteria_columns), rtol=1e-12, atol=1e-13)
@@ -0,0 +1,78 @@
+# test_incremental.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from common_utils import DecisionMatrix
+from ranking.module_batch import build_batch_kernel
+from ranking.module_incremental import INCREMENTAL_METHODS, RankingSession
+
+CRITERIA = ["c1", "c2", "c3"]
+CRITERIA_TYPE = {"c1": "benefit", "c2": "cost", "c3": "benefit"}
+WEIGHTS = {"c1": 0.5, "c2": 0.3, "c3": 0.2}
+# V-shape with p >= 1 is rescaled in place when a bound moves; linear recomputes the criterion's flows
+PREFERENCES = [("vshape", None), ({"c1": "linear", "c2": "usual", "c3": "level"}, {"q": 0.1, "p": 0.4})]
+
+
+def _frame(values, names):
+    df = pd.DataFrame(values, columns=CRITERIA)
+    df.insert(0, "model_name", names)
+    return df
+
+
+def _assert_matches_recompute(session, preference, thresholds):
+    """Every score of the session equals the scores of a full batch computation on its current rows."""
+    rows = {alt_id: row for alt_id, row in zip(session.ids, session._values[:len(session)])}
+    dm = DecisionMatrix.from_dataframe(_frame(list(rows.values()), session.alternatives), CRITERIA, CRITERIA_TYPE)
+    w = dm.weight_vector(WEIGHTS)[None, :]
+    for method in INCREMENTAL_METHODS:
+        kernel, _ = build_batch_kernel(dm, method, preference=preference, thresholds=thresholds)
+        np.testing.assert_allclose(session.scores(method), kernel(w)[0], rtol=1e-9, atol=1e-9, err_msg=method)
+
+
+def _random_rows(rng, k):
+    return np.column_stack([rng.normal(size=k), rng.integers(1, 9, size=k), rng.uniform(size=k)])
+
+
+@pytest.mark.parametrize("preference, thresholds", PREFERENCES)
+def test_insert_delete_update_match_recompute(preference, thresholds):
+    rng = np.random.default_rng(3)
+    session = RankingSession(_frame(_random_rows(rng, 30), [f"p{i}" for i in range(30)]), CRITERIA, WEIGHTS,
+                             CRITERIA_TYPE, preference, thresholds)
+    _assert_matches_recompute(session, preference, thresholds)
+
+    # New extremes move the bounds of every criterion
+    session.insert("top", [10.0, 0.0, 2.0])
+    session.insert("bottom", [-10.0, 20.0, -1.0])
+    _assert_matches_recompute(session, preference, thresholds)
+
+    # Removing the extremes moves the bounds back
+    top, bottom = session.ids[-2:]
+    session.delete(top)
+    session.delete(bottom)
+    _assert_matches_recompute(session, preference, thresholds)
+
+    for alt_id in session.ids[:5]:
+        session.update(alt_id, _random_rows(rng, 1)[0])
+    session.update(session.ids[0], [0.0, 5.0, 0.5], name="renamed")
+    _assert_matches_recompute(session, preference, thresholds)
+    assert "renamed" in session.alternatives
+
+
+@pytest.mark.parametrize("preference, thresholds", PREFERENCES)
+def test_delete_all_then_insert_matches_recompute(preference, thresholds):
+    rng = np.random.default_rng(5)
+    session = RankingSession(_frame(_random_rows(rng, 10), [f"p{i}" for i in range(10)]), CRITERIA, WEIGHTS,
+                             CRITERIA_TYPE, preference, thresholds)
+    for alt_id in session.ids:
+        session.delete(alt_id)
+    assert len(session) == 0
+    for i, row in enumerate(_random_rows(rng, 4)):
+        session.insert(f"new {i}", row)
+    _assert_matches_recompute(session, preference, thresholds)
+
+
+def test_delete_unknown_alternative():
+    session = RankingSession(_frame(np.ones((2, 3)), ["a", "b"]), CRITERIA, WEIGHTS, CRITERIA_TYPE)
+    with pytest.raises(KeyError):
+        session.delete(99)
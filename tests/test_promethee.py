@@ -0,0 +1,112 @@
+# test_promethee.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from common_utils import DecisionMatrix
+from ranking.module_promethee import (_resolve_preferences, compute_promethee_criterion_flows,
+                                      compute_promethee_net_flow_sampled, rank_promethee)
+
+CRITERIA = ["c1", "c2", "c3"]
+CRITERIA_TYPE = {"c1": "benefit", "c2": "cost", "c3": "benefit"}
+WEIGHTS = {"c1": 0.5, "c2": 0.3, "c3": 0.2}
+
+# Every preference function of the sorted algorithm, with non-default thresholds
+SORTED_CASES = [
+    ("usual", None),
+    ("ushape", {"q": 0.2}),
+    ("vshape", {"p": 0.4}),
+    ("level", {"q": 0.1, "p": 0.35}),
+    ("linear", {"q": 0.05, "p": 0.6}),
+    ("linear", {"q": 0.0, "p": 1.0}),
+    ({"c1": "linear", "c2": "level", "c3": "ushape"},
+     {"c1": {"q": 0.1, "p": 0.3}, "c2": {"q": 0.25, "p": 0.5}, "c3": {"q": 0.4}}),
+]
+
+
+def _dataset(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "model_name": [f"phone {i}" for i in range(n)],
+        "c1": rng.normal(size=n),
+        # Few distinct values: many ties, and differences equal to the thresholds
+        "c2": rng.integers(0, 20, size=n).astype(float),
+        "c3": rng.uniform(size=n),
+    })
+    return DecisionMatrix.from_dataframe(df, CRITERIA, CRITERIA_TYPE)
+
+
+@pytest.mark.parametrize("preference, thresholds", SORTED_CASES)
+def test_sorted_flows_equal_pairwise(preference, thresholds):
+    dm = _dataset()
+    preferences = _resolve_preferences(CRITERIA, preference, thresholds)
+    expected = compute_promethee_criterion_flows(dm.min_max, preferences, algorithm="pairwise")
+    actual = compute_promethee_criterion_flows(dm.min_max, preferences, algorithm="sorted")
+    for phi_expected, phi_actual in zip(expected, actual):
+        np.testing.assert_allclose(phi_actual, phi_expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize("preference, thresholds", SORTED_CASES)
+def test_sorted_ranking_equals_pairwise(preference, thresholds):
+    dm = _dataset()
+    expected = rank_promethee(dm, CRITERIA, WEIGHTS, CRITERIA_TYPE, preference, thresholds, algorithm="pairwise")
+    actual = rank_promethee(dm, CRITERIA, WEIGHTS, CRITERIA_TYPE, preference, thresholds, algorithm="sorted")
+    np.testing.assert_allclose(actual["score"].to_numpy(), expected["score"].to_numpy(), rtol=1e-9, atol=1e-9)
+
+
+def test_sorted_rejects_gaussian():
+    dm = _dataset(n=20)
+    with pytest.raises(ValueError):
+        rank_promethee(dm, CRITERIA, WEIGHTS, CRITERIA_TYPE, "gaussian", {"s": 0.3}, algorithm="sorted")
+
+
+def test_parallel_flows_equal_pairwise():
+    dm = _dataset(n=120)
+    preferences = _resolve_preferences(CRITERIA, "gaussian", {"s": 0.3})
+    expected = compute_promethee_criterion_flows(dm.min_max, preferences, algorithm="pairwise")
+    actual = compute_promethee_criterion_flows(dm.min_max, preferences, block_size=16, algorithm="parallel",
+                                               n_jobs=2)
+    for phi_expected, phi_actual in zip(expected, actual):
+        np.testing.assert_allclose(phi_actual, phi_expected, rtol=1e-9, atol=1e-9)
+
+
+def test_sampled_is_exact_with_every_alternative():
+    dm = _dataset(n=50)
+    expected = rank_promethee(dm, CRITERIA, WEIGHTS, CRITERIA_TYPE, algorithm="pairwise")
+    actual = rank_promethee(dm, CRITERIA, WEIGHTS, CRITERIA_TYPE, algorithm="sampled", sample_size=50)
+    np.testing.assert_allclose(actual["score"].to_numpy(), expected["score"].to_numpy(), atol=1e-9)
+    assert actual.attrs["error_bound"] == 0.0
+    np.testing.assert_array_equal(actual.attrs["stderr"], np.zeros(50))
+
+
+def test_sampled_error_bound_and_stderr():
+    dm = _dataset()
+    preferences = _resolve_preferences(CRITERIA, "linear", {"q": 0.05, "p": 0.6})
+    w = dm.weight_vector(WEIGHTS)
+    exact = compute_promethee_criterion_flows(dm.min_max, preferences, algorithm="pairwise")
+    exact = w @ (exact[0] - exact[1]).T
+    estimate, stderr, bound = compute_promethee_net_flow_sampled(dm.min_max, w, preferences, sample_size=60)
+    assert stderr.shape == estimate.shape == (dm.shape[0],)
+    assert np.all(stderr > 0)
+    assert np.max(np.abs(estimate - exact)) <= bound
+    # Standard errors of the same order as the actual errors, far below the worst-case bound
+    assert np.sqrt(np.mean((estimate - exact) ** 2)) < 3 * np.sqrt(np.mean(stderr ** 2))
+    assert np.max(stderr) < bound
+
+    ranking = rank_promethee(dm, CRITERIA, WEIGHTS, CRITERIA_TYPE, "linear", {"q": 0.05, "p": 0.6},
+                             algorithm="sampled", sample_size=60, lazy=True)
+    np.testing.assert_array_equal(ranking.attrs["stderr"], stderr)
+
+
+def test_matches_original_promethee():
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    weights = {col: 1.0 / len(criteria_columns) for col in criteria_columns}
+    expected = baseline.promethee_scores(df, criteria_columns, weights, criteria_type)
+    for algorithm in ("pairwise", "sorted"):
+        ranking = rank_promethee(df, criteria_columns, weights, criteria_type, algorithm=algorithm, lazy=True)
+        np.testing.assert_allclose(ranking.scores, expected, rtol=1e-12, atol=1e-12, err_msg=algorithm)
+    # Same ranking as the original (the scores have no ties)
+    ranking = rank_promethee(df, criteria_columns, weights, criteria_type)
+    order = np.argsort(-expected, kind="stable")
+    assert ranking["model_name"].tolist() == df["model_name"].to_numpy()[order].tolist()
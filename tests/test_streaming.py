@@ -0,0 +1,51 @@
+# test_streaming.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from dataio import rank_csv_streaming
+from ranking import rank_topsis, rank_wpm, rank_wsm
+from weights import compute_entropy_weights
+
+IN_MEMORY = {"wsm": rank_wsm, "wpm": rank_wpm, "topsis": rank_topsis}
+
+
+@pytest.fixture
+def phones_csv(tmp_path):
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    path = tmp_path / "phones.csv"
+    df.to_csv(path, index=False)
+    return str(path), df, criteria_columns, criteria_type
+
+
+@pytest.mark.parametrize("method", sorted(IN_MEMORY))
+@pytest.mark.parametrize("chunksize", [7, 1000])
+def test_top_k_matches_in_memory(phones_csv, method, chunksize):
+    path, df, criteria_columns, criteria_type = phones_csv
+    top = rank_csv_streaming(path, criteria_columns, criteria_type=criteria_type, method=method, top_k=10,
+                             chunksize=chunksize)
+    weights = compute_entropy_weights(df, criteria_columns, criteria_type)
+    expected = IN_MEMORY[method](df, criteria_columns, weights, criteria_type).head(10)
+    np.testing.assert_allclose(top["score"].to_numpy(dtype=float), expected["score"].to_numpy(), rtol=1e-12)
+    assert top["model_name"].tolist() == expected["model_name"].tolist()
+
+
+@pytest.mark.parametrize("method", sorted(IN_MEMORY))
+def test_spilled_ranking_matches_in_memory(phones_csv, tmp_path, method):
+    path, df, criteria_columns, criteria_type = phones_csv
+    weights = {col: 1 / len(criteria_columns) for col in criteria_columns}
+    spill = tmp_path / "ranking.csv"
+    rank_csv_streaming(path, criteria_columns, weights, criteria_type, method=method, top_k=3, spill_path=str(spill),
+                       chunksize=11)
+    full = pd.read_csv(spill)
+    expected = IN_MEMORY[method](df, criteria_columns, weights, criteria_type)
+    assert full["rank"].tolist() == list(range(1, len(df) + 1))
+    np.testing.assert_allclose(full["score"].to_numpy(), expected["score"].to_numpy(), rtol=1e-12)
+    assert full["model_name"].tolist() == expected["model_name"].tolist()
+
+
+def test_rejects_non_positive_top_k(phones_csv):
+    path, _, criteria_columns, criteria_type = phones_csv
+    with pytest.raises(ValueError, match="top_k"):
+        rank_csv_streaming(path, criteria_columns, criteria_type=criteria_type, top_k=0)
@@ -0,0 +1,48 @@
+# test_vikor.py
+import numpy as np
+import pytest
+
+import baseline
+from common_utils import DecisionMatrix
+from ranking.module_vikor import compute_vikor, compute_vikor_compromise, rank_vikor
+
+
+@pytest.mark.parametrize("v", [0.0, 0.3, 0.5, 1.0])
+def test_matches_original_vikor(v):
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    weights = {col: (i + 1.0) / 28 for i, col in enumerate(criteria_columns)}
+    S, R, Q = baseline.vikor_measures(df, criteria_columns, weights, criteria_type, v)
+    dm = DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type)
+    measures = compute_vikor(dm.min_max, dm.weight_vector(weights), v)
+    np.testing.assert_allclose(measures["S"], S, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(measures["R"], R, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(measures["Q"], Q, rtol=1e-12, atol=1e-12)
+    ranking = rank_vikor(df, criteria_columns, weights, criteria_type, v=v, lazy=True)
+    np.testing.assert_allclose(ranking.scores, Q, rtol=1e-12, atol=1e-12)
+
+
+def test_several_v_values_match_single_runs():
+    df, criteria_columns, criteria_type = baseline.samsung_dataset()
+    dm = DecisionMatrix.from_dataframe(df, criteria_columns, criteria_type)
+    w = np.full(len(criteria_columns), 1.0 / len(criteria_columns))
+    values = [0.2, 0.5, 0.9]
+    batch = compute_vikor(dm.min_max, w, values)
+    for k, v in enumerate(values):
+        single = compute_vikor(dm.min_max, w, v)
+        np.testing.assert_allclose(batch["Q"][k], single["Q"])
+        np.testing.assert_array_equal(batch["compromise"][k], single["compromise"])
+
+
+def test_compromise_conditions():
+    # n = 5, so DQ = 0.25
+    S = np.array([0.1, 0.5, 0.6, 0.7, 0.9])
+    R = np.array([0.1, 0.4, 0.5, 0.6, 0.8])
+    # Acceptable advantage and stability: the best alternative alone
+    np.testing.assert_array_equal(compute_vikor_compromise(S, R, np.array([0.0, 0.3, 0.5, 0.7, 1.0])), [0])
+    # Advantage without stability (alternative 0 is best by neither S nor R): the two best
+    S_unstable = np.array([0.5, 0.1, 0.6, 0.7, 0.9])
+    R_unstable = np.array([0.4, 0.1, 0.5, 0.6, 0.8])
+    np.testing.assert_array_equal(
+        compute_vikor_compromise(S_unstable, R_unstable, np.array([0.0, 0.3, 0.5, 0.7, 1.0])), [0, 1])
+    # No acceptable advantage: every alternative within DQ of the best, ordered by Q
+    np.testing.assert_array_equal(compute_vikor_compromise(S, R, np.array([0.1, 0.0, 0.2, 0.7, 1.0])), [1, 0, 2])
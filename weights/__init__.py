@@ -1,7 +1,16 @@
-from .module_ahp import compute_ahp_weights_from_excel
-from .module_entropy import compute_entropy_weights
+from .module_ahp import (AHPWeights, compute_ahp_weights, compute_ahp_weights_from_excel, compute_group_ahp_weights,
+                         compute_group_ahp_weights_from_excel, format_consistency_ratio, solve_ahp)
+from .module_entropy import compute_entropy_weights, compute_entropy_weights_from_stats, compute_grouped_entropy_weights
 
 __all__ = [
+    "AHPWeights",
+    "compute_ahp_weights",
     "compute_ahp_weights_from_excel",
+    "compute_group_ahp_weights",
+    "compute_group_ahp_weights_from_excel",
+    "format_consistency_ratio",
+    "solve_ahp",
     "compute_entropy_weights",
+    "compute_entropy_weights_from_stats",
+    "compute_grouped_entropy_weights",
 ]
@@ -1,72 +1,330 @@
 # module_ahp.py
+import functools
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
 import numpy as np
-import pandas as pd
 
-def compute_consistency_ratio(M):
+from instrumentation import instrumented
+
+# Saaty's Random Consistency Index (RI) for matrices of order m <= 10; larger orders are simulated (see random_index)
+RI_TABLE = {1: 0.00, 2: 0.00, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
+# Saaty's 1-9 scale and its reciprocals, used to draw the random matrices of the RI simulation
+SAATY_SCALE = np.array([1 / 9, 1 / 8, 1 / 7, 1 / 6, 1 / 5, 1 / 4, 1 / 3, 1 / 2, 1, 2, 3, 4, 5, 6, 7, 8, 9])
+AHP_METHODS = ("eig", "power", "geometric")
+# Parsed pairwise comparison workbooks, keyed by the SHA-256 of the file contents
+WORKBOOK_CACHE_SIZE = 32
+_workbook_cache = OrderedDict()
+_workbook_lock = threading.Lock()
+
+
+class AHPWeights(dict):
+    """
+    Mapping of criteria names to AHP weights, with the consistency of the judgments in attrs
+    (as LazyRanking.attrs), so that the callers decide whether to report it.
+
+    Attributes:
+        attrs (dict): 'consistency_ratio': CR of the solved matrix (float), or of every expert's
+                      matrix for group AHP aggregating the priorities (list).
+    """
+
+    def __init__(self, weights, consistency_ratio):
+        super().__init__(weights)
+        self.attrs = {"consistency_ratio": consistency_ratio}
+
+
+def format_consistency_ratio(weights):
+    """'CR = 0.0076' (or 'CR = 0.0076, 0.0087' per expert) for AHP weights, None for other weights."""
+    cr = getattr(weights, "attrs", {}).get("consistency_ratio")
+    if cr is None:
+        return None
+    return "CR = " + ", ".join(f"{value:.4f}" for value in np.atleast_1d(cr))
+
+
+def _power_iteration(M, w, tol=1e-12, max_iter=1000):
+    """Principal eigenvector of a stack of positive matrices (shape: ... x m x m), normalized to sum to 1."""
+    for _ in range(max_iter):
+        w_next = (M @ w[..., None])[..., 0]
+        w_next /= w_next.sum(axis=-1, keepdims=True)
+        if np.abs(w_next - w).max() < tol:
+            return w_next
+        w = w_next
+    return w
+
+
+@functools.lru_cache(maxsize=None)
+def random_index(m, n_samples=2000, seed=0):
+    """
+    Random Consistency Index of order m: Saaty's table for m <= 10, otherwise the mean consistency index
+    of random reciprocal matrices drawn from the 1-9 scale, simulated once per order and cached.
+
+    Args:
+        m (int): Order of the pairwise comparison matrix.
+        n_samples (int): Number of random matrices of the simulation.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        float: The Random Consistency Index.
+    """
+    if m in RI_TABLE:
+        return RI_TABLE[m]
+    rng = np.random.default_rng(seed)
+    upper = np.triu_indices(m, k=1)
+    chunk = max(1, (1 << 22) // (m * m))
+    total = 0.0
+    for start in range(0, n_samples, chunk):
+        k = min(chunk, n_samples - start)
+        M = np.ones((k, m, m))
+        values = rng.choice(SAATY_SCALE, size=(k, upper[0].size))
+        M[:, upper[0], upper[1]] = values
+        M[:, upper[1], upper[0]] = 1.0 / values
+        w = _power_iteration(M, np.full((k, m), 1.0 / m), tol=1e-10)
+        total += ((M @ w[..., None])[..., 0].sum(axis=-1) - m).sum() / (m - 1)
+    return float(total / n_samples)
+
+
+def _validate(M):
+    M = np.asarray(M, dtype=float)
+    if M.ndim < 2 or M.shape[-1] != M.shape[-2]:
+        raise ValueError("The pairwise comparison matrix must be square.")
+    if not (M > 0).all():
+        raise ValueError("The pairwise comparison matrix must have positive entries.")
+    return M
+
+
+def solve_ahp(M, method="eig", tol=1e-12, max_iter=1000):
+    """
+    Compute the priority vector, the principal eigenvalue and the Consistency Ratio of one pairwise
+    comparison matrix or of a stack of matrices, with one decomposition per matrix:
+    - "eig": principal eigenvector of a full eigen-decomposition (exact).
+    - "power": power iteration started from the geometric mean, O(m^2) per iteration, for large m.
+    - "geometric": normalized geometric mean of the rows (exact for consistent matrices), with
+      lambda_max estimated as mean_i((M w)_i / w_i).
+
+    Args:
+        M (array-like): Pairwise comparison matrix (shape: m x m), or a stack of them (shape: k x m x m).
+        method (str): "eig", "power" or "geometric".
+        tol (float): Convergence tolerance of the power iteration.
+        max_iter (int): Maximum number of power iterations.
+
+    Returns:
+        tuple: (weights (shape: m, or k x m), lambda_max (float or shape k), CR (float or shape k)).
+
+    Raises:
+        ValueError: If the matrix is not square with positive entries, or the method is unknown.
+    """
+    M = _validate(M)
+    m = M.shape[-1]
+    if method == "eig":
+        eigenvalues, eigenvectors = np.linalg.eig(M)
+        index = np.argmax(eigenvalues.real, axis=-1)
+        lambda_max = np.take_along_axis(eigenvalues.real, index[..., None], axis=-1)[..., 0]
+        w = np.abs(np.take_along_axis(eigenvectors.real, index[..., None, None], axis=-1)[..., 0])
+        w = w / w.sum(axis=-1, keepdims=True)
+    elif method in ("power", "geometric"):
+        w = np.exp(np.log(M).mean(axis=-1))
+        w /= w.sum(axis=-1, keepdims=True)
+        if method == "power":
+            w = _power_iteration(M, w, tol, max_iter)
+        lambda_max = ((M @ w[..., None])[..., 0] / w).mean(axis=-1)
+    else:
+        raise ValueError(f"Unknown AHP method '{method}'. Choose from {', '.join(AHP_METHODS)}.")
+    CI = (lambda_max - m) / (m - 1) if m > 1 else np.zeros_like(lambda_max)
+    RI = random_index(m)
+    CR = CI / RI if RI != 0 else np.zeros_like(CI)
+    return w, lambda_max, CR
+
+
+def compute_consistency_ratio(M, method="eig"):
     """
     Compute the Consistency Ratio (CR) for the pairwise comparison matrix.
-    
+
     Args:
         M (ndarray): Pairwise comparison matrix (shape: m x m).
-        
+        method (str): "eig", "power" or "geometric" (see solve_ahp).
+
     Returns:
         float: The Consistency Ratio.
     """
-    m = M.shape[0]
-    # Eigen decomposition of the matrix
-    eigenvalues, _ = np.linalg.eig(M)
-    lambda_max = max(eigenvalues.real)
-    CI = (lambda_max - m) / (m - 1) if m > 1 else 0.0
-    
-    # Random Consistency Index (RI) for matrices of order m
-    RI_dict = {1: 0.00, 2: 0.00, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
-    RI = RI_dict.get(m, 1.49)  # use 1.49 if m > 10
-    
-    CR = CI / RI if RI != 0 else 0.0
-    return CR
-
-def compute_ahp_weights_from_excel(excel_file):
+    return float(solve_ahp(M, method)[2])
+
+
+@instrumented("weights.ahp")
+def compute_ahp_weights(M, criteria_names, method="eig"):
     """
-    Read a pairwise comparison matrix from an Excel file and compute the AHP weights.
-    The Excel file is expected to contain a square matrix (7 x 7) with criteria names as row and column labels.
+    Compute the AHP weights of a pairwise comparison matrix of any order.
     The function also computes the Consistency Ratio (CR) and raises an error if CR >= 0.1.
-    
+
     Args:
-        excel_file (str): Path to the Excel file containing the pairwise comparison matrix.
-    
+        M (ndarray): Pairwise comparison matrix (shape: m x m).
+        criteria_names (list): Criteria names, in the order of the matrix rows.
+        method (str): "eig", "power" or "geometric" (see solve_ahp).
+
     Returns:
-        dict: A dictionary mapping criteria names to their computed weights.
-        
+        AHPWeights: A dictionary mapping criteria names to their computed weights, with the CR in attrs.
+
     Raises:
-        ValueError: If the matrix is not square or does not have 7 criteria,
-                    or if the Consistency Ratio (CR) is not acceptable (>= 0.1).
+        ValueError: If the matrix is not square with positive entries, the names do not match it,
+                    or the Consistency Ratio (CR) is not acceptable (>= 0.1).
     """
-    # Read the pairwise comparison matrix from Excel
-    df_matrix = pd.read_excel(excel_file, index_col=0)
-    M = df_matrix.to_numpy(dtype=float)
-    
-    # Validate the matrix dimensions (should be square and have 7 criteria)
-    m = M.shape[0]
-    if M.shape[0] != M.shape[1]:
+    M = _validate(M)
+    if M.ndim != 2:
         raise ValueError("The pairwise comparison matrix must be square.")
-    if m != 7:
-        raise ValueError("The pairwise comparison matrix must have 7 criteria.")
-    
-    # Compute the Consistency Ratio
-    CR = compute_consistency_ratio(M)
+    if len(criteria_names) != M.shape[0]:
+        raise ValueError("The number of criteria names must match the pairwise comparison matrix.")
+
+    weight_vector, _, CR = solve_ahp(M, method)
     if CR >= 0.1:
         raise ValueError(f"Consistency Ratio is too high (CR = {CR:.4f}). Please adjust the matrix to achieve CR < 0.1.")
+
+    # Map criteria names to weights
+    return AHPWeights({name: weight_vector[i] for i, name in enumerate(criteria_names)}, float(CR))
+
+
+@instrumented("weights.group_ahp")
+def compute_group_ahp_weights(matrices, criteria_names, aggregation="aij", method="eig", expert_weights=None):
+    """
+    Compute group AHP weights from the pairwise comparison matrices of several experts in one vectorized call:
+    - "aij" (aggregation of individual judgments): weighted geometric mean of the matrices, then one AHP solve.
+    - "aip" (aggregation of individual priorities): all matrices solved as one stack, then the weighted
+      geometric mean of the priority vectors.
+
+    Args:
+        matrices (array-like): One pairwise comparison matrix per expert (shape: k x m x m).
+        criteria_names (list): Criteria names, in the order of the matrix rows.
+        aggregation (str): "aij" or "aip".
+        method (str): "eig", "power" or "geometric" (see solve_ahp).
+        expert_weights (array-like, optional): Weight of each expert (defaults to equal weights).
+
+    Returns:
+        AHPWeights: A dictionary mapping criteria names to the group weights, with the CR of the aggregated
+                    matrix ("aij") or of every expert's matrix ("aip") in attrs.
+
+    Raises:
+        ValueError: If the matrices do not match the names, the aggregation is unknown,
+                    or a Consistency Ratio is not acceptable (>= 0.1).
+    """
+    M = _validate(matrices)
+    if M.ndim != 3:
+        raise ValueError("Group AHP needs a stack of pairwise comparison matrices (shape: k x m x m).")
+    if len(criteria_names) != M.shape[-1]:
+        raise ValueError("The number of criteria names must match the pairwise comparison matrices.")
+    k = M.shape[0]
+    expert_weights = np.full(k, 1.0 / k) if expert_weights is None else np.asarray(expert_weights, dtype=float)
+    if expert_weights.shape != (k,):
+        raise ValueError("There must be one weight per expert.")
+    expert_weights = expert_weights / expert_weights.sum()
+
+    if aggregation == "aij":
+        group_matrix = np.exp(np.tensordot(expert_weights, np.log(M), axes=1))
+        weight_vector, _, CR = solve_ahp(group_matrix, method)
+        if CR >= 0.1:
+            raise ValueError(f"Consistency Ratio of the aggregated matrix is too high (CR = {CR:.4f}).")
+        CR = float(CR)
+    elif aggregation == "aip":
+        W, _, CR = solve_ahp(M, method)
+        inconsistent = np.flatnonzero(CR >= 0.1)
+        if inconsistent.size:
+            raise ValueError("Consistency Ratio is too high for experts "
+                             + ", ".join(f"{i} (CR = {CR[i]:.4f})" for i in inconsistent) + ".")
+        CR = [float(cr) for cr in CR]
+        weight_vector = np.exp(expert_weights @ np.log(W))
+        weight_vector /= weight_vector.sum()
     else:
-        print(f"CR = {CR:.4f}")
-    
-    # Compute the principal eigenvector corresponding to the largest eigenvalue
-    eigenvalues, eigenvectors = np.linalg.eig(M)
-    max_index = np.argmax(eigenvalues.real)
-    weight_vector = eigenvectors[:, max_index].real
-    weight_vector = np.abs(weight_vector)
-    weight_vector = weight_vector / weight_vector.sum()
-    
-    # Map criteria names (from the Excel file's index) to weights
-    criteria_names = df_matrix.index.tolist()
-    weights = {criteria_names[i]: weight_vector[i] for i in range(m)}
-    return weights
\ No newline at end of file
+        raise ValueError(f"Unknown aggregation '{aggregation}'. Choose 'aij' or 'aip'.")
+    return AHPWeights({name: weight_vector[i] for i, name in enumerate(criteria_names)}, CR)
+
+
+@instrumented("weights.read_pairwise")
+def read_pairwise_matrix(excel_file):
+    """
+    Read a pairwise comparison matrix (criteria names as row and column labels) from an Excel file.
+    Parsed workbooks are cached by the SHA-256 of their contents, so an identical file is parsed once.
+
+    Args:
+        excel_file (str or file-like): Path to the Excel file, or a binary file object.
+
+    Returns:
+        tuple: (matrix (ndarray, m x m), criteria names (list)).
+    """
+    if hasattr(excel_file, "read"):
+        data = excel_file.read()
+    else:
+        with open(excel_file, "rb") as f:
+            data = f.read()
+    key = hashlib.sha256(data).hexdigest()
+    with _workbook_lock:
+        cached = _workbook_cache.get(key)
+        if cached is not None:
+            _workbook_cache.move_to_end(key)
+    if cached is None:
+        # pandas (and openpyxl) are only loaded when a workbook is actually parsed
+        import pandas as pd
+        df_matrix = pd.read_excel(io.BytesIO(data), index_col=0)
+        cached = (df_matrix.to_numpy(dtype=float), df_matrix.index.tolist())
+        with _workbook_lock:
+            _workbook_cache[key] = cached
+            while len(_workbook_cache) > WORKBOOK_CACHE_SIZE:
+                _workbook_cache.popitem(last=False)
+    return cached[0].copy(), list(cached[1])
+
+
+def clear_workbook_cache():
+    """Drop every parsed workbook from the cache."""
+    with _workbook_lock:
+        _workbook_cache.clear()
+
+
+def compute_ahp_weights_from_excel(excel_file, method="eig"):
+    """
+    Read a pairwise comparison matrix from an Excel file and compute the AHP weights.
+    The Excel file is expected to contain a square matrix with criteria names as row and column labels.
+    The function also computes the Consistency Ratio (CR) and raises an error if CR >= 0.1.
+
+    Args:
+        excel_file (str or file-like): Path to the Excel file containing the pairwise comparison matrix.
+        method (str): "eig", "power" or "geometric" (see solve_ahp).
+
+    Returns:
+        AHPWeights: A dictionary mapping criteria names to their computed weights, with the CR in attrs.
+
+    Raises:
+        ValueError: If the matrix is not square with positive entries,
+                    or if the Consistency Ratio (CR) is not acceptable (>= 0.1).
+    """
+    M, criteria_names = read_pairwise_matrix(excel_file)
+    return compute_ahp_weights(M, criteria_names, method)
+
+
+def compute_group_ahp_weights_from_excel(excel_files, aggregation="aij", method="eig", expert_weights=None):
+    """
+    Read one pairwise comparison matrix per expert from Excel files and compute the group AHP weights.
+    The matrices are aligned on the criteria order of the first file.
+
+    Args:
+        excel_files (list): Paths to (or binary file objects of) the Excel files.
+        aggregation (str): "aij" or "aip" (see compute_group_ahp_weights).
+        method (str): "eig", "power" or "geometric" (see solve_ahp).
+        expert_weights (array-like, optional): Weight of each expert.
+
+    Returns:
+        AHPWeights: A dictionary mapping criteria names to the group weights, with the CR(s) in attrs.
+
+    Raises:
+        ValueError: If the files do not compare the same criteria, or a Consistency Ratio is not acceptable.
+    """
+    matrices = []
+    criteria_names = None
+    for excel_file in excel_files:
+        M, names = read_pairwise_matrix(excel_file)
+        if criteria_names is None:
+            criteria_names = names
+        elif sorted(names) != sorted(criteria_names):
+            raise ValueError("All pairwise comparison matrices must compare the same criteria.")
+        else:
+            order = [names.index(name) for name in criteria_names]
+            M = M[np.ix_(order, order)]
+        matrices.append(M)
+    return compute_group_ahp_weights(np.stack(matrices), criteria_names, aggregation, method, expert_weights)
@@ -1,45 +1,123 @@
 # module_entropy.py
 import numpy as np
-import pandas as pd
+from common_utils import DecisionMatrix
+from instrumentation import instrumented
 
+def _xlogx(X):
+    """Element-wise x * ln(x) with 0 * ln(0) = 0 (as scipy.special.xlogy(x, x))."""
+    logs = np.zeros_like(X)
+    np.log(X, out=logs, where=X > 0)
+    return X * logs
+
+def _criteria_matrix(df, criteria_columns, criteria_type):
+    """Criteria values (without copying a DecisionMatrix) and the benefit mask."""
+    if isinstance(df, DecisionMatrix):
+        return df.values, df.benefit
+    X = df[criteria_columns].to_numpy(dtype=float)
+    benefit = np.array([criteria_type.get(col, "benefit") != "cost" for col in criteria_columns])
+    return X, benefit
+
+def _to_benefit(X, benefit, min_val, max_val):
+    """Reflect cost criteria (x' = max - x + min); missing values are mapped to 0, so they add no entropy."""
+    X_proc = np.array(X, dtype=float)
+    cost = ~benefit
+    if cost.any():
+        X_proc[:, cost] = (max_val + min_val)[..., cost] - X[:, cost]
+    missing = np.isnan(X_proc)
+    if missing.any():
+        X_proc[missing] = 0.0
+    return X_proc
+
+def _weights_from_entropy(E):
+    d = 1 - E
+    return d / (d.sum(axis=-1, keepdims=True) + 1e-6)
+
+@instrumented("weights.entropy")
 def compute_entropy_weights(df, criteria_columns, criteria_type):
     """
     Compute criteria weights using the Entropy method:
-    1. For cost criteria, transform the data to benefit type.
+    1. For cost criteria, transform the data to benefit type: x' = max - x + min.
     2. Normalize the data column-wise: p_ij = x_ij / sum_i(x_ij).
-    3. Compute the entropy: E_j = -k * sum(p_ij * ln(p_ij)), where k = 1 / ln(n).
+    3. Compute the entropy: E_j = -k * sum(p_ij * ln(p_ij)), where k = 1 / ln(n) and 0 * ln(0) = 0.
     4. Determine the diversity degree: d_j = 1 - E_j and then compute the weights.
-    
+    All criteria are processed at once on the (n x m) matrix; missing values are ignored.
+
     Args:
-        df (DataFrame): The input data.
+        df (DataFrame or DecisionMatrix): The input data.
         criteria_columns (list): List of criteria column names.
         criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
-        
+
     Returns:
         dict: A dictionary mapping criteria names to their computed weights.
     """
-    df_proc = df.copy()
-    # Transform cost criteria into benefit criteria
-    for col in criteria_columns:
-        if criteria_type.get(col, "benefit") == "cost":
-            min_val = df[col].min()
-            max_val = df[col].max()
-            df_proc[col] = max_val - df[col] + min_val
+    X, benefit = _criteria_matrix(df, criteria_columns, criteria_type)
+    if isinstance(df, DecisionMatrix):
+        criteria_columns = df.criteria_columns
+    X_proc = _to_benefit(X, benefit, np.nanmin(X, axis=0), np.nanmax(X, axis=0))
 
     # Normalize the data column-wise: p_ij = x_ij / sum_i(x_ij)
-    p = df_proc[criteria_columns].copy()
-    p = p.apply(lambda x: x / (x.sum() + 1e-6), axis=0)
-    
-    n = df.shape[0]
-    k = 1.0 / np.log(n + 1e-6)
-    
-    # Compute entropy for each criterion
-    E = {}
-    for col in criteria_columns:
-        p_col = p[col].replace(0, 1e-6)
-        E[col] = -k * (p_col * np.log(p_col)).sum()
-    
-    d = {col: 1 - E[col] for col in criteria_columns}
-    d_sum = sum(d.values())
-    weights = {col: d[col] / (d_sum + 1e-6) for col in criteria_columns}
-    return weights
+    p = X_proc / (X_proc.sum(axis=0) + 1e-6)
+    n = X.shape[0]
+    E = -_xlogx(p).sum(axis=0) / np.log(n + 1e-6)
+    w = _weights_from_entropy(E)
+    return {col: w[j] for j, col in enumerate(criteria_columns)}
+
+def compute_entropy_weights_from_stats(stats, criteria_columns=None):
+    """
+    Compute entropy weights from column statistics accumulated over chunks (streaming input).
+    With p_ij = x_ij / (S_j + 1e-6): sum_i(p_ij * ln p_ij) = (T_j - S_j * ln(S_j + 1e-6)) / (S_j + 1e-6),
+    where S_j = sum_i(x_ij) and T_j = sum_i(x_ij * ln x_ij), both additive over chunks.
+
+    Args:
+        stats (dict): 'count' (number of rows), 'sum' (S, shape m) and 'xlogx' (T, shape m),
+                      computed on the benefit-transformed values (cost criteria reflected: max - x + min).
+        criteria_columns (list, optional): Criteria names (defaults to stats['criteria_columns']).
+
+    Returns:
+        dict: A dictionary mapping criteria names to their computed weights.
+    """
+    criteria_columns = criteria_columns or stats["criteria_columns"]
+    S = np.asarray(stats["sum"], dtype=float)
+    D = S + 1e-6
+    E = -(np.asarray(stats["xlogx"], dtype=float) - S * np.log(D)) / D / np.log(stats["count"] + 1e-6)
+    w = _weights_from_entropy(E)
+    return {col: w[j] for j, col in enumerate(criteria_columns)}
+
+def compute_grouped_entropy_weights(df, criteria_columns, criteria_type, group_column="brand_name"):
+    """
+    Compute entropy weights for every group of rows (e.g. per brand_name) in one vectorized call.
+    Rows are sorted by group once (skipped if already grouped) and every per-group reduction
+    (min, max, sum, entropy) is a single reduceat over the matrix, so each group gets exactly the
+    weights that compute_entropy_weights would return on that group alone.
+
+    Args:
+        df (DataFrame): The input data.
+        criteria_columns (list): List of criteria column names.
+        criteria_type (dict): Mapping of criteria names to "benefit" or "cost".
+        group_column (str): Column defining the groups. Rows with a missing group are ignored.
+
+    Returns:
+        DataFrame: One row of weights per group (index: group, sorted), one column per criterion.
+    """
+    import pandas as pd
+    codes, groups = pd.factorize(df[group_column], sort=True)
+    X, benefit = _criteria_matrix(df, criteria_columns, criteria_type)
+    keep = codes >= 0
+    if not keep.all():
+        codes, X = codes[keep], X[keep]
+    if (np.diff(codes) < 0).any():
+        order = np.argsort(codes, kind="stable")
+        codes, X = codes[order], X[order]
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.empty(0, dtype=np.intp)
+    counts = np.diff(np.r_[starts, len(codes)])
+    row_group = np.repeat(np.arange(len(starts)), counts)
+    with np.errstate(invalid="ignore"):
+        min_val = np.fmin.reduceat(X, starts, axis=0)[row_group]
+        max_val = np.fmax.reduceat(X, starts, axis=0)[row_group]
+    X_proc = _to_benefit(X, benefit, min_val, max_val)
+
+    p = X_proc / (np.add.reduceat(X_proc, starts, axis=0) + 1e-6)[row_group]
+    E = -np.add.reduceat(_xlogx(p), starts, axis=0) / np.log(counts + 1e-6)[:, None]
+    w = _weights_from_entropy(E)
+    return pd.DataFrame(w, index=pd.Index(groups[codes[starts]], name=group_column), columns=criteria_columns)